@@ -20,8 +20,8 @@ from app.db import models  # noqa: F401 - Szükséges a modellek regisztrálás
 target_metadata = Base.metadata
 
 
-# Adatbázis URL környezeti változóból
-db_url = os.getenv("DATABASE_URL", "sqlite:///worktrack.db")
+# Adatbázis URL környezeti változóból (ugyanaz, mint az app Config-ban)
+db_url = os.getenv("SQLALCHEMY_DATABASE_URI") or os.getenv("DATABASE_URL", "sqlite:///worktrack.db")
 config.set_main_option("sqlalchemy.url", db_url)
 
 
@@ -47,7 +47,8 @@ def run_migrations_online():
     with connectable.connect() as connection:
         context.configure(
             connection=connection, 
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
         )
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,46 @@
+"""change feed sequence
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 19:41:08.512344
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+TABLES = ('work_sessions', 'overtime_requests', 'modification_requests')
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('change_seq', sa.Integer(), nullable=True))
+
+    # Meglévő sorok sorszámozása táblánként egymás utáni, nem átfedő tartományokba
+    offset = 0
+    bind = op.get_bind()
+    for table in TABLES:
+        op.execute(f"UPDATE {table} SET change_seq = id + {offset}")
+        offset = bind.execute(sa.text(f"SELECT COALESCE(MAX(change_seq), {offset}) FROM {table}")).scalar()
+    op.execute("DELETE FROM cache_versions WHERE name = 'change_seq'")
+    op.execute(f"INSERT INTO cache_versions (name, version, updated_at) VALUES ('change_seq', {offset}, CURRENT_TIMESTAMP)")
+
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('change_seq', existing_type=sa.Integer(), nullable=False)
+            batch_op.create_index(batch_op.f(f'ix_{table}_change_seq'), ['change_seq'], unique=False)
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_change_seq'))
+            batch_op.drop_column('change_seq')
+    op.execute("DELETE FROM cache_versions WHERE name = 'change_seq'")
@@ -0,0 +1,36 @@
+"""change_seq database sequence
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 20:24:37.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Csak PostgreSQL-en: a számlálósor helyett szekvencia, ott folytatva, ahol a sor tartott.
+    # SQLite-on a cache_versions "change_seq" sora marad a számláló.
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    last = bind.execute(sa.text("SELECT version FROM cache_versions WHERE name = 'change_seq'")).scalar() or 0
+    op.execute(f"CREATE SEQUENCE change_seq START WITH {last + 1}")
+    op.execute("DELETE FROM cache_versions WHERE name = 'change_seq'")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    last = bind.execute(sa.text("SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM change_seq")).scalar()
+    op.execute(f"INSERT INTO cache_versions (name, version, updated_at) VALUES ('change_seq', {last}, CURRENT_TIMESTAMP)")
+    op.execute("DROP SEQUENCE change_seq")
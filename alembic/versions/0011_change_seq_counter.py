@@ -0,0 +1,36 @@
+"""change_seq back to the counter row
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 22:05:12.403117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Csak PostgreSQL-en: a szekvencia helyett ismét a cache_versions "change_seq" sora a számláló,
+    # ott folytatva, ahol a szekvencia tartott (a sorzár miatt commit sorrendben láthatók a sorszámok)
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    last = bind.execute(sa.text("SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM change_seq")).scalar()
+    op.execute(f"INSERT INTO cache_versions (name, version, updated_at) VALUES ('change_seq', {last}, CURRENT_TIMESTAMP)")
+    op.execute("DROP SEQUENCE change_seq")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    last = bind.execute(sa.text("SELECT version FROM cache_versions WHERE name = 'change_seq'")).scalar() or 0
+    op.execute(f"CREATE SEQUENCE change_seq START WITH {last + 1}")
+    op.execute("DELETE FROM cache_versions WHERE name = 'change_seq'")
@@ -0,0 +1,170 @@
+import asyncio
+import contextlib
+
+from a2wsgi import WSGIMiddleware
+from flask_jwt_extended import create_access_token, decode_token
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route, request_response
+
+from app.config.settings import Config
+from app.db.async_engine import create_async_db
+from app.db.engine import db
+from app.db.models import WorkLocation
+from app.db.replica import PRIMARY_COOKIE, replica_router
+from app.db.settings_cache import settings_cache
+from app.main import create_app
+from app.services.async_attendance_service import AsyncAttendanceService
+from app.services.async_auth_service import AsyncAuthService
+from app.services.token_blocklist import token_blocklist
+from app.utils.error_handler import ServiceError, UnauthorizedError, ValidationError
+
+
+def create_asgi_app(config_class=Config) -> Starlette:
+    """
+    ASGI belépési pont: a login és a check-in/check-out async handlerekkel,
+    asyncio SQLAlchemy engine-nel fut, minden más kérést a Flask app szolgál ki.
+    """
+    flask_app = create_app(config_class)
+    engine, session_factory = create_async_db(flask_app.config)
+    limiter = flask_app.extensions.get("rate_limiter")
+
+    def issue_token(**kwargs) -> str:
+        with flask_app.app_context():
+            return create_access_token(**kwargs)
+
+    def current_user_id(request: Request) -> int:
+        header = request.headers.get("Authorization", "")
+        if not header.startswith("Bearer "):
+            raise UnauthorizedError("Missing Authorization Header")
+        try:
+            with flask_app.app_context():
+                claims = decode_token(header[len("Bearer "):])
+                token_blocklist.refresh_if_stale(db.session)
+            # decode_token nem hívja a blocklist loadert, ezért itt ellenőrizzük
+            if token_blocklist.is_revoked(claims):
+                raise UnauthorizedError("A token visszavonásra került")
+        except UnauthorizedError:
+            raise
+        except Exception:
+            raise UnauthorizedError("Érvénytelen vagy lejárt token")
+        return int(claims["sub"])
+
+    async def json_body(request: Request) -> dict:
+        try:
+            data = await request.json()
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def parse_location(data: dict) -> WorkLocation:
+        try:
+            return WorkLocation(data.get("location", "office"))
+        except ValueError:
+            raise ValidationError("Érvénytelen munkavégzési hely")
+
+    async def login(request: Request):
+        data = await json_body(request)
+
+        if limiter is not None:
+            checks = [("login_ip", request.client.host if request.client else "unknown")]
+            identity = data.get("username") or data.get("email")
+            if identity:
+                checks.append(("login_user", str(identity).strip().lower()))
+            for rule, key in checks:
+                allowed, retry_after = limiter.consume(rule, key)
+                if not allowed:
+                    return JSONResponse(
+                        {"error": "Túl sok próbálkozás, próbáld újra később.", "status": 429},
+                        status_code=429,
+                        headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+                    )
+
+        async with session_factory() as db:
+            user, token = await AsyncAuthService(db, issue_token).login(
+                username=data.get("username"),
+                email=data.get("email"),
+                password=data.get("password"),
+            )
+        return JSONResponse({
+            "access_token": token,
+            "token_type": "Bearer",
+            "user": {
+                "id": user.id,
+                "username": user.username,
+                "email": user.email,
+                "role": user.role.value if hasattr(user.role, 'value') else str(user.role),
+            }
+        })
+
+    def mark_write(response: JSONResponse, user_id: int) -> JSONResponse:
+        # Read-your-writes: a Flask oldali dashboard olvasások a primary-ra mennek
+        until = replica_router.mark_write(user_id)
+        if until is not None:
+            response.set_cookie(PRIMARY_COOKIE, f"{until:.3f}", max_age=int(replica_router.sticky_seconds) + 1,
+                                httponly=True, samesite="lax")
+        return response
+
+    async def check_in(request: Request):
+        user_id = current_user_id(request)
+        location = parse_location(await json_body(request))
+        async with session_factory() as db:
+            record = await AsyncAttendanceService(db, user_id).check_in(location)
+        return mark_write(JSONResponse({"id": record.id, "status": "checked_in"}), user_id)
+
+    async def check_out(request: Request):
+        user_id = current_user_id(request)
+        async with session_factory() as db:
+            record = await AsyncAttendanceService(db, user_id).check_out()
+        return mark_write(JSONResponse({"id": record.id, "status": "checked_out"}), user_id)
+
+    async def handle_service_error(request: Request, e: ServiceError):
+        return JSONResponse({"error": e.message, "status": e.status_code}, status_code=e.status_code)
+
+    def refresh_settings():
+        with flask_app.app_context():
+            settings_cache.refresh_if_stale()
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        # Az async handlerek nem futnak Flask app contextben, ezért a
+        # settings cache verzió-ellenőrzését háttérfeladat végzi
+        async def settings_refresher():
+            while True:
+                await asyncio.sleep(settings_cache.check_interval)
+                await asyncio.to_thread(refresh_settings)
+
+        task = asyncio.create_task(settings_refresher())
+        try:
+            yield
+        finally:
+            task.cancel()
+            await engine.dispose()
+
+    flask_wsgi = WSGIMiddleware(flask_app)
+
+    def unless_idempotent(handler):
+        """
+        Idempotency-Key fejléces kérések a Flask végpontra mennek, ahol a
+        tárolt válasz visszajátszása (és a kulcs foglalása) történik.
+        """
+        async_endpoint = request_response(handler)
+
+        async def app(scope, receive, send):
+            if any(name == b"idempotency-key" for name, _ in scope["headers"]):
+                await flask_wsgi(scope, receive, send)
+            else:
+                await async_endpoint(scope, receive, send)
+        return app
+
+    return Starlette(
+        routes=[
+            Route("/api/auth/login", login, methods=["POST"]),
+            Route("/api/attendance/checkin", unless_idempotent(check_in), methods=["POST"]),
+            Route("/api/attendance/checkout", unless_idempotent(check_out), methods=["POST"]),
+            Mount("/", app=flask_wsgi),
+        ],
+        exception_handlers={ServiceError: handle_service_error},
+        lifespan=lifespan,
+    )
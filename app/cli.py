@@ -0,0 +1,145 @@
+import time
+
+import click
+
+from app.db.engine import db
+from app.services.overtime_ledger import OvertimeLedgerService
+from app.services.payroll_report import PayrollReportService, parse_month
+from app.services.session_sweeper import SessionSweeper
+
+
+def register_commands(app):
+    """Flask CLI parancsok (flask --app run <parancs>)."""
+
+    @app.cli.command("sweep-sessions")
+    @click.option("--max-open-minutes", type=int, default=None,
+                  help="Ennél régebben nyitott munkamenetek lezárása (alapból SWEEPER_MAX_OPEN_MINUTES).")
+    @click.option("--batch-size", type=int, default=None, help="Kötegméret (alapból SWEEPER_BATCH_SIZE).")
+    @click.option("--interval", type=int, default=0,
+                  help="Ha > 0, ennyi másodpercenként ismétli (egyetlen dedikált folyamatban futtasd).")
+    def sweep_sessions(max_open_minutes, batch_size, interval):
+        """Elfelejtett nyitott munkamenetek lezárása, túlóra és audit generálással."""
+        while True:
+            result = SessionSweeper(
+                db.session,
+                max_open_minutes=max_open_minutes or app.config["SWEEPER_MAX_OPEN_MINUTES"],
+                batch_size=batch_size or app.config["SWEEPER_BATCH_SIZE"],
+            ).run()
+            click.echo(f"Lezárva: {result['closed']}, túlóra kérelem: {result['overtime_created']}, "
+                       f"kötegek: {result['batches']}")
+            if interval <= 0:
+                break
+            time.sleep(interval)
+
+    @app.cli.command("reconcile-overtime-ledger")
+    @click.option("--fix", is_flag=True, help="Eltérések javítása korrekciós bejegyzéssel.")
+    def reconcile_overtime_ledger(fix):
+        """Túlóra egyenlegek összevetése a jóváhagyott kérelmekkel."""
+        mismatches = OvertimeLedgerService(db.session).reconcile(fix=fix)
+        for m in mismatches:
+            click.echo(f"user {m['user_id']}: várt {m['expected_minutes']} perc / {m['expected_count']} db, "
+                       f"főkönyv {m['ledger_minutes']} perc / {m['ledger_count']} db")
+        if fix:
+            db.session.commit()
+        click.echo(f"Eltérések: {len(mismatches)}" + (" (javítva)" if fix and mismatches else ""))
+
+    @app.cli.command("payroll-report")
+    @click.option("--month", required=True, help="Hónap YYYY-MM formátumban.")
+    @click.option("--output", type=click.Path(dir_okay=False), default=None,
+                  help="CSV kimeneti fájl (alapból a standard kimenet).")
+    def payroll_report(month, output):
+        """Havi bérszámfejtési riport minden aktív felhasználóra."""
+        started = time.perf_counter()
+        report = PayrollReportService(
+            db.session,
+            late_after=app.config["PAYROLL_LATE_AFTER"],
+            short_day_minutes=app.config["PAYROLL_SHORT_DAY_MINUTES"],
+        ).monthly_report(parse_month(month))
+        if output:
+            report.to_csv(output, index=False)
+            click.echo(f"{len(report)} felhasználó, {time.perf_counter() - started:.2f} s -> {output}")
+        else:
+            click.echo(report.to_csv(index=False), nl=False)
+
+    @app.cli.command("export-parquet")
+    @click.option("--output-dir", type=click.Path(file_okay=False), default=None,
+                  help="Célkönyvtár (alapból PARQUET_EXPORT_DIR).")
+    @click.option("--full", is_flag=True, help="Minden partíció újraírása.")
+    def export_parquet(output_dir, full):
+        """Jelenléti adatok inkrementális exportja havi Parquet partíciókba."""
+        # A pyarrow csak ehhez a parancshoz kell
+        from app.services.parquet_export import ParquetExporter
+
+        summary = ParquetExporter(db.session, output_dir or app.config["PARQUET_EXPORT_DIR"]).export(full=full)
+        for table_name, result in summary.items():
+            click.echo(f"{table_name}: újraírva {len(result['written'])}, törölve {len(result['removed'])} partíció")
+
+    @app.cli.command("sync-replica")
+    @click.option("--interval", type=int, default=0, help="Ha > 0, ennyi másodpercenként ismétli.")
+    def sync_replica(interval):
+        """SQLite primary másolása a REPLICA_DATABASE_URI fájlba (helyi replika teszteléshez)."""
+        from app.db.replica import sync_sqlite_replica
+
+        replica_uri = app.config.get("REPLICA_DATABASE_URI")
+        if not replica_uri:
+            raise click.UsageError("REPLICA_DATABASE_URI nincs beállítva.")
+        while True:
+            started = time.perf_counter()
+            sync_sqlite_replica(app.config["SQLALCHEMY_DATABASE_URI"], replica_uri)
+            click.echo(f"Replika szinkronizálva ({time.perf_counter() - started:.2f} s)")
+            if interval <= 0:
+                break
+            time.sleep(interval)
+
+    @app.cli.command("dispatch-outbox")
+    @click.option("--interval", type=int, default=0,
+                  help="Ha > 0, ennyi másodpercenként ismétli (egyetlen dedikált folyamatban futtasd).")
+    @click.option("--purge-days", type=int, default=0, help="Ha > 0, a régebben kiküldött események törlése.")
+    def dispatch_outbox(interval, purge_days):
+        """Outbox események kiküldése a bérszámfejtési webhookra (OUTBOX_WEBHOOK_URL)."""
+        from datetime import timedelta
+        from app.services.outbox import OutboxDispatcher
+
+        if not app.config.get("OUTBOX_WEBHOOK_URL"):
+            raise click.UsageError("OUTBOX_WEBHOOK_URL nincs beállítva.")
+        dispatcher = OutboxDispatcher(
+            db.session,
+            app.config["OUTBOX_WEBHOOK_URL"],
+            secret=app.config.get("OUTBOX_WEBHOOK_SECRET") or None,
+            batch_size=app.config["OUTBOX_BATCH_SIZE"],
+            timeout=app.config["OUTBOX_WEBHOOK_TIMEOUT"],
+            max_backoff=app.config["OUTBOX_MAX_BACKOFF_SECONDS"],
+        )
+        while True:
+            result = dispatcher.drain()
+            click.echo(f"Kiküldve: {result['sent']}, sikertelen: {result['failed']}, kötegek: {result['batches']}")
+            if purge_days > 0:
+                click.echo(f"Törölve: {dispatcher.purge_dispatched(timedelta(days=purge_days))}")
+            if interval <= 0:
+                break
+            time.sleep(interval)
+
+    @app.cli.command("purge-idempotency-keys")
+    def purge_idempotency_keys():
+        """Lejárt Idempotency-Key bejegyzések törlése."""
+        store = app.extensions["idempotency_store"]
+        click.echo(f"{store.purge_expired(db.session)} lejárt kulcs törölve")
+
+    @app.cli.command("build-assets")
+    @click.option("--output-dir", type=click.Path(file_okay=False), default=None,
+                  help="Célkönyvtár (alapból ASSETS_OUTPUT_DIR).")
+    def build_assets_command(output_dir):
+        """Statikus fájlok fingerprintelése és előtömörítése (deploy lépés)."""
+        from app.utils.assets import build_assets, brotli
+
+        manifest = build_assets(app.static_folder, output_dir or app.config["ASSETS_OUTPUT_DIR"], force=True)
+        click.echo(f"{len(manifest['assets'])} asset, {len(manifest['pages'])} oldal"
+                   + ("" if brotli else " (brotli nincs telepítve, csak gzip)"))
+
+    @app.cli.command("purge-jobs")
+    def purge_jobs():
+        """Lejárt háttérfeladatok és eredményfájljaik törlése, félbemaradt feladatok lezárása."""
+        from app.services.job_runner import job_runner
+
+        click.echo(f"Félbemaradt: {job_runner.recover_stale(db.session)}, "
+                   f"törölve: {job_runner.purge_expired(db.session)}")
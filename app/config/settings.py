@@ -1,10 +1,108 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 class Config:
-    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    SQLALCHEMY_DATABASE_URI = os.getenv("SQLALCHEMY_DATABASE_URI", "sqlite:///:memory:")
     #SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///worktrack.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "supersecretkey")
\ No newline at end of file
+    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "supersecretkey")
+    # Visszavont tokenek listájának verzió-ellenőrzési intervalluma (másodperc)
+    TOKEN_BLOCKLIST_CHECK_INTERVAL = float(os.getenv("TOKEN_BLOCKLIST_CHECK_INTERVAL", "1.0"))
+
+    # SystemSettings cache verzió-ellenőrzési intervallum (másodperc)
+    SETTINGS_CACHE_CHECK_INTERVAL = float(os.getenv("SETTINGS_CACHE_CHECK_INTERVAL", "1.0"))
+
+    # Login rate limit (token bucket) – "memory" workerenként, "sqlite" közös fájlban
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_SQLITE_PATH = os.getenv(
+        "RATE_LIMIT_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "worktrack_ratelimit.sqlite")
+    )
+    LOGIN_RATE_LIMIT_IP_BURST = int(os.getenv("LOGIN_RATE_LIMIT_IP_BURST", "20"))
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE = float(os.getenv("LOGIN_RATE_LIMIT_IP_PER_MINUTE", "30"))
+    LOGIN_RATE_LIMIT_USER_BURST = int(os.getenv("LOGIN_RATE_LIMIT_USER_BURST", "5"))
+    LOGIN_RATE_LIMIT_USER_PER_MINUTE = float(os.getenv("LOGIN_RATE_LIMIT_USER_PER_MINUTE", "5"))
+
+    # ASGI belépési pont (asgi.py): üresen a SQLALCHEMY_DATABASE_URI async megfelelője
+    ASYNC_DATABASE_URI = os.getenv("ASYNC_DATABASE_URI")
+
+    # "development": create_all + seed induláskor; "production": nincs DDL/seed,
+    # csak az Alembic head revízió ellenőrzése (lásd gunicorn.conf.py)
+    DB_STARTUP_MODE = os.getenv("DB_STARTUP_MODE", "development")
+    ALEMBIC_VERSIONS_DIR = os.getenv("ALEMBIC_VERSIONS_DIR", os.path.join(PROJECT_ROOT, "alembic", "versions"))
+    # Ha meg van adva, a migrációs fájlok beolvasása is elmarad
+    ALEMBIC_EXPECTED_HEAD = os.getenv("ALEMBIC_EXPECTED_HEAD")
+
+    # Jelenléti index szinkronizálási intervalluma (a többi worker változásaihoz, change_seq alapján)
+    PRESENCE_RESYNC_SECONDS = float(os.getenv("PRESENCE_RESYNC_SECONDS", "5"))
+
+    # Nyitott munkamenet sweeper (flask sweep-sessions, pl. cron-ból)
+    SWEEPER_MAX_OPEN_MINUTES = int(os.getenv("SWEEPER_MAX_OPEN_MINUTES", "720"))
+    SWEEPER_BATCH_SIZE = int(os.getenv("SWEEPER_BATCH_SIZE", "5000"))
+
+    # Havi bérszámfejtési riport: késésnek számít ennél későbbi első belépés,
+    # rövid nap az ennél kevesebb ledolgozott perc
+    PAYROLL_LATE_AFTER = os.getenv("PAYROLL_LATE_AFTER", "09:00")
+    PAYROLL_SHORT_DAY_MINUTES = int(os.getenv("PAYROLL_SHORT_DAY_MINUTES", "480"))
+
+    # Inkrementális Parquet export célkönyvtára (flask export-parquet)
+    PARQUET_EXPORT_DIR = os.getenv("PARQUET_EXPORT_DIR", os.path.join(PROJECT_ROOT, "exports", "parquet"))
+
+    # Olvasási replika a riport végpontokhoz (üres: minden a primary-ra megy).
+    # Írás után ennyi másodpercig a felhasználó saját olvasásai a primary-ról jönnek.
+    REPLICA_DATABASE_URI = os.getenv("REPLICA_DATABASE_URI", "")
+    REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+
+    # Statikus assetek: tartalom-hash-elt nevek, gzip/brotli változatok (flask build-assets).
+    # Production-ban a deploy lépés építi, ilyenkor ASSETS_BUILD_ON_STARTUP=0.
+    ASSETS_ENABLED = os.getenv("ASSETS_ENABLED", "1") == "1"
+    ASSETS_BUILD_ON_STARTUP = os.getenv("ASSETS_BUILD_ON_STARTUP", "1") == "1"
+    ASSETS_OUTPUT_DIR = os.getenv("ASSETS_OUTPUT_DIR", os.path.join(PROJECT_ROOT, "build", "assets"))
+    # JSON válaszok gzip tömörítése e méret felett (0: kikapcsolva)
+    JSON_GZIP_MIN_BYTES = int(os.getenv("JSON_GZIP_MIN_BYTES", "1024"))
+
+    # Felhasználó kereső index: ennyi másodpercenként ellenőrzi a többi worker módosításait
+    USER_SEARCH_CHECK_INTERVAL = float(os.getenv("USER_SEARCH_CHECK_INTERVAL", "1"))
+
+    # Kioszk offline szinkron: egy kötegben legfeljebb ennyi esemény,
+    # és a kioszk órája legfeljebb ennyivel járhat a szerver előtt (másodperc)
+    KIOSK_SYNC_MAX_EVENTS = int(os.getenv("KIOSK_SYNC_MAX_EVENTS", "1000"))
+    KIOSK_SYNC_MAX_CLOCK_SKEW_SECONDS = int(os.getenv("KIOSK_SYNC_MAX_CLOCK_SKEW_SECONDS", "300"))
+
+    # Idempotency-Key: tárolt válaszok élettartama (másodperc) és a memóriabeli LRU mérete.
+    # A futó kérés foglalása IDEMPOTENCY_LEASE_SECONDS után átvehető (legyen hosszabb a kérés timeoutjánál)
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_LEASE_SECONDS = int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60"))
+    IDEMPOTENCY_MEMORY_ENTRIES = int(os.getenv("IDEMPOTENCY_MEMORY_ENTRIES", "10000"))
+
+    # Bérszámfejtési webhook (outbox dispatcher): URL, opcionális HMAC titok, kötegméret
+    OUTBOX_WEBHOOK_URL = os.getenv("OUTBOX_WEBHOOK_URL", "")
+    OUTBOX_WEBHOOK_SECRET = os.getenv("OUTBOX_WEBHOOK_SECRET", "")
+    OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+    OUTBOX_WEBHOOK_TIMEOUT = float(os.getenv("OUTBOX_WEBHOOK_TIMEOUT", "10"))
+    OUTBOX_MAX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_MAX_BACKOFF_SECONDS", "300"))
+
+    # Változás-feed (/api/admin/changes): alapértelmezett és maximális oldalméret
+    CHANGE_FEED_DEFAULT_LIMIT = int(os.getenv("CHANGE_FEED_DEFAULT_LIMIT", "500"))
+    CHANGE_FEED_MAX_LIMIT = int(os.getenv("CHANGE_FEED_MAX_LIMIT", "5000"))
+
+    # Workerek között közös riport cache: "sqlite" (fájl), "memory" (workerenként) vagy "none".
+    # Üres CACHE_SQLITE_PATH esetén az adatbázis fájl mellé kerül (<db>-cache.sqlite)
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite")
+    CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "")
+    CACHE_DEFAULT_TTL = float(os.getenv("CACHE_DEFAULT_TTL", "300"))
+    # Az összesített riportok érvénytelenítése legfeljebb ennyi másodpercenként egy írás (0: azonnal)
+    CACHE_COALESCE_SECONDS = float(os.getenv("CACHE_COALESCE_SECONDS", "2"))
+
+    # Háttérfeladatok (riportok, exportok): process pool mérete, eredményfájlok helye és élettartama,
+    # ennyi másodperc életjel nélkül a futó feladat félbemaradtnak számít. JOB_EXECUTOR: "process" vagy "inline"
+    JOB_EXECUTOR = os.getenv("JOB_EXECUTOR", "process")
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_RESULTS_DIR = os.getenv("JOB_RESULTS_DIR", os.path.join(PROJECT_ROOT, "exports", "jobs"))
+    JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", "86400"))
+    JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "3600"))
@@ -6,6 +6,9 @@ from app.db.models import (
     ModificationRequest,
     AuditLog,
     SystemSettings,
+    CacheVersion,
+    OvertimeBalance,
+    OvertimeLedgerEntry,
     UserRole,
     WorkLocation,
     RequestStatus
@@ -19,6 +22,9 @@ __all__ = [
     "ModificationRequest",
     "AuditLog",
     "SystemSettings",
+    "CacheVersion",
+    "OvertimeBalance",
+    "OvertimeLedgerEntry",
     "UserRole",
     "WorkLocation",
     "RequestStatus"
@@ -0,0 +1,40 @@
+from typing import Optional, Tuple
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+# Szinkron driver -> asyncio driver megfeleltetés
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(sync_url: str) -> str:
+    """A Flask-SQLAlchemy URI asyncio megfelelője (pl. sqlite:/// -> sqlite+aiosqlite:///)."""
+    url = make_url(sync_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Nem támogatott adatbázis az async útvonalhoz: {backend}")
+    if url.database in (None, "", ":memory:") and backend == "sqlite":
+        raise ValueError("Az async útvonalhoz fájl alapú vagy szerver adatbázis kell, in-memory SQLite nem osztható meg.")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def create_async_db(config, url: Optional[str] = None) -> Tuple[AsyncEngine, async_sessionmaker]:
+    """
+    Async engine és session factory ugyanarra az adatbázisra, mint a Flask app.
+    A modellek (app/db/models.py) közösek, csak a driver más.
+    """
+    url = url or config.get("ASYNC_DATABASE_URI") or async_database_url(config["SQLALCHEMY_DATABASE_URI"])
+    try:
+        engine = create_async_engine(url, **config.get("ASYNC_ENGINE_OPTIONS", {}))
+    except ModuleNotFoundError as e:
+        # Hiányzó asyncio driver (pl. asyncpg): érthető hiba induláskor, nem az első kérésnél
+        raise RuntimeError(
+            f"Az async belépési ponthoz hiányzik a(z) '{e.name}' driver "
+            f"({make_url(url).drivername}); telepítsd a requirements.txt alapján, "
+            f"vagy futtasd a WSGI (gunicorn) belépési pontot."
+        ) from e
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    return engine, session_factory
@@ -1,11 +1,20 @@
-from sqlalchemy import and_
+from sqlalchemy import and_, update
+from sqlalchemy.orm import Session
 from datetime import datetime, date
 from typing import List, Optional, Dict, Any
 from app.db.engine import db
+from app.db.settings_cache import settings_cache, validate_setting, SETTINGS_VERSION_NAME
+from app.db.unit_of_work import commit_or_flush, transaction
+from app.db.versioning import bump_version, with_change_seqs
+from app.services.outbox import SESSION_MODIFIED, publish_overtime_reviewed, publish_session
+from app.services.overtime_ledger import OvertimeLedgerService
+from app.services.token_blocklist import token_blocklist
+from app.services.user_search_index import USERS_VERSION_NAME, user_search_index
 from app.db.models import (
     User, AttendanceRecord, OvertimeRequest, ModificationRequest,
     AuditLog, SystemSettings, UserRole, WorkLocation, RequestStatus
 )
+from app.utils.error_handler import ValidationError
 
 # ==================== USER CRUD ====================
 
@@ -19,7 +28,9 @@ def create_user(username: str, email: str, password_hash: str,
         role=role
     )
     db.session.add(user)
-    db.session.commit()
+    bump_version(db.session, USERS_VERSION_NAME)
+    commit_or_flush(db.session)
+    user_search_index.upsert(user)
     return user
 
 
@@ -53,7 +64,9 @@ def update_user(user_id: int, **kwargs) -> Optional[User]:
         for key, value in kwargs.items():
             if hasattr(user, key):
                 setattr(user, key, value)
-        db.session.commit()
+        bump_version(db.session, USERS_VERSION_NAME)
+        commit_or_flush(db.session)
+        user_search_index.upsert(user)
     return user
 
 
@@ -61,12 +74,15 @@ def delete_user(user_id: int, soft_delete: bool = True) -> bool:
     """Felhasználó törlése (soft delete vagy hard delete)."""
     user = get_user_by_id(user_id)
     if user:
-        if soft_delete:
-            user.is_active = False
-            db.session.commit()
-        else:
-            db.session.delete(user)
-            db.session.commit()
+        with transaction(db.session):
+            if soft_delete:
+                user.is_active = False
+            else:
+                db.session.delete(user)
+            bump_version(db.session, USERS_VERSION_NAME)
+            # A már kiadott tokenek se maradjanak érvényesek
+            token_blocklist.revoke_user(db.session, user_id)
+        user_search_index.remove(user_id)
         return True
     return False
 
@@ -83,7 +99,7 @@ def create_attendance_record(user_id: int, check_in: datetime,
         date=check_in.date()
     )
     db.session.add(record)
-    db.session.commit()
+    commit_or_flush(db.session)
     return record
 
 
@@ -98,7 +114,7 @@ def check_out_user(record_id: int, check_out: Optional[datetime] = None) -> Opti
     if record and not record.check_out:
         record.check_out = check_out or datetime.now()
         record.work_duration = record.calculate_duration()
-        db.session.commit()
+        commit_or_flush(db.session)
     return record
 
 
@@ -114,9 +130,10 @@ def get_active_attendance(user_id: int) -> Optional[AttendanceRecord]:
 
 def get_attendance_records_by_user(user_id: int,
                                    start_date: Optional[date] = None,
-                                   end_date: Optional[date] = None) -> List[AttendanceRecord]:
-    """Felhasználó jelenlét rekordjai dátum tartomány szerint."""
-    query = db.session.query(AttendanceRecord).filter(AttendanceRecord.user_id == user_id)
+                                   end_date: Optional[date] = None,
+                                   session: Optional[Session] = None) -> List[AttendanceRecord]:
+    """Felhasználó jelenlét rekordjai dátum tartomány szerint (session: pl. olvasási replika)."""
+    query = (session or db.session).query(AttendanceRecord).filter(AttendanceRecord.user_id == user_id)
 
     if start_date:
         query = query.filter(AttendanceRecord.date >= start_date)
@@ -148,7 +165,7 @@ def update_attendance_record(record_id: int, **kwargs) -> Optional[AttendanceRec
         if 'check_in' in kwargs or 'check_out' in kwargs:
             record.work_duration = record.calculate_duration()
 
-        db.session.commit()
+        commit_or_flush(db.session)
     return record
 
 
@@ -165,7 +182,7 @@ def create_overtime_request(user_id: int, overtime_minutes: int,
         is_auto_generated=is_auto_generated
     )
     db.session.add(request)
-    db.session.commit()
+    commit_or_flush(db.session)
     return request
 
 
@@ -190,14 +207,43 @@ def get_overtime_requests_by_user(user_id: int, status: Optional[RequestStatus]
     return query.order_by(OvertimeRequest.request_date.desc()).all()
 
 
+def review_overtime_request(session: Session, request: OvertimeRequest, new_status: RequestStatus,
+                            reviewer_id: int, reason: Optional[str] = None) -> RequestStatus:
+    """
+    Túlóra kérelem elbírálása feltételes UPDATE-tel (WHERE status = a beolvasott állapot).
+    Két párhuzamos elbírálásból csak az egyik jut át, így az egyenleg nem könyvelődik kétszer;
+    a vesztes 409-es ValidationError-t kap. Visszatér a korábbi állapottal.
+    Commit nélkül, a hívó tranzakciójában fut.
+    """
+    old_status = request.status
+    values = {"status": new_status, "reviewed_by": reviewer_id, "reviewed_at": datetime.now()}
+    if new_status == RequestStatus.REJECTED:
+        values["rejection_reason"] = reason
+    claimed = session.execute(
+        update(OvertimeRequest)
+        .where(OvertimeRequest.id == request.id, OvertimeRequest.status == old_status)
+        .values(**with_change_seqs(session, [values])[0])
+        .returning(OvertimeRequest.id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if claimed is None:
+        raise ValidationError("A kérelmet közben más elbírálta", status_code=409)
+    session.refresh(request)
+
+    # Egyenleg könyvelése ugyanabban a tranzakcióban, csak a sikeres állapotváltás után
+    OvertimeLedgerService(session).record_status_change(request, old_status)
+    if old_status != request.status:
+        # Változatlan állapotú újraelbírálás nem küld újabb eseményt a bérszámfejtésnek
+        publish_overtime_reviewed(session, request)
+    return old_status
+
+
 def approve_overtime_request(request_id: int, reviewer_id: int) -> Optional[OvertimeRequest]:
     """Túlóra kérelem jóváhagyása."""
     request = get_overtime_request_by_id(request_id)
     if request and request.status == RequestStatus.PENDING:
-        request.status = RequestStatus.APPROVED
-        request.reviewed_by = reviewer_id
-        request.reviewed_at = datetime.now()
-        db.session.commit()
+        with transaction(db.session):
+            review_overtime_request(db.session, request, RequestStatus.APPROVED, reviewer_id)
     return request
 
 
@@ -205,11 +251,8 @@ def reject_overtime_request(request_id: int, reviewer_id: int, reason: str) -> O
     """Túlóra kérelem elutasítása."""
     request = get_overtime_request_by_id(request_id)
     if request and request.status == RequestStatus.PENDING:
-        request.status = RequestStatus.REJECTED
-        request.reviewed_by = reviewer_id
-        request.reviewed_at = datetime.now()
-        request.rejection_reason = reason
-        db.session.commit()
+        with transaction(db.session):
+            review_overtime_request(db.session, request, RequestStatus.REJECTED, reviewer_id, reason)
     return request
 
 
@@ -227,7 +270,7 @@ def create_modification_request(user_id: int, work_session_id: int,
         requested_work_location=changes.get('work_location')
     )
     db.session.add(request)
-    db.session.commit()
+    commit_or_flush(db.session)
     return request
 
 
@@ -273,8 +316,9 @@ def approve_modification_request(request_id: int, reviewer_id: int) -> Optional[
         request.status = RequestStatus.APPROVED
         request.reviewed_by = reviewer_id
         request.reviewed_at = datetime.now()
+        publish_session(db.session, SESSION_MODIFIED, record, modification_id=request.id)
 
-        db.session.commit()
+        commit_or_flush(db.session)
     return request
 
 
@@ -286,7 +330,7 @@ def reject_modification_request(request_id: int, reviewer_id: int, reason: str)
         request.reviewed_by = reviewer_id
         request.reviewed_at = datetime.now()
         request.rejection_reason = reason
-        db.session.commit()
+        commit_or_flush(db.session)
     return request
 
 
@@ -305,7 +349,7 @@ def create_audit_log(action: str, user_id: Optional[int] = None,
         ip_address=ip_address
     )
     db.session.add(log)
-    db.session.commit()
+    commit_or_flush(db.session)
     return log
 
 
@@ -329,13 +373,13 @@ def get_audit_logs(user_id: Optional[int] = None,
 # ==================== SYSTEM SETTINGS CRUD ====================
 
 def get_setting(key: str) -> Optional[str]:
-    """Rendszerbeállítás lekérése."""
-    setting = db.session.query(SystemSettings).filter(SystemSettings.key == key).first()
-    return setting.value if setting else None
+    """Rendszerbeállítás lekérése a folyamaton belüli cache-ből."""
+    return settings_cache.get(key)
 
 
 def set_setting(key: str, value: str, updated_by: int, description: Optional[str] = None) -> SystemSettings:
-    """Rendszerbeállítás mentése vagy módosítása."""
+    """Rendszerbeállítás mentése vagy módosítása (ismert kulcsnál ellenőrzött értékkel, különben ValidationError)."""
+    value = validate_setting(key, value)
     setting = db.session.query(SystemSettings).filter(SystemSettings.key == key).first()
 
     if setting:
@@ -352,7 +396,10 @@ def set_setting(key: str, value: str, updated_by: int, description: Optional[str
         )
         db.session.add(setting)
 
-    db.session.commit()
+    # A többi worker a verziószám alapján tölti újra a cache-t
+    bump_version(db.session, SETTINGS_VERSION_NAME)
+    commit_or_flush(db.session)
+    settings_cache.invalidate()
     return setting
 
 
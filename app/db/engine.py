@@ -1,8 +1,15 @@
+import os
+import re
+
 from app.db.base import Base
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 
 # Flask-SQLAlchemy inicializálás
-db = SQLAlchemy()
+# expire_on_commit=False: a commit után visszaadott objektumok attribútumainak
+# olvasása (record.id, user.username) nem indít újabb SELECT-et
+db = SQLAlchemy(session_options={"expire_on_commit": False})
 
 
 def init_db(app):
@@ -21,8 +28,15 @@ def init_db(app):
     with app.app_context():
         # Importáljuk a modelleket, hogy az SQLAlchemy felismerje őket
         from app.db import models  # noqa: F401
+
+        if app.config.get("DB_STARTUP_MODE") == "production":
+            # Production: nincs DDL és seed, a sémát az Alembic kezeli,
+            # csak egy olcsó lekérdezéssel ellenőrizzük a revíziót
+            verify_schema_revision(app)
+            return
+
         # Táblák létrehozása (csak dev módban! Production-ban Alembic-et használj)
-        db.create_all()
+        # A modellek a saját Base-ükön vannak, ezért elég ez az egy create_all
         Base.metadata.create_all(bind=db.engine)
 
         # 2 user és 1 admin létrehozása alapból
@@ -31,6 +45,66 @@ def init_db(app):
         print("Database initialized successfully!")
 
 
+_REVISION_RE = re.compile(r"^revision\s*=\s*['\"]([^'\"]+)['\"]", re.M)
+_DOWN_REVISION_RE = re.compile(r"^down_revision\s*=\s*['\"]([^'\"]+)['\"]", re.M)
+
+
+def alembic_head_revision(app) -> str:
+    """
+    Az Alembic migrációk head revíziója a migrációs fájlokból, DB nélkül.
+    Az alembic csomag importálása helyett csak a revision/down_revision sorokat olvassa.
+    """
+    versions_dir = app.config["ALEMBIC_VERSIONS_DIR"]
+    revisions, parents = set(), set()
+    for name in os.listdir(versions_dir):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(versions_dir, name), encoding="utf-8") as f:
+            source = f.read()
+        revision = _REVISION_RE.search(source)
+        if revision:
+            revisions.add(revision.group(1))
+        parents.update(_DOWN_REVISION_RE.findall(source))
+
+    heads = revisions - parents
+    if len(heads) != 1:
+        raise RuntimeError(f"Nem egyértelmű Alembic head: {sorted(heads)}")
+    return heads.pop()
+
+
+def verify_schema_revision(app):
+    """
+    Ellenőrzi, hogy az adatbázis az Alembic head revízión van-e.
+    Egyetlen SELECT az alembic_version táblára; eltérés esetén nem indul el az app.
+    """
+    expected = app.config.get("ALEMBIC_EXPECTED_HEAD") or alembic_head_revision(app)
+    try:
+        current = db.session.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except SQLAlchemyError:
+        current = None
+    finally:
+        db.session.remove()
+
+    if current != expected:
+        raise RuntimeError(
+            f"Az adatbázis séma revíziója ({current}) nem egyezik az Alembic head-del ({expected}). "
+            "Futtasd: alembic upgrade head"
+        )
+
+
+def dispose_engines(app):
+    """
+    Fork után (gunicorn preload_app) hívandó: a szülőtől örökölt pool kapcsolatait
+    nem zárja le, csak eldobja, így minden worker saját kapcsolatokat nyit.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    replica_engine = app.extensions.get("replica_engine")
+    if replica_engine is not None:
+        replica_engine.dispose(close=False)
+
+
 def get_db():
     """
     Aktuális adatbázis session lekérése.
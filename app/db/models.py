@@ -1,7 +1,12 @@
 from datetime import datetime
 from enum import Enum as PyEnum
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Date
-from sqlalchemy.orm import relationship
+from typing import List
+
+from sqlalchemy import (
+    Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Date, Index, event,
+    insert, update,
+)
+from sqlalchemy.orm import Session, relationship
 from app.db.base import Base
 from sqlalchemy.sql import func
 
@@ -49,6 +54,37 @@ class User(Base):
         return f"<User(id={self.id}, username='{self.username}', role='{self.role.value}')>"
 
 
+OPEN_SESSION_INDEX = 'uq_work_sessions_open_per_user'
+
+
+# A cache_versions "change_seq" sora a változás-feed számlálója
+CHANGE_SEQ_NAME = "change_seq"
+
+
+def reserve_change_seqs(connection, count: int = 1) -> List[int]:
+    """
+    count darab globális változás-sorszám lefoglalása a számlálósor egyetlen UPDATE-jével.
+
+    A sorzár a tranzakció végéig él, így a következő foglaló megvárja az előző
+    commitját: a sorszámok a commitok sorrendjében válnak láthatóvá, és a számláló
+    commitolt értéke alatt nincs még nyitott tranzakcióhoz tartozó sorszám (ezt
+    használja a ChangeFeedService kurzora). Flush-onként egy foglalás történik
+    (a _assign_change_seqs listener), nem soronként.
+    """
+    if count <= 0:
+        return []
+
+    table = CacheVersion.__table__
+    last = connection.execute(
+        update(table).where(table.c.name == CHANGE_SEQ_NAME)
+        .values(version=table.c.version + count).returning(table.c.version)
+    ).scalar()
+    if last is None:
+        connection.execute(insert(table).values(name=CHANGE_SEQ_NAME, version=count))
+        last = count
+    return list(range(last - count + 1, last + 1))
+
+
 class AttendanceRecord(Base):
     __tablename__ = 'work_sessions'
 
@@ -62,12 +98,27 @@ class AttendanceRecord(Base):
     is_overtime_generated = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    change_seq = Column(Integer, nullable=False, index=True)
+
+    __table_args__ = (
+        # Felhasználónként legfeljebb egy nyitott munkamenet (részleges unique index)
+        Index(
+            OPEN_SESSION_INDEX, user_id, unique=True,
+            sqlite_where=check_out.is_(None), postgresql_where=check_out.is_(None),
+        ),
+    )
 
     # Kapcsolatok
     user = relationship("User", back_populates="work_sessions", foreign_keys=[user_id])
     overtime_request = relationship("OvertimeRequest", back_populates="work_session", uselist=False)
     modification_requests = relationship("ModificationRequest", back_populates="work_session")
 
+    @staticmethod
+    def is_open_session_conflict(error) -> bool:
+        """IntegrityError a nyitott munkamenet unique indexből ered-e (SQLite és PostgreSQL üzenet)."""
+        message = str(getattr(error, "orig", error))
+        return OPEN_SESSION_INDEX in message or "work_sessions.user_id" in message
+
     def calculate_duration(self):
         """Kiszámolja a munkaidőt percekben."""
         if self.check_out and self.check_in:
@@ -94,6 +145,7 @@ class OvertimeRequest(Base):
     is_auto_generated = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    change_seq = Column(Integer, nullable=False, index=True)
 
     # Kapcsolatok
     requester = relationship("User", back_populates="overtime_requests", foreign_keys=[user_id])
@@ -120,6 +172,7 @@ class ModificationRequest(Base):
     rejection_reason = Column(Text, nullable=True)
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    change_seq = Column(Integer, nullable=False, index=True)
 
     # Kapcsolatok
     requester = relationship("User", back_populates="modification_requests", foreign_keys=[user_id])
@@ -163,4 +216,206 @@ class SystemSettings(Base):
     updated_by_user = relationship("User", back_populates="system_settings_updates")
 
     def __repr__(self):
-        return f"<SystemSettings(id={self.id}, key='{self.key}', value='{self.value}')>"
\ No newline at end of file
+        return f"<SystemSettings(id={self.id}, key='{self.key}', value='{self.value}')>"
+
+
+class OvertimeBalance(Base):
+    __tablename__ = 'overtime_balances'
+
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    approved_minutes = Column(Integer, default=0, nullable=False)
+    approved_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<OvertimeBalance(user_id={self.user_id}, approved_minutes={self.approved_minutes})>"
+
+
+class OvertimeLedgerEntry(Base):
+    __tablename__ = 'overtime_ledger_entries'
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    overtime_request_id = Column(Integer, ForeignKey('overtime_requests.id'), nullable=True, index=True)
+    delta_minutes = Column(Integer, nullable=False)
+    balance_after = Column(Integer, nullable=False)
+    description = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<OvertimeLedgerEntry(id={self.id}, user_id={self.user_id}, delta={self.delta_minutes}, balance={self.balance_after})>"
+
+
+class CacheVersion(Base):
+    __tablename__ = 'cache_versions'
+
+    name = Column(String(100), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<CacheVersion(name='{self.name}', version={self.version})>"
+
+class RevokedToken(Base):
+    __tablename__ = 'revoked_tokens'
+
+    jti = Column(String(64), primary_key=True)
+    user_id = Column(Integer, nullable=True)  # nincs FK, mint a user_token_revocations-nél
+    expires_at = Column(DateTime, nullable=True, index=True)  # UTC, a token lejárata
+    revoked_at = Column(DateTime, default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<RevokedToken(jti='{self.jti}', user_id={self.user_id})>"
+
+
+class UserTokenRevocation(Base):
+    __tablename__ = 'user_token_revocations'
+
+    # Az ennél nem később kiadott (iat) tokenek érvénytelenek.
+    # Nincs FK: végleges törlés után is meg kell maradnia.
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    revoked_before = Column(DateTime, nullable=False)  # UTC
+
+    def __repr__(self):
+        return f"<UserTokenRevocation(user_id={self.user_id}, revoked_before={self.revoked_before})>"
+
+
+class KioskEvent(Base):
+    __tablename__ = 'kiosk_events'
+
+    # A kioszk által generált egyedi esemény azonosító (duplikáció-szűrés újraküldéskor)
+    event_id = Column(String(64), primary_key=True)
+    kiosk_id = Column(String(64), nullable=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    event_type = Column(String(16), nullable=False)
+    occurred_at = Column(DateTime, nullable=False)
+    work_session_id = Column(Integer, ForeignKey('work_sessions.id'), nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<KioskEvent(event_id='{self.event_id}', user_id={self.user_id}, type='{self.event_type}')>"
+
+
+class IdempotencyKey(Base):
+    __tablename__ = 'idempotency_keys'
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # metódus + útvonal + body sha256
+    status_code = Column(Integer, nullable=True)  # NULL: a kérés még fut
+    response_body = Column(Text, nullable=True)
+    mimetype = Column(String(100), nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<IdempotencyKey(user_id={self.user_id}, key='{self.key}', status={self.status_code})>"
+
+
+class OutboxEvent(Base):
+    __tablename__ = 'outbox_events'
+
+    id = Column(Integer, primary_key=True)  # kiküldési sorrend
+    event_type = Column(String(50), nullable=False)
+    user_id = Column(Integer, nullable=False, index=True)
+    payload = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    dispatched_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # A dispatcher a ki nem küldött eseményeket id szerint olvassa
+        Index('ix_outbox_events_pending', dispatched_at, id),
+    )
+
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, type='{self.event_type}', user_id={self.user_id})>"
+
+
+class Holiday(Base):
+    __tablename__ = 'holidays'
+
+    day = Column(Date, primary_key=True)  # munkaszüneti nap mindenkinek
+    name = Column(String(100), nullable=False)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<Holiday(day={self.day}, name='{self.name}')>"
+
+
+class WorkSchedule(Base):
+    __tablename__ = 'work_schedules'
+
+    # Heti munkarend valid_from naptól a következő bejegyzésig (pl. részmunkaidőre váltás)
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    valid_from = Column(Date, primary_key=True)
+    mon_minutes = Column(Integer, default=480, nullable=False)
+    tue_minutes = Column(Integer, default=480, nullable=False)
+    wed_minutes = Column(Integer, default=480, nullable=False)
+    thu_minutes = Column(Integer, default=480, nullable=False)
+    fri_minutes = Column(Integer, default=480, nullable=False)
+    sat_minutes = Column(Integer, default=0, nullable=False)
+    sun_minutes = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    WEEKDAY_COLUMNS = ('mon_minutes', 'tue_minutes', 'wed_minutes', 'thu_minutes',
+                       'fri_minutes', 'sat_minutes', 'sun_minutes')
+
+    @property
+    def weekly_minutes(self):
+        return [getattr(self, column) for column in self.WEEKDAY_COLUMNS]
+
+    def __repr__(self):
+        return f"<WorkSchedule(user_id={self.user_id}, valid_from={self.valid_from})>"
+
+
+class BackgroundJob(Base):
+    __tablename__ = 'background_jobs'
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    job_type = Column(String(50), nullable=False)
+    params = Column(Text, nullable=False)  # JSON
+    status = Column(String(20), default='queued', nullable=False)  # queued / running / succeeded / failed
+    progress = Column(Integer, default=0, nullable=False)  # 0-100
+    message = Column(String(255), nullable=True)
+    error = Column(Text, nullable=True)
+    result_path = Column(Text, nullable=True)
+    result_filename = Column(String(255), nullable=True)
+    result_mimetype = Column(String(100), nullable=True)
+    created_by = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=False)  # utolsó életjel (létrehozás, előrehaladás)
+    expires_at = Column(DateTime, nullable=True, index=True)  # az eredmény eddig tárolódik
+
+    __table_args__ = (
+        # Félbemaradt (queued / running, régi életjelű) feladatok keresése induláskor
+        Index('ix_background_jobs_status_heartbeat', status, heartbeat_at),
+    )
+
+    def __repr__(self):
+        return f"<BackgroundJob(id='{self.id}', type='{self.job_type}', status='{self.status}')>"
+
+
+# --- Változás-sorszám ORM flush-nál ---
+
+CHANGE_FEED_MODELS = (AttendanceRecord, OvertimeRequest, ModificationRequest)
+
+
+@event.listens_for(Session, "before_flush")
+def _assign_change_seqs(session, flush_context, instances):
+    """
+    Új és módosult feed sorok sorszáma flush-onként egyetlen foglalással
+    (a bulk útvonalak a versioning.with_change_seqs-t használják).
+    """
+    changed = [obj for obj in session.new if isinstance(obj, CHANGE_FEED_MODELS)]
+    changed += [
+        obj for obj in session.dirty
+        if isinstance(obj, CHANGE_FEED_MODELS) and session.is_modified(obj, include_collections=False)
+    ]
+    if changed:
+        for obj, seq in zip(changed, reserve_change_seqs(session.connection(), len(changed))):
+            obj.change_seq = seq
@@ -0,0 +1,125 @@
+# Csak olvasó listázások ORM entitások nélkül: Core select() pontosan a szükséges
+# oszlopokkal, az eredmény Row (névvel is címezhető tuple), ebből közvetlenül készül
+# a JSON – nincs identity map, attribútum instrumentáció és lusta kapcsolat betöltés.
+# A kimenet mezőről mezőre megegyezik a korábbi ORM alapú válaszokkal.
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.db.models import AttendanceRecord, ModificationRequest, RequestStatus, User
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+# --- Jelenlét rekordok (admin teljes lista) ---
+
+ATTENDANCE_COLUMNS = (
+    AttendanceRecord.id, AttendanceRecord.user_id, AttendanceRecord.check_in, AttendanceRecord.check_out,
+    AttendanceRecord.work_location, AttendanceRecord.work_duration, AttendanceRecord.date,
+    AttendanceRecord.is_overtime_generated, AttendanceRecord.created_at, AttendanceRecord.updated_at,
+)
+
+
+def attendance_record_rows(session: Session) -> List[Row]:
+    return session.execute(select(*ATTENDANCE_COLUMNS)).all()
+
+
+def attendance_record_dicts(session: Session) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": id_,
+            "user_id": user_id,
+            "check_in": _iso(check_in),
+            "check_out": _iso(check_out),
+            "work_location": work_location.value,
+            "work_duration": work_duration,
+            "date": _iso(day),
+            "is_overtime_generated": is_overtime_generated,
+            "created_at": _iso(created_at),
+            "updated_at": _iso(updated_at),
+        }
+        for (id_, user_id, check_in, check_out, work_location, work_duration, day,
+             is_overtime_generated, created_at, updated_at) in attendance_record_rows(session)
+    ]
+
+
+# --- Egy felhasználó jelenlétei (admin felület) ---
+
+def find_user_id(session: Session, identifier: str) -> Optional[int]:
+    """Felhasználó azonosító numerikus id vagy felhasználónév alapján."""
+    condition = User.id == int(identifier) if identifier.isdigit() else User.username == identifier
+    return session.execute(select(User.id).where(condition)).scalar_one_or_none()
+
+
+def user_attendance_rows(session: Session, user_id: int, start_date: Optional[date] = None,
+                         end_date: Optional[date] = None) -> List[Row]:
+    query = (
+        select(AttendanceRecord.date, AttendanceRecord.check_in, AttendanceRecord.check_out,
+               AttendanceRecord.work_location)
+        .where(AttendanceRecord.user_id == user_id)
+        .order_by(AttendanceRecord.check_in.desc())
+    )
+    if start_date:
+        query = query.where(AttendanceRecord.date >= start_date)
+    if end_date:
+        query = query.where(AttendanceRecord.date <= end_date)
+    return session.execute(query).all()
+
+
+def user_attendance_dicts(session: Session, user_id: int, start_date: Optional[date] = None,
+                          end_date: Optional[date] = None) -> List[Dict[str, Any]]:
+    return [
+        {
+            "date": _iso(day),
+            "check_in": _iso(check_in),
+            "check_out": _iso(check_out),
+            "work_location": work_location.value,
+            # Munkaidő percben – ha van check_in és check_out
+            "work_duration": int((check_out - check_in).total_seconds() // 60) if check_in and check_out else None,
+        }
+        for day, check_in, check_out, work_location in user_attendance_rows(session, user_id, start_date, end_date)
+    ]
+
+
+# --- Módosítási kérelmek (admin lista) ---
+
+def modification_request_rows(session: Session, status: Optional[RequestStatus] = None) -> List[Row]:
+    """Kérelmek a kérelmező nevével és a munkamenet napjával, egyetlen lekérdezésben (N+1 helyett)."""
+    query = (
+        select(ModificationRequest.id, ModificationRequest.user_id, User.username,
+               ModificationRequest.work_session_id, AttendanceRecord.date,
+               ModificationRequest.requested_check_in, ModificationRequest.requested_check_out,
+               ModificationRequest.requested_work_location, ModificationRequest.reason,
+               ModificationRequest.status, ModificationRequest.created_at)
+        .outerjoin(User, User.id == ModificationRequest.user_id)
+        .outerjoin(AttendanceRecord, AttendanceRecord.id == ModificationRequest.work_session_id)
+        .order_by(ModificationRequest.id)
+    )
+    if status is not None:
+        query = query.where(ModificationRequest.status == status)
+    return session.execute(query).all()
+
+
+def modification_request_dicts(session: Session, status: Optional[RequestStatus] = None) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": id_,
+            "user_id": user_id,
+            "username": username,
+            "work_session_id": work_session_id,
+            "date": _iso(day),
+            "requested_check_in": _iso(requested_check_in),
+            "requested_check_out": _iso(requested_check_out),
+            "requested_work_location": requested_work_location.value if requested_work_location else None,
+            "reason": reason,
+            "status": status_.value,
+            "created_at": created_at.isoformat(),
+        }
+        for (id_, user_id, username, work_session_id, day, requested_check_in, requested_check_out,
+             requested_work_location, reason, status_, created_at) in modification_request_rows(session, status)
+    ]
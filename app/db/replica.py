@@ -0,0 +1,156 @@
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from flask import g, has_request_context, request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.engine import db
+
+# Cookie, amely írás után egy ideig a primary-ra tereli a felhasználó olvasásait
+PRIMARY_COOKIE = "wt_primary_until"
+# A replika sessionök jelölése a session.info-ban (lásd is_replica_session)
+REPLICA_INFO_KEY = "replica"
+
+
+def _reject_writes(session, flush_context, instances):
+    raise RuntimeError("A replika session csak olvasásra használható")
+
+
+class ReplicaRouter:
+    """
+    Olvasás/írás szétválasztás: a riport és listázó lekérdezések a
+    REPLICA_DATABASE_URI adatbázisra mennek, minden írás a primary-ra.
+
+    Read-your-writes: írás után REPLICA_STICKY_SECONDS ideig az adott
+    felhasználó saját olvasásai a primary-ról szolgálódnak ki. A jelzés
+    folyamaton belül és cookie-ban is megjelenik, így másik worker is
+    tiszteletben tartja.
+    """
+
+    def __init__(self, clock=time.time):
+        self._session_factory: Optional[sessionmaker] = None
+        self._recent_writes: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self.sticky_seconds = 10.0
+        self.clock = clock
+
+    @property
+    def enabled(self) -> bool:
+        return self._session_factory is not None
+
+    def init_app(self, app):
+        self.sticky_seconds = float(app.config.get("REPLICA_STICKY_SECONDS", self.sticky_seconds))
+        uri = app.config.get("REPLICA_DATABASE_URI")
+        if not uri:
+            self._session_factory = None
+            return
+
+        engine = create_engine(uri)
+        self._session_factory = sessionmaker(bind=engine, info={REPLICA_INFO_KEY: True})
+        app.extensions["replica_engine"] = engine
+
+        # Fejlesztői módban a helyi SQLite replika induláskor felveszi a primary állapotát
+        if app.config.get("DB_STARTUP_MODE") != "production" and _is_sqlite_file(uri) \
+                and _is_sqlite_file(app.config["SQLALCHEMY_DATABASE_URI"]):
+            sync_sqlite_replica(app.config["SQLALCHEMY_DATABASE_URI"], uri)
+
+        @app.teardown_appcontext
+        def close_read_session(exc):
+            session = g.pop("_replica_session", None)
+            if session is not None:
+                session.close()
+
+        @app.after_request
+        def set_primary_cookie(response):
+            until = g.pop("_primary_until", None)
+            if until is not None:
+                response.set_cookie(PRIMARY_COOKIE, f"{until:.3f}", max_age=int(self.sticky_seconds) + 1,
+                                    httponly=True, samesite="Lax")
+            return response
+
+    # --- Read-your-writes ---
+
+    def mark_write(self, user_id: int) -> Optional[float]:
+        """
+        Írás után hívandó: a felhasználó olvasásai egy ideig a primary-ra mennek.
+        Visszatér a határidővel (cookie értéke), replika nélkül None.
+        """
+        if not self.enabled:
+            return None
+        until = self.clock() + self.sticky_seconds
+        with self._lock:
+            self._recent_writes[user_id] = until
+            if len(self._recent_writes) > 10_000:
+                now = self.clock()
+                self._recent_writes = {k: v for k, v in self._recent_writes.items() if v > now}
+        if has_request_context():
+            g._primary_until = until
+        return until
+
+    def _needs_primary(self, user_id: Optional[int]) -> bool:
+        now = self.clock()
+        if user_id is not None and self._recent_writes.get(user_id, 0.0) > now:
+            return True
+        if has_request_context():
+            try:
+                return float(request.cookies.get(PRIMARY_COOKIE, "0")) > now
+            except ValueError:
+                return False
+        return False
+
+    # --- Session választás ---
+
+    def read_session(self, user_id: Optional[int] = None) -> Session:
+        """
+        Olvasási session. Replika nélkül, vagy ha user_id friss írása még nem
+        látszhat a replikán, a primary db.session-t adja.
+        """
+        if not self.enabled or self._needs_primary(user_id):
+            return db.session
+
+        session = g.get("_replica_session")
+        if session is None:
+            session = self._session_factory()
+            event.listen(session, "before_flush", _reject_writes)
+            g._replica_session = session
+        return session
+
+
+def _is_sqlite_file(uri: str) -> bool:
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" and bool(url.database) and url.database != ":memory:"
+
+
+def sync_sqlite_replica(primary_uri: str, replica_uri: str, pages: int = -1) -> None:
+    """
+    SQLite primary másolása a replika fájlba a backup API-val (helyi teszteléshez).
+    A replikát nyitva tartó kapcsolatok a másolás után azonnal az új adatot látják.
+    """
+    for uri in (primary_uri, replica_uri):
+        if not _is_sqlite_file(uri):
+            raise ValueError(f"Csak fájl alapú SQLite adatbázis szinkronizálható: {uri}")
+
+    source = sqlite3.connect(make_url(primary_uri).database)
+    target = sqlite3.connect(make_url(replica_uri).database)
+    try:
+        source.backup(target, pages=pages)
+    finally:
+        target.close()
+        source.close()
+
+
+def is_replica_session(session: Session) -> bool:
+    """Igaz, ha a session a (késésben lehető) replikáról olvas."""
+    return bool(session.info.get(REPLICA_INFO_KEY))
+
+
+def read_db(user_id: Optional[int] = None) -> Session:
+    """Rövidítés route-okhoz, a get_db() olvasási párja."""
+    return replica_router.read_session(user_id)
+
+
+replica_router = ReplicaRouter()
@@ -0,0 +1,128 @@
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import has_app_context
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.models import SystemSettings
+from app.db.versioning import read_version
+from app.utils.error_handler import ValidationError
+
+SETTINGS_VERSION_NAME = "system_settings"
+
+# Üzleti küszöbök kulcsai
+OVERTIME_THRESHOLD_KEY = "overtime_threshold_minutes"
+
+# Alapértékek, ha az adatbázisban nincs felülírva
+DEFAULT_SETTINGS: Dict[str, str] = {
+    OVERTIME_THRESHOLD_KEY: "540",  # 9 óra
+}
+
+# Egész értékű beállítások megengedett tartománya (a get_int hibás értéknél csendben az alapértékre esne vissza)
+INT_SETTING_RANGES: Dict[str, Tuple[int, int]] = {
+    OVERTIME_THRESHOLD_KEY: (1, 24 * 60),
+}
+
+
+def validate_setting(key: str, value) -> str:
+    """Mentés előtti ellenőrzés; visszatér a tárolandó (normalizált) szöveges értékkel."""
+    value = str(value).strip()
+    if key in INT_SETTING_RANGES:
+        low, high = INT_SETTING_RANGES[key]
+        try:
+            number = int(value)
+        except ValueError:
+            raise ValidationError(f"A(z) '{key}' értékének egész számnak kell lennie")
+        if not low <= number <= high:
+            raise ValidationError(f"A(z) '{key}' értéke {low} és {high} között lehet")
+        value = str(number)
+    return value
+
+
+class SettingsCache:
+    """
+    Folyamaton belüli SystemSettings pillanatkép.
+
+    Induláskor egyszer betölti az összes beállítást, utána legfeljebb
+    `check_interval` másodpercenként egy olcsó verziószám-lekérdezéssel
+    ellenőrzi, hogy másik worker módosított-e valamit (`crud.set_setting`
+    növeli a számlálót). Csak eltérő verzió esetén tölt újra.
+    """
+
+    def __init__(self, defaults: Optional[Dict[str, str]] = None, check_interval: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self._defaults = dict(defaults or {})
+        self._values: Dict[str, str] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._session_factory: Optional[Callable[[], Session]] = None
+        self._requires_app_context = False
+        self.check_interval = check_interval
+        self.clock = clock
+
+    def init_app(self, app, session_factory: Optional[Callable[[], Session]] = None):
+        """Pillanatkép betöltése alkalmazás induláskor."""
+        from app.db.engine import db
+
+        self.check_interval = app.config.get("SETTINGS_CACHE_CHECK_INTERVAL", self.check_interval)
+        self._session_factory = session_factory or (lambda: db.session)
+        # A Flask-SQLAlchemy session csak app contextben érhető el
+        self._requires_app_context = session_factory is None
+        with app.app_context():
+            self.load(self._session_factory())
+
+    def load(self, session: Session):
+        """Összes beállítás betöltése egyetlen lekérdezéssel."""
+        # Előbb a verzió: ha közben módosul, a következő ellenőrzés újratölt
+        version = read_version(session, SETTINGS_VERSION_NAME)
+        rows = session.query(SystemSettings.key, SystemSettings.value).all()
+        with self._lock:
+            self._values = {key: value for key, value in rows}
+            self._version = version
+            self._checked_at = self.clock()
+
+    def invalidate(self):
+        """A következő olvasás kötelezően ellenőrzi a verziót."""
+        self._checked_at = float("-inf")
+
+    def refresh_if_stale(self):
+        """Verzió-ellenőrzés, ha eltelt a check_interval; eltérés esetén újratöltés."""
+        if self._version is None or self._session_factory is None:
+            return
+        if self._requires_app_context and not has_app_context():
+            return
+        if self.clock() - self._checked_at < self.check_interval:
+            return
+
+        with self._lock:
+            if self.clock() - self._checked_at < self.check_interval:
+                return
+            self._checked_at = self.clock()
+
+        try:
+            session = self._session_factory()
+            if read_version(session, SETTINGS_VERSION_NAME) != self._version:
+                self.load(session)
+        except SQLAlchemyError as e:
+            # Hiba esetén a régi pillanatkép marad érvényben
+            print("Settings cache refresh failed:", e)
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        self.refresh_if_stale()
+        value = self._values.get(key)
+        if value is None:
+            value = self._defaults.get(key, default)
+        return value
+
+    def get_int(self, key: str, default: Optional[int] = None) -> Optional[int]:
+        value = self.get(key)
+        try:
+            return int(value) if value is not None else default
+        except ValueError:
+            return default
+
+
+settings_cache = SettingsCache(DEFAULT_SETTINGS)
@@ -0,0 +1,96 @@
+import random
+from datetime import date, datetime, timedelta
+from typing import List
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.models import AttendanceRecord, User, UserRole, WorkLocation
+from app.db.versioning import bump_version, with_change_seqs
+from app.services.user_search_index import USERS_VERSION_NAME
+from app.utils.security import hash_password
+
+
+def create_synthetic_users(session: Session, count: int, prefix: str = "user",
+                           password: str = "password") -> List[int]:
+    """
+    Tesztfelhasználók tömeges létrehozása benchmarkokhoz és terheléses tesztekhez.
+    A bcrypt hash-t egyszer számolja ki, és egyetlen bulk INSERT-tel ír.
+    Visszatér a létrehozott felhasználók ID-jával.
+    """
+    password_hash = hash_password(password)
+    last_id = session.scalar(select(func.max(User.id))) or 0
+    rows = [
+        {
+            "username": f"{prefix}{i}",
+            "email": f"{prefix}{i}@example.com",
+            "password_hash": password_hash,
+            "role": UserRole.USER,
+            "is_active": True,
+        }
+        for i in range(count)
+    ]
+    if rows:
+        session.execute(insert(User), rows)
+        bump_version(session, USERS_VERSION_NAME)
+    session.commit()
+
+    return list(session.scalars(select(User.id).where(User.id > last_id).order_by(User.id)))
+
+
+def create_open_sessions(session: Session, user_ids: List[int], check_in: datetime,
+                         work_location: WorkLocation = WorkLocation.OFFICE) -> None:
+    """Felhasználónként egy nyitott munkamenet tömeges beszúrása (sweeper / jelenlét tesztekhez)."""
+    rows = [
+        {
+            "user_id": user_id,
+            "check_in": check_in,
+            "work_location": work_location,
+            "date": check_in.date(),
+            "is_overtime_generated": False,
+        }
+        for user_id in user_ids
+    ]
+    if rows:
+        session.execute(insert(AttendanceRecord), with_change_seqs(session, rows))
+    session.commit()
+
+
+def create_month_of_sessions(session: Session, user_ids: List[int], month: date,
+                             seed: int = 0, batch_size: int = 50_000) -> int:
+    """
+    Lezárt munkamenetek minden munkanapra (riport benchmarkokhoz).
+    Véletlenszerű érkezés 7:30–10:00 között, 6–10 óra munka, ~30% home office.
+    Visszatér a beszúrt sorok számával.
+    """
+    rng = random.Random(seed)
+    days = []
+    day = month.replace(day=1)
+    while day.month == month.month:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+
+    rows, total = [], 0
+    for user_id in user_ids:
+        for day in days:
+            check_in = datetime.combine(day, datetime.min.time()) + timedelta(minutes=450 + rng.randrange(150))
+            minutes = 360 + rng.randrange(240)
+            rows.append({
+                "user_id": user_id,
+                "check_in": check_in,
+                "check_out": check_in + timedelta(minutes=minutes),
+                "work_duration": minutes,
+                "work_location": WorkLocation.HOME_OFFICE if rng.random() < 0.3 else WorkLocation.OFFICE,
+                "date": day,
+                "is_overtime_generated": False,
+            })
+        if len(rows) >= batch_size:
+            session.execute(insert(AttendanceRecord), with_change_seqs(session, rows))
+            total += len(rows)
+            rows = []
+    if rows:
+        session.execute(insert(AttendanceRecord), with_change_seqs(session, rows))
+        total += len(rows)
+    session.commit()
+    return total
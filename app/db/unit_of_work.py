@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+
+from sqlalchemy.orm import Session
+
+_DEPTH_KEY = "unit_of_work_depth"
+
+
+@contextmanager
+def transaction(session: Session):
+    """
+    Unit of work: a blokkon belül csak flush történik, commit egyszer, a
+    legkülső blokk végén. Egymásba ágyazható, így több service hívás (vagy egy
+    route és a service-ei) egyetlen tranzakcióban futhat:
+
+        with transaction(db):
+            AttendanceService(db, user_id).check_out()
+            OvertimeLedgerService(db).record_status_change(...)
+
+    Kivétel esetén a legkülső szint rollbackel, a kivétel továbbmegy.
+    A mélység a session.info-ban van, így bármely Session-nel működik.
+    """
+    depth = session.info.get(_DEPTH_KEY, 0)
+    session.info[_DEPTH_KEY] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+    except BaseException:
+        if depth == 0:
+            session.rollback()
+        raise
+    finally:
+        session.info[_DEPTH_KEY] = depth
+
+
+def in_transaction(session: Session) -> bool:
+    """Igaz, ha a hívó egy (külső) transaction() blokkon belül fut."""
+    return session.info.get(_DEPTH_KEY, 0) > 0
+
+
+def commit_or_flush(session: Session):
+    """
+    Önálló hívásnál commit; transaction() blokkon belül csak flush,
+    a commitot a legkülső blokk végzi.
+    """
+    if in_transaction(session):
+        session.flush()
+    else:
+        session.commit()
@@ -0,0 +1,95 @@
+from typing import Dict, Iterable, List
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.models import CacheVersion, reserve_change_seqs
+from app.utils.cache import ATTENDANCE_TAG, invalidate_after_commit
+
+USER_SESSIONS_PREFIX = "user_sessions:"
+
+
+def read_version(session: Session, name: str) -> int:
+    """
+    Verziószámláló olvasása.
+    Egyetlen elsődleges kulcsos lekérdezés, ezért olcsó minden kérésnél is.
+    """
+    version = session.query(CacheVersion.version).filter(CacheVersion.name == name).scalar()
+    return version or 0
+
+
+def bump_version(session: Session, name: str) -> None:
+    """
+    Verziószámláló növelése a hívó tranzakciójában (commit nélkül).
+    Az atomikus UPDATE miatt párhuzamos workerek sem veszítenek el növelést.
+    """
+    _invalidate_shared_cache(session, [name])
+    result = session.execute(
+        update(CacheVersion)
+        .where(CacheVersion.name == name)
+        .values(version=CacheVersion.version + 1)
+    )
+    if result.rowcount:
+        return
+
+    # Első használat: a sor még nem létezik
+    try:
+        with session.begin_nested():
+            session.add(CacheVersion(name=name, version=1))
+    except IntegrityError:
+        # Egy másik worker közben létrehozta, elég növelni
+        session.execute(
+            update(CacheVersion)
+            .where(CacheVersion.name == name)
+            .values(version=CacheVersion.version + 1)
+        )
+
+
+def user_sessions_version_name(user_id: int) -> str:
+    """Felhasználónkénti számláló: a munkamenetei változásakor nő (per-user cache-ekhez)."""
+    return f"{USER_SESSIONS_PREFIX}{user_id}"
+
+
+def _invalidate_shared_cache(session: Session, names: Iterable[str]):
+    """
+    A munkamenet-számlálók növelése a közös (cross-worker) riport cache összesített bejegyzéseit
+    is érvényteleníti, összevontan. A felhasználónkénti bejegyzések kulcsa a számlálót tartalmazza,
+    azokhoz nem kell külön írás a cache-be.
+    """
+    if any(name.startswith(USER_SESSIONS_PREFIX) for name in names):
+        invalidate_after_commit(session, [ATTENDANCE_TAG], coalesce=True)
+
+
+def bump_versions(session: Session, names: Iterable[str]) -> None:
+    """
+    Több számláló növelése egyszerre (tömeges írási utakhoz, pl. sweeper).
+    Egy UPDATE ... WHERE name IN (...), a hiányzó sorok egy bulk INSERT-tel jönnek létre.
+    """
+    names = sorted(set(names))
+    if not names:
+        return
+    _invalidate_shared_cache(session, names)
+    session.execute(
+        update(CacheVersion)
+        .where(CacheVersion.name.in_(names))
+        .values(version=CacheVersion.version + 1)
+    )
+    existing = set(session.scalars(select(CacheVersion.name).where(CacheVersion.name.in_(names))))
+    missing = [name for name in names if name not in existing]
+    if not missing:
+        return
+    try:
+        with session.begin_nested():
+            session.execute(insert(CacheVersion), [{"name": name, "version": 1} for name in missing])
+    except IntegrityError:
+        # Közben egy másik worker létrehozott néhányat: egyenkénti növelés
+        for name in missing:
+            bump_version(session, name)
+
+
+def with_change_seqs(session: Session, rows: List[Dict]) -> List[Dict]:
+    """Bulk INSERT/UPDATE sorok change_seq értékkel, egyetlen foglalással az egész kötegre."""
+    for row, seq in zip(rows, reserve_change_seqs(session.connection(), len(rows))):
+        row["change_seq"] = seq
+    return rows
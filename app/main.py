@@ -1,23 +1,57 @@
-from flask import Flask, send_from_directory, redirect
+from flask import Flask, redirect
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from .config.settings import Config
 from .db.engine import init_db
+from .db.replica import replica_router
+from .db.settings_cache import settings_cache
+from .services.job_runner import job_runner
+from .services.presence_index import presence_index
+from .services.token_blocklist import token_blocklist
+from .services.user_search_index import user_search_index
 from .routes import auth_routes, user_routes, attendance_routes, admin_routes
 from app.utils.error_handler import register_error_handlers
+from app.cli import register_commands
+from app.utils.assets import init_assets, send_page
+from app.utils.cache import shared_cache
+from app.utils.compression import init_json_compression
+from app.utils.idempotency import init_idempotency
+from app.utils.rate_limit import init_rate_limiter
 
-def create_app():
+def create_app(config_class=Config):
     app = Flask(__name__, static_folder='../static', static_url_path='/static')
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
 
     # CORS és JWT beállítások
     CORS(app)
-    JWTManager(app)
+    jwt = JWTManager(app)
+    init_rate_limiter(app)
+    init_idempotency(app)
 
     # Adatbázis inicializálás
     with app.app_context():
         init_db(app)
 
+    # Riport olvasások replikára terelése (ha REPLICA_DATABASE_URI be van állítva)
+    replica_router.init_app(app)
+
+    # Beállítások pillanatképének betöltése (cross-worker verziókövetéssel)
+    settings_cache.init_app(app)
+    # Jelenléti index felépítése a nyitott munkamenetekből
+    presence_index.init_app(app)
+    # Typeahead felhasználó kereső index
+    user_search_index.init_app(app)
+    # Háttérfeladatok (hosszú riportok, exportok) process poolja
+    job_runner.init_app(app)
+    # Workerek között közös riport cache
+    shared_cache.init_app(app)
+    # Visszavont tokenek (kijelentkezés, letiltott felhasználók) memóriabeli ellenőrzése
+    token_blocklist.init_app(app, jwt)
+
+    # Fingerprintelt, előtömörített statikus fájlok és JSON gzip
+    init_assets(app)
+    init_json_compression(app)
+
     # Főoldal átirányítása a bejelentkezési oldalra
     @app.route('/')
     def index():
@@ -26,23 +60,24 @@ def create_app():
     # Login oldal kiszolgálása
     @app.route('/login')
     def login_page():
-        return send_from_directory(app.static_folder, 'login.html')
+        return send_page('login.html')
 
     # Register oldal kiszolgálása
     @app.route('/register')
     def register_page():
-        return send_from_directory(app.static_folder, 'register.html')
+        return send_page('register.html')
 
     # Dashboard oldal kiszolgálása
     @app.route('/dashboard')
     def dashboard_page():
-        return send_from_directory(app.static_folder, 'dashboard.html')
+        return send_page('dashboard.html')
 
     @app.route('/admin')
     def admin_page():
-        return send_from_directory(app.static_folder, 'admin.html')
+        return send_page('admin.html')
 
     register_error_handlers(app)
+    register_commands(app)
 
     # Blueprintek regisztrálása
     app.register_blueprint(auth_routes.bp, url_prefix="/api/auth")
@@ -53,6 +88,6 @@ def create_app():
     # 404 hibakezelő
     @app.errorhandler(404)
     def page_not_found(e):
-        return send_from_directory(app.static_folder, '404.html'), 404
+        return send_page('404.html'), 404
 
     return app
\ No newline at end of file
@@ -1,14 +1,28 @@
-from typing import Optional
+from datetime import date, datetime
 
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, current_app, jsonify, request, send_file, url_for
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 
-from app.db.crud import get_attendance_records_by_user
+from app.db.crud import get_all_settings, review_overtime_request, set_setting
 from app.db.engine import get_db
-from app.db.models import AttendanceRecord, User, ModificationRequest, RequestStatus, OvertimeRequest
+from app.db.read_models import (
+    attendance_record_dicts, find_user_id, modification_request_dicts, user_attendance_dicts
+)
+from app.db.replica import read_db
+from app.db.unit_of_work import transaction
+from app.db.models import User, RequestStatus, OvertimeRequest
 from app.services.report_service import ReportService
 from app.services.user_service import UserService
 from app.services.attendance_service import AttendanceService
+from app.services.change_feed import ChangeFeedService
+from app.services.heatmap_service import HeatmapService
+from app.services.job_runner import JOB_SUCCEEDED, PARQUET_EXPORT, PAYROLL_REPORT, JobRunner, job_runner
+from app.services.overtime_ledger import OvertimeLedgerService
+from app.services.payroll_report import PayrollReportService, parse_month
+from app.services.presence_index import presence_index
+from app.services.token_blocklist import token_blocklist
+from app.services.user_search_index import user_search_index
+from app.services.working_calendar import WorkingCalendarService
 from app.utils.decorators import admin_required
 from app.utils.timecalc import parse_dt
 
@@ -44,27 +58,7 @@ def get_all_users():
 @admin_required()
 def get_all_attendance_records():
     """List all attendance records from the database (admin only)."""
-    db = get_db()
-    records = db.query(AttendanceRecord).all()
-
-    records_list = [
-        {
-            "id": record.id,
-            "user_id": record.user_id,
-            "check_in": record.check_in.isoformat() if record.check_in else None,
-            "check_out": record.check_out.isoformat() if record.check_out else None,
-            "work_location": record.work_location.value if hasattr(record.work_location, 'value') else str(
-                record.work_location),
-            "work_duration": record.work_duration,
-            "date": record.date.isoformat() if record.date else None,
-            "is_overtime_generated": record.is_overtime_generated,
-            "created_at": record.created_at.isoformat() if record.created_at else None,
-            "updated_at": record.updated_at.isoformat() if record.updated_at else None,
-        }
-        for record in records
-    ]
-
-    return jsonify(records_list), 200
+    return jsonify(attendance_record_dicts(read_db())), 200
 
 
 @bp.get("/location-stats")
@@ -75,7 +69,7 @@ def get_user_location_stats():
     Home office vs office napok arány statisztika.
     Nem igényel paramétert.
     """
-    db = get_db()
+    db = read_db()
     service = ReportService(db)
     stats = service.get_location_stats()
     return jsonify(stats), 200
@@ -133,7 +127,7 @@ def get_user_summary():
       - start_date: opcionális (YYYY-MM-DD)
       - end_date: opcionális (YYYY-MM-DD)
     """
-    db = get_db()
+    db = read_db()
     service = ReportService(db)
     user_id = int(request.args.get("user_id"))
 
@@ -147,6 +141,184 @@ def get_user_summary():
     return jsonify(stats), 200
 
 
+@bp.get("/reports/balance")
+@jwt_required()
+@admin_required()
+def get_balance_report():
+    """
+    Elvárt vs. ledolgozott órák egyenlege (alulteljesítés jelzéséhez).
+    Query paraméterek:
+      - user_id: kötelező
+      - start_date, end_date: kötelező (YYYY-MM-DD)
+      - daily: opcionális, "1" esetén napi bontás is
+    """
+    try:
+        user_id = int(request.args.get("user_id"))
+        start_date = parse_dt(request.args.get("start_date"))
+        end_date = parse_dt(request.args.get("end_date"))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    service = ReportService(read_db())
+    return jsonify(service.get_balance(user_id, start_date, end_date,
+                                       daily=request.args.get("daily") == "1")), 200
+
+
+# --- Munkanaptár: ünnepnapok és heti munkarendek ---
+
+
+@bp.get("/holidays")
+@jwt_required()
+@admin_required()
+def list_holidays():
+    try:
+        year = int(request.args.get("year", datetime.now().year))
+    except ValueError:
+        return jsonify({"error": "A 'year' paraméternek egész számnak kell lennie."}), 400
+    return jsonify(WorkingCalendarService(read_db()).list_holidays(year)), 200
+
+
+@bp.put("/holidays/<day>")
+@jwt_required()
+@admin_required()
+def set_holiday(day: str):
+    """Body: {"name": "Nemzeti ünnep"}"""
+    try:
+        parsed = date.fromisoformat(day)
+    except ValueError:
+        return jsonify({"error": f"Érvénytelen dátum: {day}"}), 400
+    data = request.get_json() or {}
+    holiday = WorkingCalendarService(get_db()).set_holiday(parsed, data.get("name"))
+    return jsonify({"day": holiday.day.isoformat(), "name": holiday.name}), 200
+
+
+@bp.delete("/holidays/<day>")
+@jwt_required()
+@admin_required()
+def delete_holiday(day: str):
+    try:
+        parsed = date.fromisoformat(day)
+    except ValueError:
+        return jsonify({"error": f"Érvénytelen dátum: {day}"}), 400
+    WorkingCalendarService(get_db()).delete_holiday(parsed)
+    return jsonify({"message": "Ünnepnap törölve.", "day": parsed.isoformat()}), 200
+
+
+@bp.get("/users/<int:user_id>/work-schedules")
+@jwt_required()
+@admin_required()
+def list_work_schedules(user_id: int):
+    return jsonify(WorkingCalendarService(read_db()).list_schedules(user_id)), 200
+
+
+@bp.put("/users/<int:user_id>/work-schedules/<valid_from>")
+@jwt_required()
+@admin_required()
+def set_work_schedule(user_id: int, valid_from: str):
+    """Body: {"weekly_minutes": [480, 480, 480, 480, 240, 0, 0]} (hétfőtől vasárnapig)"""
+    try:
+        parsed = date.fromisoformat(valid_from)
+    except ValueError:
+        return jsonify({"error": f"Érvénytelen dátum: {valid_from}"}), 400
+    data = request.get_json() or {}
+    schedule = WorkingCalendarService(get_db()).set_schedule(user_id, parsed, data.get("weekly_minutes"))
+    return jsonify({"user_id": user_id, "valid_from": schedule.valid_from.isoformat(),
+                    "weekly_minutes": schedule.weekly_minutes}), 200
+
+
+@bp.get("/reports/payroll")
+@jwt_required()
+@admin_required()
+def get_payroll_report():
+    """
+    Havi bérszámfejtési riport minden aktív felhasználóra.
+    Query paraméterek:
+      - month: kötelező (YYYY-MM)
+      - format: opcionális, "csv" esetén letölthető fájl
+    """
+    db = read_db()
+    month = parse_month(request.args.get("month"))
+    report = PayrollReportService(
+        db,
+        late_after=current_app.config["PAYROLL_LATE_AFTER"],
+        short_day_minutes=current_app.config["PAYROLL_SHORT_DAY_MINUTES"],
+    ).monthly_report(month)
+
+    if request.args.get("format") == "csv":
+        return Response(
+            report.to_csv(index=False),
+            mimetype="text/csv",
+            headers={"Content-Disposition": f"attachment; filename=payroll-{month:%Y-%m}.csv"},
+        )
+    return jsonify({"month": f"{month:%Y-%m}", "users": PayrollReportService.to_records(report)}), 200
+
+
+@bp.post("/reports/payroll")
+@jwt_required()
+@admin_required()
+def enqueue_payroll_report():
+    """Havi bérszámfejtési riport háttérfeladatként. Body: {"month": "YYYY-MM", "format": "csv"|"json"}"""
+    return _enqueue_job(PAYROLL_REPORT, request.get_json(silent=True) or {})
+
+
+@bp.post("/exports/parquet")
+@jwt_required()
+@admin_required()
+def enqueue_parquet_export():
+    """Inkrementális Parquet export háttérfeladatként. Body: {"full": false}"""
+    return _enqueue_job(PARQUET_EXPORT, request.get_json(silent=True) or {})
+
+
+# --- Háttérfeladatok ---
+
+
+def _enqueue_job(job_type: str, params: dict):
+    job = job_runner.submit(get_db(), job_type, params, user_id=int(get_jwt_identity()))
+    status_url = url_for("admin.get_job", job_id=job.id)
+    response = jsonify({"job_id": job.id, "status": job.status, "status_url": status_url})
+    response.headers["Location"] = status_url
+    return response, 202
+
+
+@bp.post("/jobs")
+@jwt_required()
+@admin_required()
+def create_job():
+    """Body: {"type": "payroll_report" | "parquet_export", "params": {...}}"""
+    data = request.get_json(silent=True) or {}
+    return _enqueue_job(data.get("type"), data.get("params") or {})
+
+
+@bp.get("/jobs")
+@jwt_required()
+@admin_required()
+def list_jobs():
+    jobs = job_runner.list_recent(get_db(), limit=request.args.get("limit", 50, type=int))
+    return jsonify([JobRunner.to_dict(job) for job in jobs]), 200
+
+
+@bp.get("/jobs/<job_id>")
+@jwt_required()
+@admin_required()
+def get_job(job_id: str):
+    """Feladat állapota és előrehaladása (pollingra)."""
+    return jsonify(JobRunner.to_dict(job_runner.get(get_db(), job_id))), 200
+
+
+@bp.get("/jobs/<job_id>/result")
+@jwt_required()
+@admin_required()
+def download_job_result(job_id: str):
+    job = job_runner.get(get_db(), job_id)
+    if job.status != JOB_SUCCEEDED or not job.result_path:
+        return jsonify({"error": "A feladat eredménye még nem érhető el.", "status": job.status}), 409
+    try:
+        return send_file(job.result_path, mimetype=job.result_mimetype, as_attachment=True,
+                         download_name=job.result_filename)
+    except FileNotFoundError:
+        return jsonify({"error": "Az eredményfájl már törlődött."}), 410
+
+
 @bp.get("/user/<username>")
 @admin_required()
 def get_user_by_username(username: str):
@@ -206,33 +378,14 @@ def get_modification_requests():
     db = get_db()
     status_filter = request.args.get("status")
     
-    query = db.query(ModificationRequest)
+    status_enum = None
     if status_filter:
         try:
             status_enum = RequestStatus(status_filter)
-            query = query.filter(ModificationRequest.status == status_enum)
         except ValueError:
             pass # Ignore invalid status
-            
-    requests = query.all()
-    
-    result = []
-    for req in requests:
-        result.append({
-            "id": req.id,
-            "user_id": req.user_id,
-            "username": req.requester.username if req.requester else None,
-            "work_session_id": req.work_session_id,
-            "date": req.work_session.date.isoformat() if req.work_session and req.work_session.date else None,
-            "requested_check_in": req.requested_check_in.isoformat() if req.requested_check_in else None,
-            "requested_check_out": req.requested_check_out.isoformat() if req.requested_check_out else None,
-            "requested_work_location": req.requested_work_location.value if req.requested_work_location else None,
-            "reason": req.reason,
-            "status": req.status.value,
-            "created_at": req.created_at.isoformat(),
-        })
-        
-    return jsonify(result), 200
+
+    return jsonify(modification_request_dicts(db, status_enum)), 200
 
 
 @bp.post("/modification-requests/<int:request_id>/review")
@@ -323,18 +476,89 @@ def review_overtime_request(request_id: int):
     if not req_obj:
         return jsonify({"error": "A megadott túlóra kérelem nem található."}), 404
 
-    if approve:
-        req_obj.status = RequestStatus.APPROVED
-    else:
-        req_obj.status = RequestStatus.REJECTED
-        if hasattr(req_obj, "rejection_reason"):
-            req_obj.rejection_reason = reason
-
-    db.commit()
+    # Állapotváltás, egyenleg és bérszámfejtési outbox esemény egy tranzakcióban
+    new_status = RequestStatus.APPROVED if approve else RequestStatus.REJECTED
+    with transaction(db):
+        review_overtime_request(db, req_obj, new_status, int(get_jwt_identity()), reason)
 
     return jsonify({"message": "Túlóra kérelem elbírálva.", "status": req_obj.status.value}), 200
 
 
+@bp.get("/users/search")
+@jwt_required()
+@admin_required()
+def search_users():
+    """
+    Typeahead keresés felhasználónév / email prefixre (vagy pontos ID-ra).
+    Query paraméterek:
+      - q: kötelező, a keresett prefix
+      - limit: opcionális, alapból 10 (max. 50)
+    """
+    query = request.args.get("q", "")
+    try:
+        limit = min(int(request.args.get("limit", 10)), 50)
+    except ValueError:
+        return jsonify({"error": "A 'limit' paraméternek egész számnak kell lennie."}), 400
+
+    user_search_index.resync_if_stale(get_db())
+    return jsonify([entry._asdict() for entry in user_search_index.search(query, limit)]), 200
+
+
+@bp.get("/users/<int:user_id>/heatmap")
+@jwt_required()
+@admin_required()
+def get_user_heatmap(user_id: int):
+    """Felhasználó éves hőtérképe (year: opcionális, alapból az aktuális év)."""
+    try:
+        year = int(request.args.get("year", datetime.now().year))
+    except ValueError:
+        return jsonify({"error": "A 'year' paraméternek egész számnak kell lennie."}), 400
+
+    return jsonify(HeatmapService(read_db()).get_year(user_id, year)), 200
+
+
+@bp.post("/users/<int:user_id>/revoke-sessions")
+@jwt_required()
+@admin_required()
+def revoke_user_sessions(user_id: int):
+    """A felhasználó összes kiadott tokenjének visszavonása (minden eszközön kijelentkezik)."""
+    db = get_db()
+    if db.get(User, user_id) is None:
+        return jsonify({"error": "Felhasználó nem található."}), 404
+
+    token_blocklist.revoke_user(db, user_id, current_token=get_jwt())
+    return jsonify({"message": "A felhasználó munkamenetei visszavonva.", "user_id": user_id}), 200
+
+
+@bp.get("/users/<int:user_id>/overtime-balance")
+@jwt_required()
+@admin_required()
+def get_overtime_balance(user_id: int):
+    """Felhasználó jóváhagyott túlóra egyenlege a főkönyvből."""
+    db = get_db()
+    return jsonify(OvertimeLedgerService(db).get_balance(user_id)), 200
+
+
+@bp.get("/changes")
+@jwt_required()
+@admin_required()
+def get_changes():
+    """
+    Inkrementális változás-feed (munkamenetek, túlóra és módosítási kérelmek).
+    Query paraméterek:
+      - since: az előző válasz next_cursor értéke (első híváskor 0)
+      - limit: opcionális oldalméret
+    """
+    try:
+        since = int(request.args.get("since", 0))
+        limit = int(request.args.get("limit", current_app.config.get("CHANGE_FEED_DEFAULT_LIMIT", 500)))
+    except ValueError:
+        return jsonify({"error": "A 'since' és 'limit' paraméternek egész számnak kell lennie."}), 400
+
+    service = ChangeFeedService(read_db(), max_limit=current_app.config.get("CHANGE_FEED_MAX_LIMIT", 5000))
+    return jsonify(service.changes(since, limit)), 200
+
+
 # --- Felhasználó jelenlétek – admin.js által hívott endpoint ---
 
 
@@ -345,7 +569,7 @@ def user_attendance(identifier: str):
     """
     identifier: lehet numerikus user_id vagy felhasználónév.
     """
-    db = get_db()
+    db = read_db()
     start_str = request.args.get("from")
     end_str = request.args.get("to")
 
@@ -356,33 +580,80 @@ def user_attendance(identifier: str):
         return jsonify({"error": str(e)}), 400
 
     # Felhasználó keresése ID vagy username alapján
-    user: Optional[User] = None
-    if identifier.isdigit():
-        user = db.query(User).filter_by(id=int(identifier)).first()
-    else:
-        user = db.query(User).filter_by(username=identifier).first()
-
-    if not user:
+    user_id = find_user_id(db, identifier)
+    if user_id is None:
         return jsonify({"error": "Felhasználó nem található."}), 404
 
-    records = get_attendance_records_by_user(user.id, start_date=start_date, end_date=end_date)
+    return jsonify(user_attendance_dicts(db, user_id, start_date=start_date, end_date=end_date)), 200
 
-    result = []
-    for rec in records:
-        # Munkaidő percben – ha van check_in és check_out
-        work_minutes = None
-        if rec.check_in and rec.check_out:
-            delta = rec.check_out - rec.check_in
-            work_minutes = int(delta.total_seconds() // 60)
 
-        result.append(
+# --- Rendszerbeállítások ---
+
+
+@bp.get("/settings")
+@jwt_required()
+@admin_required()
+def list_settings():
+    settings = get_all_settings()
+    return jsonify([
+        {
+            "key": s.key,
+            "value": s.value,
+            "description": s.description,
+            "updated_at": s.updated_at.isoformat() if s.updated_at else None,
+            "updated_by": s.updated_by,
+        }
+        for s in settings
+    ]), 200
+
+
+@bp.put("/settings/<key>")
+@jwt_required()
+@admin_required()
+def update_setting(key: str):
+    """
+    Beállítás mentése. Body: {"value": "600", "description": "..."}
+    A többi worker legfeljebb SETTINGS_CACHE_CHECK_INTERVAL másodpercen belül átveszi.
+    """
+    data = request.get_json(silent=True) or {}
+    value = data.get("value")
+    if value is None:
+        return jsonify({"error": "A 'value' mező kötelező."}), 400
+
+    setting = set_setting(key, str(value), updated_by=int(get_jwt_identity()),
+                          description=data.get("description"))
+    return jsonify({"key": setting.key, "value": setting.value}), 200
+
+
+# --- Jelenlét most ---
+
+
+@bp.get("/presence")
+@jwt_required()
+@admin_required()
+def get_presence():
+    """
+    Ki van most bejelentkezve, helyszínenkénti létszámmal.
+    Query paraméterek:
+      - roster: opcionális, "0" esetén csak a létszámok (O(1))
+    """
+    db = get_db()
+    presence_index.resync_if_stale(db)
+
+    result = {"counts": presence_index.counts()}
+    if request.args.get("roster", "1") != "0":
+        entries = presence_index.roster()
+        user_ids = [e.user_id for e in entries]
+        usernames = dict(db.query(User.id, User.username).filter(User.id.in_(user_ids)).all()) if user_ids else {}
+        result["roster"] = [
             {
-                "date": rec.date.isoformat() if rec.date else None,
-                "check_in": rec.check_in.isoformat() if rec.check_in else None,
-                "check_out": rec.check_out.isoformat() if rec.check_out else None,
-                "work_location": rec.work_location.value,
-                "work_duration": work_minutes,
+                "user_id": e.user_id,
+                "username": usernames.get(e.user_id),
+                "work_session_id": e.record_id,
+                "work_location": e.work_location.value,
+                "check_in": e.check_in.isoformat() if e.check_in else None,
             }
-        )
+            for e in entries
+        ]
 
-    return jsonify(result), 200
\ No newline at end of file
+    return jsonify(result), 200
@@ -1,32 +1,41 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from app.db.engine import get_db
+from app.db.replica import read_db, replica_router
 from app.services.attendance_service import AttendanceService
+from app.services.heatmap_service import HeatmapService
+from app.services.kiosk_sync import KioskSyncService
 from app.db.models import WorkLocation
 from datetime import date
 from app.utils.timecalc import parse_dt
+from app.utils.decorators import admin_required
+from app.utils.idempotency import idempotent
 from app.utils.error_handler import NotFoundError, ForbiddenError, ValidationError, ServiceError
 
 bp = Blueprint("attendance", __name__)
 
 @bp.post("/checkin")
 @jwt_required()
+@idempotent()
 def check_in():
     db = get_db()
     user_id = int(get_jwt_identity())
     location = WorkLocation(request.json.get("location", "office"))
     service = AttendanceService(db, user_id)
     record = service.check_in(location)
+    replica_router.mark_write(user_id)
     return jsonify({"id": record.id, "status": "checked_in"})
 
 
 @bp.post("/checkout")
 @jwt_required()
+@idempotent()
 def check_out():
     db = get_db()
     user_id = int(get_jwt_identity())
     service = AttendanceService(db, user_id)
     record = service.check_out()
+    replica_router.mark_write(user_id)
     return jsonify({"id": record.id, "status": "checked_out"})
 
 
@@ -34,8 +43,9 @@ def check_out():
 @jwt_required()
 def get_weekly_attendance():
     """A heti jelenléti adatok lekérése a hétre, a dashboardhoz kell"""
-    db = get_db()
     user_id = int(get_jwt_identity())
+    # Replikáról, kivéve közvetlenül a felhasználó saját írása után
+    db = read_db(user_id)
     service = AttendanceService(db, user_id)
     
     week_start = None
@@ -50,8 +60,26 @@ def get_weekly_attendance():
     weekly_data = service.get_weekly_attendance(week_start=week_start)
     return jsonify(weekly_data)
   
+@bp.get("/heatmap")
+@jwt_required()
+def get_heatmap():
+    """
+    Éves hőtérkép: napi ledolgozott percek és helyszín kódok tömbben.
+    Query paraméterek:
+      - year: opcionális, alapból az aktuális év
+    """
+    user_id = int(get_jwt_identity())
+    try:
+        year = int(request.args.get("year", date.today().year))
+    except ValueError:
+        return jsonify({"error": "A 'year' paraméternek egész számnak kell lennie."}), 400
+
+    return jsonify(HeatmapService(read_db(user_id)).get_year(user_id, year))
+
+
 @bp.post("/modifications")
 @jwt_required()
+@idempotent()
 def request_modification():
     """
     Módosítási kérelem létrehozása a saját munkamenetre.
@@ -99,6 +127,7 @@ def request_modification():
             requested_location=requested_location,
             reason=reason,
         )
+        replica_router.mark_write(user_id)
 
         return jsonify(
             {
@@ -179,3 +208,23 @@ def simulate_overtime():
         return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+@bp.post("/kiosk/sync")
+@jwt_required()
+@admin_required()
+def kiosk_sync():
+    """
+    Kioszk offline sorának visszajátszása egy kérésben.
+    Body: {"kiosk_id": "lobby-1", "events": [{"event_id", "user_id", "type": "check_in"|"check_out",
+           "timestamp": ISO 8601, "location": opcionális}]}
+    Válasz: eseményenkénti eredmény (applied / duplicate / rejected) a beküldési sorrendben.
+    """
+    data = request.get_json() or {}
+    service = KioskSyncService(
+        get_db(),
+        operator_id=int(get_jwt_identity()),
+        max_events=current_app.config.get("KIOSK_SYNC_MAX_EVENTS", 1000),
+        max_clock_skew_seconds=current_app.config.get("KIOSK_SYNC_MAX_CLOCK_SKEW_SECONDS", 300),
+    )
+    return jsonify(service.sync(data.get("events"), kiosk_id=data.get("kiosk_id"))), 200
@@ -1,10 +1,14 @@
 from flask import Blueprint, jsonify, request
+from flask_jwt_extended import get_jwt, jwt_required
 from app.db.engine import get_db
 from app.services.auth_service import AuthService
+from app.services.token_blocklist import token_blocklist
+from app.utils.rate_limit import login_rate_limited
 
 bp = Blueprint("auth", __name__)
 
 @bp.post("/register")
+@login_rate_limited()
 def register():
     data = request.get_json() or {}
     db = get_db()
@@ -29,6 +33,7 @@ def register():
         return jsonify({"error": str(e)}), 400
 
 @bp.post("/login")
+@login_rate_limited()
 def login():
     data = request.get_json() or {}
     db = get_db()
@@ -51,4 +56,12 @@ def login():
             }
         })
     except ValueError as e:
-        return jsonify({"error": str(e)}), 401
\ No newline at end of file
+        return jsonify({"error": str(e)}), 401
+
+
+@bp.post("/logout")
+@jwt_required()
+def logout():
+    """Az aktuális token visszavonása (a többi eszköz munkamenete érvényes marad)."""
+    token_blocklist.revoke_token(get_db(), get_jwt())
+    return jsonify({"msg": "Sikeres kijelentkezés"}), 200
@@ -1,6 +1,8 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from app.db.engine import get_db
+from app.db.replica import read_db
+from app.services.overtime_ledger import OvertimeLedgerService
 from app.services.report_service import ReportService
 from app.services.user_service import UserService
 from app.utils.timecalc import parse_dt
@@ -33,8 +35,8 @@ def get_summary():
           - start_date: opcionális (YYYY-MM-DD)
           - end_date: opcionális (YYYY-MM-DD)
         """
-    db = get_db()
     user_id = get_jwt_identity()
+    db = read_db(int(user_id))
     service = ReportService(db)
 
     try:
@@ -50,6 +52,34 @@ def get_summary():
     )
     return jsonify(summary), 200
 
+@bp.get("/balance")
+@jwt_required()
+def get_own_balance():
+    """
+    Saját elvárt vs. ledolgozott órák egyenlege a munkanaptár alapján.
+    Query paraméterek:
+      - start_date, end_date: kötelező (YYYY-MM-DD)
+      - daily: opcionális, "1" esetén napi bontás is
+    """
+    user_id = int(get_jwt_identity())
+    try:
+        start_date = parse_dt(request.args.get("start_date"))
+        end_date = parse_dt(request.args.get("end_date"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    service = ReportService(read_db(user_id))
+    return jsonify(service.get_balance(user_id, start_date, end_date,
+                                       daily=request.args.get("daily") == "1")), 200
+
+@bp.get("/overtime-balance")
+@jwt_required()
+def get_own_overtime_balance():
+    """Saját jóváhagyott túlóra egyenleg (előre aggregált, O(1))."""
+    db = get_db()
+    user_id = int(get_jwt_identity())
+    return jsonify(OvertimeLedgerService(db).get_balance(user_id)), 200
+
 @bp.get("/overtime")
 @jwt_required()
 def get_user_overtime():
@@ -0,0 +1,101 @@
+from datetime import datetime, date
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import AttendanceRecord, OvertimeRequest, WorkLocation, RequestStatus, AuditLog
+from app.db.settings_cache import settings_cache, OVERTIME_THRESHOLD_KEY
+from app.db.versioning import bump_version, user_sessions_version_name
+from app.services.outbox import SESSION_CLOSED, publish_session
+from app.services.presence_index import presence_index
+from app.utils.error_handler import ServiceError, ValidationError
+
+
+class AsyncAttendanceService:
+    """
+    Az AttendanceService check-in/check-out útvonalának asyncio változata az ASGI belépési ponthoz.
+    Ugyanazokat a modelleket és hibatípusokat használja; a rekord és az audit log egy commitban kerül mentésre.
+    """
+
+    def __init__(self, db: AsyncSession, current_user_id: int):
+        self.db = db
+        self.current_user_id = current_user_id
+
+    async def _get_open_session(self):
+        result = await self.db.execute(
+            select(AttendanceRecord)
+            .where(
+                AttendanceRecord.user_id == self.current_user_id,
+                AttendanceRecord.check_out.is_(None),
+            )
+            .limit(1)
+        )
+        return result.scalars().first()
+
+    async def check_in(self, work_location: WorkLocation = WorkLocation.OFFICE):
+        """Felhasználó bejelentkezése"""
+        try:
+            # Optimista INSERT, a részleges unique index véd a második nyitott munkamenet ellen
+            record = AttendanceRecord(
+                user_id=self.current_user_id,
+                check_in=datetime.now(),
+                work_location=work_location,
+                date=date.today(),
+            )
+            self.db.add(record)
+            await self.db.flush()
+            await self.db.run_sync(bump_version, user_sessions_version_name(self.current_user_id))
+            self._log_action("check_in", entity_id=record.id, desc=f"{work_location.value}-ról bejelentkezett")
+            await self.db.commit()
+            presence_index.checked_in(record)
+            return record
+        except IntegrityError as e:
+            await self.db.rollback()
+            if AttendanceRecord.is_open_session_conflict(e):
+                raise ValidationError("Már van aktív munkamenet!")
+            raise ServiceError("Adatbázis hiba check-in során")
+        except SQLAlchemyError:
+            await self.db.rollback()
+            raise ServiceError("Adatbázis hiba check-in során")
+
+    async def check_out(self, work_location: WorkLocation = WorkLocation.OFFICE):
+        """Felhasználó kijelentkezése és munkaidő-számítás"""
+        try:
+            record = await self._get_open_session()
+            if not record:
+                raise ValidationError("Nincs aktív bejelentkezés.")
+
+            record.check_out = datetime.now()
+            record.work_location = work_location
+            record.work_duration = record.calculate_duration()
+
+            threshold = settings_cache.get_int(OVERTIME_THRESHOLD_KEY, 540)
+            if record.work_duration and record.work_duration > threshold:
+                self.db.add(OvertimeRequest(
+                    user_id=self.current_user_id,
+                    work_session_id=record.id,
+                    overtime_minutes=record.work_duration - threshold,
+                    status=RequestStatus.PENDING,
+                    is_auto_generated=True,
+                ))
+                record.is_overtime_generated = True
+
+            await self.db.run_sync(bump_version, user_sessions_version_name(self.current_user_id))
+            publish_session(self.db, SESSION_CLOSED, record)
+            self._log_action("check_out", entity_id=record.id, desc="Kijelentkezett")
+            await self.db.commit()
+            presence_index.checked_out(self.current_user_id)
+            return record
+        except SQLAlchemyError:
+            await self.db.rollback()
+            raise ServiceError("Adatbázis hiba check-out során")
+
+    def _log_action(self, action: str, entity_id=None, desc=None):
+        self.db.add(AuditLog(
+            user_id=self.current_user_id,
+            action=action,
+            entity_type="attendance",
+            entity_id=entity_id,
+            description=desc,
+        ))
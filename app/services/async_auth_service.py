@@ -0,0 +1,44 @@
+import asyncio
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import User
+from app.utils.security import check_password
+from app.utils.error_handler import ServiceError, ValidationError
+
+
+class AsyncAuthService:
+    """
+    Az AuthService.login asyncio változata.
+    A bcrypt ellenőrzés szálban fut, így nem blokkolja az event loopot.
+    """
+
+    def __init__(self, db: AsyncSession, token_factory: Callable[..., str]):
+        self.db = db
+        # Ugyanazt a tokent kell kiadni, mint a Flask oldal (flask_jwt_extended)
+        self.token_factory = token_factory
+
+    async def login(self, username: str = None, email: str = None, password: str = None):
+        if not password or not (username or email):
+            raise ValidationError("Hiányzó felhasználónév vagy jelszó")
+
+        try:
+            query = select(User).where(User.username == username) if username else select(User).where(User.email == email)
+            user = (await self.db.execute(query.limit(1))).scalars().first()
+        except SQLAlchemyError as e:
+            raise ServiceError(f"Adatbázis hiba a bejelentkezés során: {e}")
+
+        if not user or not await asyncio.to_thread(check_password, password, user.password_hash):
+            raise ValidationError("Érvénytelen hitelesítési adatok")
+
+        token = self.token_factory(
+            identity=str(user.id),
+            additional_claims={
+                "role": user.role.value if hasattr(user.role, 'value') else str(user.role),
+                "username": user.username
+            },
+        )
+        return user, token
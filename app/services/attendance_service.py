@@ -1,6 +1,11 @@
 from datetime import datetime, date, timedelta
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
+from app.db.settings_cache import settings_cache, OVERTIME_THRESHOLD_KEY
+from app.db.unit_of_work import transaction
+from app.db.versioning import bump_version, user_sessions_version_name
+from app.services.outbox import SESSION_CLOSED, SESSION_MODIFIED, publish_session
+from app.services.presence_index import presence_index
 from app.db.models import AttendanceRecord, OvertimeRequest, ModificationRequest, WorkLocation, RequestStatus, AuditLog
 from typing import Dict, Any, Optional
 from app.utils.error_handler import ServiceError, NotFoundError, ValidationError, ForbiddenError
@@ -16,27 +21,26 @@ class AttendanceService:
     def check_in(self, work_location: WorkLocation = WorkLocation.OFFICE):
         """Felhasználó bejelentkezése"""
         try:
-            existing_open = (
-                self.db.query(AttendanceRecord)
-                .filter(
-                    AttendanceRecord.user_id == self.current_user_id,
-                    AttendanceRecord.check_out.is_(None),
+            # Optimista INSERT: a második nyitott munkamenetet a részleges unique index
+            # utasítja el, így nincs külön SELECT és nincs versenyhelyzet dupla kattintásnál
+            with transaction(self.db):
+                record = AttendanceRecord(
+                    user_id=self.current_user_id,
+                    check_in=datetime.now(),
+                    work_location=work_location,
+                    date=date.today(),
                 )
-                .first()
-            )
-            if existing_open:
-                raise ValidationError("Már van aktív munkamenet!")
-
-            record = AttendanceRecord(
-                user_id=self.current_user_id,
-                check_in=datetime.now(),
-                work_location=work_location,
-                date=date.today(),
-            )
-            self.db.add(record)
-            self.db.commit()
-            self._log_action("check_in", entity_id=record.id, desc=f"{work_location.value}-ról bejelentkezett")
+                self.db.add(record)
+                self.db.flush()
+                bump_version(self.db, user_sessions_version_name(self.current_user_id))
+                self._log_action("check_in", entity_id=record.id, desc=f"{work_location.value}-ról bejelentkezett")
+            presence_index.checked_in(record)
             return record
+        except IntegrityError as e:
+            self.db.rollback()
+            if AttendanceRecord.is_open_session_conflict(e):
+                raise ValidationError("Már van aktív munkamenet!")
+            raise ServiceError("Adatbázis hiba check-in során")
         except SQLAlchemyError:
             self.db.rollback()
             raise ServiceError("Adatbázis hiba check-in során")
@@ -44,36 +48,40 @@ class AttendanceService:
     def check_out(self, work_location: WorkLocation = WorkLocation.OFFICE):
         """Felhasználó kijelentkezése és munkaidő-számítás"""
         try:
-            record = (
-                self.db.query(AttendanceRecord)
-                .filter(
-                    AttendanceRecord.user_id == self.current_user_id,
-                    AttendanceRecord.check_out.is_(None),
+            with transaction(self.db):
+                record = (
+                    self.db.query(AttendanceRecord)
+                    .filter(
+                        AttendanceRecord.user_id == self.current_user_id,
+                        AttendanceRecord.check_out.is_(None),
+                    )
+                    .first()
                 )
-                .first()
-            )
-            if not record:
-                raise ValidationError("Nincs aktív bejelentkezés.")
-
-            record.check_out = datetime.now()
-            record.work_location = work_location
-            record.work_duration = record.calculate_duration()
-
-            # túlóra detektálás (9 órán felül = 540 perc)
-            if record.work_duration and record.work_duration > 540:
-                overtime_minutes = record.work_duration - 540
-                overtime = OvertimeRequest(
-                    user_id=self.current_user_id,
-                    work_session=record,
-                    overtime_minutes=overtime_minutes,
-                    status=RequestStatus.PENDING,
-                    is_auto_generated=True,
-                )
-                self.db.add(overtime)
-                record.is_overtime_generated = True
-
-            self.db.commit()
-            self._log_action("check_out", entity_id=record.id, desc="Kijelentkezett")
+                if not record:
+                    raise ValidationError("Nincs aktív bejelentkezés.")
+
+                record.check_out = datetime.now()
+                record.work_location = work_location
+                record.work_duration = record.calculate_duration()
+
+                # túlóra detektálás (alapból 9 órán felül = 540 perc)
+                threshold = self._overtime_threshold()
+                if record.work_duration and record.work_duration > threshold:
+                    overtime_minutes = record.work_duration - threshold
+                    overtime = OvertimeRequest(
+                        user_id=self.current_user_id,
+                        work_session=record,
+                        overtime_minutes=overtime_minutes,
+                        status=RequestStatus.PENDING,
+                        is_auto_generated=True,
+                    )
+                    self.db.add(overtime)
+                    record.is_overtime_generated = True
+
+                bump_version(self.db, user_sessions_version_name(self.current_user_id))
+                publish_session(self.db, SESSION_CLOSED, record)
+                self._log_action("check_out", entity_id=record.id, desc="Kijelentkezett")
+            presence_index.checked_out(self.current_user_id)
             return record
         except SQLAlchemyError:
             self.db.rollback()
@@ -165,26 +173,27 @@ class AttendanceService:
                              requested_location=None, reason=None):
         """Felhasználó kérelmezheti a munkamenet módosítását"""
         try:
-            record = self.db.get(AttendanceRecord, work_session_id)
-            if not record:
-                raise NotFoundError("A megadott munkamenet nem létezik.")
-            
-            if record.user_id != self.current_user_id:
-                raise ForbiddenError("Nincs jogosultságod a rekord módosításához.")
-
-            req = ModificationRequest(
-                user_id=self.current_user_id,
-                work_session_id=record.id,
-                requested_check_in=requested_check_in,
-                requested_check_out=requested_check_out,
-                requested_work_location=requested_location,
-                reason=reason or "Nincs megadva indoklás",
-                status=RequestStatus.PENDING,
-            )
+            with transaction(self.db):
+                record = self.db.get(AttendanceRecord, work_session_id)
+                if not record:
+                    raise NotFoundError("A megadott munkamenet nem létezik.")
+
+                if record.user_id != self.current_user_id:
+                    raise ForbiddenError("Nincs jogosultságod a rekord módosításához.")
 
-            self.db.add(req)
-            self.db.commit()
-            self._log_action("request_modification", entity_id=req.id, desc="Módosítási kérelem beküldve")
+                req = ModificationRequest(
+                    user_id=self.current_user_id,
+                    work_session_id=record.id,
+                    requested_check_in=requested_check_in,
+                    requested_check_out=requested_check_out,
+                    requested_work_location=requested_location,
+                    reason=reason or "Nincs megadva indoklás",
+                    status=RequestStatus.PENDING,
+                )
+
+                self.db.add(req)
+                self.db.flush()
+                self._log_action("request_modification", entity_id=req.id, desc="Módosítási kérelem beküldve")
             return req
 
         except SQLAlchemyError:
@@ -194,31 +203,36 @@ class AttendanceService:
     def review_modification(self, modification_id: int, approve: bool, reviewer_id: int, rejection_reason=None):
         """Admin jóváhagyja vagy elutasítja a módosítási kérelmet"""
         try:
-            mod = self.db.get(ModificationRequest, modification_id)
-            if not mod:
-                raise NotFoundError("Nincs ilyen kérelem.")
-
-            mod.reviewed_by = reviewer_id
-            mod.reviewed_at = datetime.now()
-
-            if approve:
-                record = mod.work_session
-                if mod.requested_check_in:
-                    record.check_in = mod.requested_check_in
-                if mod.requested_check_out:
-                    record.check_out = mod.requested_check_out
-                    record.work_duration = record.calculate_duration()
-                if mod.requested_work_location:
-                    record.work_location = mod.requested_work_location
-                mod.status = RequestStatus.APPROVED
-                desc = "Kérelem jóváhagyva"
-            else:
-                mod.status = RequestStatus.REJECTED
-                mod.rejection_reason = rejection_reason or "Elutasítva indoklás nélkül"
-                desc = "Kérelem elutasítva"
-
-            self.db.commit()
-            self._log_action("review_modification", entity_id=mod.id, desc=desc)
+            with transaction(self.db):
+                mod = self.db.get(ModificationRequest, modification_id)
+                if not mod:
+                    raise NotFoundError("Nincs ilyen kérelem.")
+
+                mod.reviewed_by = reviewer_id
+                mod.reviewed_at = datetime.now()
+
+                if approve:
+                    record = mod.work_session
+                    if mod.requested_check_in:
+                        record.check_in = mod.requested_check_in
+                    if mod.requested_check_out:
+                        record.check_out = mod.requested_check_out
+                        record.work_duration = record.calculate_duration()
+                    if mod.requested_work_location:
+                        record.work_location = mod.requested_work_location
+                    mod.status = RequestStatus.APPROVED
+                    bump_version(self.db, user_sessions_version_name(record.user_id))
+                    publish_session(self.db, SESSION_MODIFIED, record, modification_id=mod.id)
+                    desc = "Kérelem jóváhagyva"
+                else:
+                    mod.status = RequestStatus.REJECTED
+                    mod.rejection_reason = rejection_reason or "Elutasítva indoklás nélkül"
+                    desc = "Kérelem elutasítva"
+
+                self._log_action("review_modification", entity_id=mod.id, desc=desc)
+            if approve and mod.requested_check_out:
+                # Nyitott munkamenet lezárása módosítási kérelemmel
+                presence_index.checked_out(mod.work_session.user_id, record_id=mod.work_session_id)
             return mod
         except SQLAlchemyError:
             self.db.rollback()
@@ -228,51 +242,60 @@ class AttendanceService:
 
     def simulate_overtime(self, minutes=600):
         """Teszteléshez: létrehoz egy lezárt munkamenetet a mai napra, ami túlórás."""
-        # Check if there is an active session, if so, close it first or error
-        active = (
-            self.db.query(AttendanceRecord)
-            .filter(
-                AttendanceRecord.user_id == self.current_user_id,
-                AttendanceRecord.check_out.is_(None),
+        with transaction(self.db):
+            # Check if there is an active session, if so, close it first or error
+            active = (
+                self.db.query(AttendanceRecord)
+                .filter(
+                    AttendanceRecord.user_id == self.current_user_id,
+                    AttendanceRecord.check_out.is_(None),
+                )
+                .first()
             )
-            .first()
-        )
-        if active:
-            raise ValidationError("Van aktív munkamenet, előbb jelentkezz ki!")
-
-        # Create a session that started 'minutes' ago and ended now
-        end_time = datetime.now()
-        start_time = end_time - timedelta(minutes=minutes)
-        
-        record = AttendanceRecord(
-            user_id=self.current_user_id,
-            check_in=start_time,
-            check_out=end_time,
-            work_location=WorkLocation.OFFICE,
-            date=start_time.date(),
-            work_duration=minutes,
-            is_overtime_generated=False # Will be set below
-        )
-        self.db.add(record)
-        self.db.flush() # Get ID
-        
-        # Trigger overtime logic manually since we are bypassing check_out
-        if minutes > 540:
-            overtime_minutes = minutes - 540
-            overtime = OvertimeRequest(
+            if active:
+                raise ValidationError("Van aktív munkamenet, előbb jelentkezz ki!")
+
+            # Create a session that started 'minutes' ago and ended now
+            end_time = datetime.now()
+            start_time = end_time - timedelta(minutes=minutes)
+
+            record = AttendanceRecord(
                 user_id=self.current_user_id,
-                work_session_id=record.id,
-                overtime_minutes=overtime_minutes,
-                status=RequestStatus.PENDING,
-                is_auto_generated=True,
+                check_in=start_time,
+                check_out=end_time,
+                work_location=WorkLocation.OFFICE,
+                date=start_time.date(),
+                work_duration=minutes,
+                is_overtime_generated=False # Will be set below
             )
-            self.db.add(overtime)
-            record.is_overtime_generated = True
-            
-        self.db.commit()
-        self._log_action("simulate_overtime", entity_id=record.id, desc=f"Szimulált túlóra: {minutes} perc")
+            self.db.add(record)
+            self.db.flush() # Get ID
+
+            # Trigger overtime logic manually since we are bypassing check_out
+            threshold = self._overtime_threshold()
+            if minutes > threshold:
+                overtime_minutes = minutes - threshold
+                overtime = OvertimeRequest(
+                    user_id=self.current_user_id,
+                    work_session_id=record.id,
+                    overtime_minutes=overtime_minutes,
+                    status=RequestStatus.PENDING,
+                    is_auto_generated=True,
+                )
+                self.db.add(overtime)
+                record.is_overtime_generated = True
+
+            bump_version(self.db, user_sessions_version_name(self.current_user_id))
+            publish_session(self.db, SESSION_CLOSED, record)
+            self._log_action("simulate_overtime", entity_id=record.id, desc=f"Szimulált túlóra: {minutes} perc")
         return record
 
+    # --- Beállítások ---
+
+    def _overtime_threshold(self) -> int:
+        """Túlóra küszöb percben, a settings cache-ből (nincs DB lekérdezés)."""
+        return settings_cache.get_int(OVERTIME_THRESHOLD_KEY, 540)
+
     # --- Audit log segédfüggvény ---
 
     def _log_action(self, action: str, entity_id=None, desc=None):
@@ -283,5 +306,5 @@ class AttendanceService:
             entity_id=entity_id,
             description=desc,
         )
-        self.db.add(log)
-        self.db.commit()
\ No newline at end of file
+        # Csak hozzáadás: a commitot a hívó transaction() blokkja végzi
+        self.db.add(log)
\ No newline at end of file
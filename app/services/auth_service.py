@@ -2,6 +2,9 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from flask_jwt_extended import create_access_token
 from app.db.models import User, UserRole
+from app.db.unit_of_work import transaction
+from app.db.versioning import bump_version
+from app.services.user_search_index import USERS_VERSION_NAME, user_search_index
 from app.utils.security import check_password, hash_password
 from app.utils.error_handler import ServiceError, ValidationError, NotFoundError
 class AuthService:
@@ -55,9 +58,11 @@ class AuthService:
                 role=UserRole.USER,
             )
 
-            self.db.add(user)
-            self.db.commit()
-            self.db.refresh(user)
+            with transaction(self.db):
+                self.db.add(user)
+                bump_version(self.db, USERS_VERSION_NAME)
+            # expire_on_commit=False: nincs szükség refresh SELECT-re
+            user_search_index.upsert(user)
 
             return user
         except SQLAlchemyError as e:
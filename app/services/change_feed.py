@@ -0,0 +1,87 @@
+import heapq
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.models import CHANGE_SEQ_NAME, AttendanceRecord, ModificationRequest, OvertimeRequest
+from app.db.versioning import read_version
+from app.utils.error_handler import ServiceError, ValidationError
+
+FEED_MODELS = (AttendanceRecord, OvertimeRequest, ModificationRequest)
+
+
+def _serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+class ChangeFeedService:
+    """
+    Inkrementális változás-feed a work_sessions, overtime_requests és
+    modification_requests táblákhoz.
+
+    Minden INSERT/UPDATE egy globális, monoton növekvő change_seq értéket kap
+    (lásd models.reserve_change_seqs), a kliens az utoljára látott sorszámot
+    küldi vissza kurzorként. Soronként mindig az aktuális állapot jön, így egy
+    többször módosult sor csak egyszer, a legutolsó sorszámával szerepel.
+    Törléseket a feed nem követ.
+
+    A kurzor nem léphet át még nyitott tranzakcióhoz tartozó sorszámot: a
+    számlálósor zárja miatt a sorszámok commit sorrendben válnak láthatóvá, és
+    a lekérdezés csak a számláló (a táblák előtt beolvasott) commitolt értékéig
+    olvas. Az e fölötti sorok a következő lekérdezésben jönnek, így a táblánként
+    külön utasítások között commitoló író sem okoz kihagyást.
+    """
+
+    def __init__(self, db: Session, max_limit: int = 5000):
+        self.db = db
+        self.max_limit = max_limit
+
+    def changes(self, since: int = 0, limit: int = 500) -> Dict[str, Any]:
+        if since < 0:
+            raise ValidationError("A 'since' kurzor nem lehet negatív")
+        if not 1 <= limit <= self.max_limit:
+            raise ValidationError(f"A 'limit' értéke 1 és {self.max_limit} között lehet")
+
+        try:
+            # Felső határ: ennél nagyobb sorszámú sor tranzakciója még nyitott lehetett
+            high_water = read_version(self.db, CHANGE_SEQ_NAME)
+            # Táblánként limit + 1 sor (change_seq indexen), az összefésülés elejéből
+            # biztosan kikerül az oldal; a +1 jelzi, hogy van-e még
+            per_table = [
+                [
+                    (row.change_seq, model.__tablename__, row)
+                    for row in self.db.execute(
+                        select(model.__table__)
+                        .where(model.change_seq > since, model.change_seq <= high_water)
+                        .order_by(model.change_seq)
+                        .limit(limit + 1)
+                    )
+                ]
+                for model in FEED_MODELS
+            ]
+        except SQLAlchemyError:
+            raise ServiceError("Adatbázis hiba a változás-feed lekérdezése során")
+
+        merged = list(heapq.merge(*per_table, key=lambda item: item[0]))
+        page = merged[:limit]
+        changes: List[Dict[str, Any]] = [
+            {
+                "table": table,
+                "change_seq": seq,
+                "data": {key: _serialize(value) for key, value in row._mapping.items()},
+            }
+            for seq, table, row in page
+        ]
+        return {
+            "changes": changes,
+            "next_cursor": page[-1][0] if page else since,
+            "has_more": len(merged) > limit,
+        }
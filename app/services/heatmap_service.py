@@ -0,0 +1,118 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.models import AttendanceRecord, WorkLocation
+from app.db.versioning import read_version, user_sessions_version_name
+from app.utils.error_handler import ServiceError, ValidationError
+
+# Helyszín kódok a tömör válaszban (0 = nem dolgozott)
+LOCATION_CODES = [None] + [location.value for location in WorkLocation]
+_LOCATION_INDEX = {location: i + 1 for i, location in enumerate(WorkLocation)}
+
+
+class HeatmapCache:
+    """
+    Folyamaton belüli LRU cache (user_id, év) kulccsal.
+    Minden bejegyzés a felhasználó "user_sessions:<id>" verziójával együtt
+    tárolódik; olvasáskor egy PK lekérdezés dönti el, érvényes-e még.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self._entries: "OrderedDict[Tuple[int, int], Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+
+    def get(self, key: Tuple[int, int], version: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None or cached[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return cached[1]
+
+    def put(self, key: Tuple[int, int], version: int, payload: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (version, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+heatmap_cache = HeatmapCache()
+
+
+class HeatmapService:
+    """Éves, napi bontású ledolgozott percek (GitHub-stílusú hőtérképhez)."""
+
+    def __init__(self, db: Session, cache: HeatmapCache = heatmap_cache):
+        self.db = db
+        self.cache = cache
+
+    def get_year(self, user_id: int, year: int) -> Dict[str, Any]:
+        if not 1970 <= year <= 9999:
+            raise ValidationError(f"Érvénytelen év: {year}")
+
+        try:
+            # Előbb a verzió: ha közben írás történik, a következő olvasás újraszámol
+            version = read_version(self.db, user_sessions_version_name(user_id))
+            cached = self.cache.get((user_id, year), version)
+            if cached is not None:
+                return cached
+
+            payload = self._compute(user_id, year)
+        except SQLAlchemyError:
+            raise ServiceError("Adatbázis hiba a hőtérkép lekérdezés során")
+
+        self.cache.put((user_id, year), version, payload)
+        return payload
+
+    def _compute(self, user_id: int, year: int) -> Dict[str, Any]:
+        start = date(year, 1, 1)
+        days = (date(year + 1, 1, 1) - start).days
+        minutes = [0] * days
+        location_minutes = [0] * days
+        locations = [0] * days
+
+        # Egyetlen csoportosított lekérdezés: napi és helyszínenkénti percek
+        rows = (
+            self.db.query(
+                AttendanceRecord.date,
+                AttendanceRecord.work_location,
+                func.coalesce(func.sum(AttendanceRecord.work_duration), 0),
+            )
+            .filter(
+                AttendanceRecord.user_id == user_id,
+                AttendanceRecord.date >= start,
+                AttendanceRecord.date < date(year + 1, 1, 1),
+            )
+            .group_by(AttendanceRecord.date, AttendanceRecord.work_location)
+            .all()
+        )
+        for day, location, total in rows:
+            i = (day - start).days
+            minutes[i] += total
+            # A napi helyszín a legtöbb percet adó helyszín (nyitott munkamenetnél is jelölt)
+            if locations[i] == 0 or total > location_minutes[i]:
+                locations[i] = _LOCATION_INDEX[location]
+                location_minutes[i] = total
+
+        return {
+            "user_id": user_id,
+            "year": year,
+            "start": start.isoformat(),
+            "minutes": minutes,
+            "locations": locations,
+            "location_codes": LOCATION_CODES,
+            "total_minutes": sum(minutes),
+            "worked_days": sum(1 for code in locations if code),
+        }
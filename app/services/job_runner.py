@@ -0,0 +1,337 @@
+import json
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import create_engine, delete, select, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models import BackgroundJob
+from app.utils.error_handler import NotFoundError, ValidationError
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+PAYROLL_REPORT = "payroll_report"
+PARQUET_EXPORT = "parquet_export"
+
+
+class JobResult(NamedTuple):
+    filename: str
+    mimetype: str
+    data: bytes
+
+
+Progress = Callable[[int, Optional[str]], None]
+
+
+# --- Feladat típusok ---
+# validate: kérés paraméterei -> normalizált (JSON-ba menthető) paraméterek, a kérésben fut
+# run: (session, paraméterek, progress, konfiguráció) -> JobResult, a feldolgozó folyamatban fut
+
+def _validate_payroll(params: Dict[str, Any]) -> Dict[str, Any]:
+    from app.services.payroll_report import parse_month
+
+    month = parse_month(params.get("month"))
+    fmt = params.get("format", "csv")
+    if fmt not in ("csv", "json"):
+        raise ValidationError("A 'format' értéke csv vagy json lehet")
+    return {"month": f"{month:%Y-%m}", "format": fmt}
+
+
+def _run_payroll(session: Session, params: Dict[str, Any], progress: Progress, config: Dict[str, Any]) -> JobResult:
+    from app.services.payroll_report import PayrollReportService, parse_month
+
+    progress(10, "Munkamenetek betöltése")
+    report = PayrollReportService(
+        session,
+        late_after=config["PAYROLL_LATE_AFTER"],
+        short_day_minutes=config["PAYROLL_SHORT_DAY_MINUTES"],
+        overtime_threshold=config["overtime_threshold"],
+    ).monthly_report(parse_month(params["month"]))
+    progress(90, "Fájl írása")
+
+    name = f"payroll-{params['month']}"
+    if params["format"] == "csv":
+        return JobResult(f"{name}.csv", "text/csv", report.to_csv(index=False).encode("utf-8"))
+    body = {"month": params["month"], "users": PayrollReportService.to_records(report)}
+    return JobResult(f"{name}.json", "application/json", json.dumps(body).encode("utf-8"))
+
+
+def _validate_parquet(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {"full": bool(params.get("full", False))}
+
+
+def _run_parquet(session: Session, params: Dict[str, Any], progress: Progress, config: Dict[str, Any]) -> JobResult:
+    # A pyarrow csak ehhez a feladathoz kell
+    from app.services.parquet_export import ParquetExporter
+
+    summary = ParquetExporter(session, config["PARQUET_EXPORT_DIR"]).export(
+        full=params["full"],
+        progress=lambda done, total: progress(int(done * 100 / total), f"{done}/{total} tábla kész"),
+    )
+    return JobResult("parquet-export.json", "application/json", json.dumps(summary).encode("utf-8"))
+
+
+class JobType(NamedTuple):
+    validate: Callable[[Dict[str, Any]], Dict[str, Any]]
+    run: Callable[[Session, Dict[str, Any], Progress, Dict[str, Any]], JobResult]
+    # Egyszerre legfeljebb egy várakozó / futó példány (közös kimenetet író feladatok)
+    single_flight: bool = False
+
+
+JOB_TYPES: Dict[str, JobType] = {
+    PAYROLL_REPORT: JobType(_validate_payroll, _run_payroll),
+    PARQUET_EXPORT: JobType(_validate_parquet, _run_parquet, single_flight=True),
+}
+
+
+# --- Futtatás a feldolgozó folyamatban ---
+
+_engines: Dict[str, Any] = {}
+
+
+def _engine(database_uri: str):
+    # Folyamatonként egy engine adatbázisonként (a pool folyamatai több feladatot is futtatnak)
+    engine = _engines.get(database_uri)
+    if engine is None:
+        engine = _engines[database_uri] = create_engine(database_uri)
+    return engine
+
+
+def run_job(database_uri: str, job_id: str, results_dir: str, result_ttl_seconds: float,
+            config: Dict[str, Any], engine=None) -> str:
+    """
+    Egy feladat végrehajtása (modul szintű függvény, hogy a process pool át tudja adni).
+    Az állapotot és az előrehaladást rövid, önálló tranzakciókban írja, így a
+    státusz végpont futás közben is látja. Visszatér a végső státusszal.
+    """
+    engine = engine or _engine(database_uri)
+    table = BackgroundJob.__table__
+
+    def set_state(**values):
+        with engine.begin() as conn:
+            conn.execute(update(table).where(table.c.id == job_id).values(heartbeat_at=datetime.now(), **values))
+
+    def progress(percent: int, message: Optional[str] = None):
+        set_state(progress=max(0, min(100, int(percent))), message=message)
+
+    # Csak várakozó feladat indul el (kétszeres beküldés / helyreállított feladat ellen)
+    with engine.begin() as conn:
+        claimed = conn.execute(
+            update(table).where(table.c.id == job_id, table.c.status == JOB_QUEUED)
+            .values(status=JOB_RUNNING, started_at=datetime.now(), heartbeat_at=datetime.now())
+        ).rowcount
+    if not claimed:
+        return JOB_FAILED
+
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    try:
+        job = session.get(BackgroundJob, job_id)
+        result = JOB_TYPES[job.job_type].run(session, json.loads(job.params), progress, config)
+        session.rollback()
+
+        directory = os.path.join(results_dir, job_id)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, os.path.basename(result.filename))
+        with open(path + ".tmp", "wb") as f:
+            f.write(result.data)
+        os.replace(path + ".tmp", path)
+
+        finished = datetime.now()
+        set_state(status=JOB_SUCCEEDED, progress=100, message=None, finished_at=finished,
+                  result_path=path, result_filename=result.filename, result_mimetype=result.mimetype,
+                  expires_at=finished + timedelta(seconds=result_ttl_seconds))
+        return JOB_SUCCEEDED
+    except Exception as e:
+        session.rollback()
+        finished = datetime.now()
+        set_state(status=JOB_FAILED, finished_at=finished, error=f"{type(e).__name__}: {e}"[:2000],
+                  expires_at=finished + timedelta(seconds=result_ttl_seconds))
+        return JOB_FAILED
+    finally:
+        session.close()
+
+
+# --- Beküldés és lekérdezés (a web workerekben) ---
+
+class JobRunner:
+    """
+    Hosszú riportok és exportok háttérben futtatása.
+
+    A feladatok a background_jobs táblában élnek (bármely worker lekérdezheti
+    az állapotukat), a végrehajtás egy, az apphoz tartozó process poolban
+    történik, így a nehéz munka nem foglal gunicorn request workert és nem
+    fut bele a worker timeoutba. Az eredmény fájlba kerül (JOB_RESULTS_DIR),
+    letöltésig / lejáratig ott marad.
+
+    Ha a poolt futtató worker leáll, a félbemaradt feladatok életjele elavul;
+    ezeket a következő induláskor a recover_stale hibásnak jelöli.
+    Memóriabeli SQLite adatbázisnál (tesztek) a feladat a kérésben fut le,
+    mert a külön folyamat nem látná az adatbázist.
+    """
+
+    def __init__(self, max_workers: int = 2, results_dir: str = "", result_ttl_seconds: float = 86400,
+                 stale_after_seconds: float = 3600):
+        self.max_workers = max_workers
+        self.results_dir = results_dir
+        self.result_ttl_seconds = result_ttl_seconds
+        self.stale_after = timedelta(seconds=stale_after_seconds)
+        self.database_uri: Optional[str] = None
+        self.inline = True
+        self.config: Dict[str, Any] = {}
+        self._executor: Optional[Executor] = None
+        self._executor_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        from app.db.engine import db
+
+        self.max_workers = app.config.get("JOB_WORKERS", self.max_workers)
+        self.results_dir = app.config.get("JOB_RESULTS_DIR", self.results_dir)
+        self.result_ttl_seconds = app.config.get("JOB_RESULT_TTL_SECONDS", self.result_ttl_seconds)
+        self.stale_after = timedelta(seconds=app.config.get("JOB_STALE_SECONDS", self.stale_after.total_seconds()))
+        self.database_uri = app.config["SQLALCHEMY_DATABASE_URI"]
+        url = make_url(self.database_uri)
+        self.inline = (app.config.get("JOB_EXECUTOR", "process") == "inline"
+                       or (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")))
+        self.config = {key: app.config.get(key) for key in ("PAYROLL_LATE_AFTER", "PAYROLL_SHORT_DAY_MINUTES",
+                                                             "PARQUET_EXPORT_DIR")}
+        with app.app_context():
+            self.recover_stale(db.session)
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            # Fork után (gunicorn preload_app) a szülő poolját nem használjuk: workerenként saját pool
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def submit(self, session: Session, job_type: str, params: Optional[Dict[str, Any]],
+               user_id: Optional[int] = None) -> BackgroundJob:
+        """Feladat felvétele (paraméter-ellenőrzéssel) és átadása a poolnak; azonnal visszatér."""
+        from app.db.settings_cache import OVERTIME_THRESHOLD_KEY, settings_cache
+
+        if job_type not in JOB_TYPES:
+            raise ValidationError(f"Ismeretlen feladat típus: {job_type}")
+        params = JOB_TYPES[job_type].validate(params or {})
+        if JOB_TYPES[job_type].single_flight:
+            active = self._active_job(session, job_type)
+            if active is not None:
+                # Azonos kérés a már várakozó / futó feladathoz csatlakozik
+                if json.loads(active.params) == params:
+                    return active
+                raise ValidationError(f"Már fut egy {job_type} feladat ({active.id})", status_code=409)
+
+        job = BackgroundJob(id=uuid.uuid4().hex, job_type=job_type, params=json.dumps(params),
+                            status=JOB_QUEUED, progress=0, created_by=user_id, heartbeat_at=datetime.now())
+        session.add(job)
+        session.commit()
+
+        # A beállítás a feladat indításakori értékkel fut (a pool folyamatában nincs settings cache)
+        config = dict(self.config, overtime_threshold=settings_cache.get_int(OVERTIME_THRESHOLD_KEY, 540))
+        bind = session.get_bind()
+        args = (self.database_uri or bind.url.render_as_string(hide_password=False), job.id,
+                self.results_dir, self.result_ttl_seconds, config)
+        if self.inline:
+            run_job(*args, engine=bind)
+        else:
+            try:
+                self._get_executor().submit(run_job, *args)
+            except RuntimeError as e:
+                # Leállt / sérült pool: a feladat ne maradjon örökre várakozó
+                session.execute(update(BackgroundJob).where(BackgroundJob.id == job.id).values(
+                    status=JOB_FAILED, error=f"A feladat nem indítható: {e}", finished_at=datetime.now(),
+                ))
+                session.commit()
+        session.refresh(job)
+        return job
+
+    def _active_job(self, session: Session, job_type: str) -> Optional[BackgroundJob]:
+        """A legrégebbi várakozó / futó, még élő (friss életjelű) feladat az adott típusból."""
+        return session.execute(
+            select(BackgroundJob)
+            .where(BackgroundJob.job_type == job_type,
+                   BackgroundJob.status.in_((JOB_QUEUED, JOB_RUNNING)),
+                   BackgroundJob.heartbeat_at >= datetime.now() - self.stale_after)
+            .order_by(BackgroundJob.created_at)
+            .limit(1)
+        ).scalars().first()
+
+    def get(self, session: Session, job_id: str) -> BackgroundJob:
+        job = session.get(BackgroundJob, job_id)
+        if job is None:
+            raise NotFoundError(f"Feladat nem található: {job_id}")
+        session.refresh(job)
+        return job
+
+    def list_recent(self, session: Session, limit: int = 50) -> List[BackgroundJob]:
+        return session.execute(
+            select(BackgroundJob).order_by(BackgroundJob.created_at.desc()).limit(limit)
+        ).scalars().all()
+
+    def recover_stale(self, session: Session) -> int:
+        """Elavult életjelű várakozó / futó feladatok hibásra állítása (leállt feldolgozó)."""
+        now = datetime.now()
+        result = session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.status.in_((JOB_QUEUED, JOB_RUNNING)),
+                   BackgroundJob.heartbeat_at < now - self.stale_after)
+            .values(status=JOB_FAILED, error="A feldolgozó leállt, a feladat félbemaradt", finished_at=now,
+                    expires_at=now + timedelta(seconds=self.result_ttl_seconds))
+        )
+        session.commit()
+        return result.rowcount
+
+    def purge_expired(self, session: Session) -> int:
+        """Lejárt feladatok és eredményfájljaik törlése."""
+        expired = session.execute(
+            select(BackgroundJob.id, BackgroundJob.result_path).where(BackgroundJob.expires_at <= datetime.now())
+        ).all()
+        for _, path in expired:
+            if path:
+                try:
+                    os.remove(path)
+                    os.rmdir(os.path.dirname(path))
+                except OSError:
+                    pass
+        if expired:
+            session.execute(delete(BackgroundJob).where(BackgroundJob.id.in_([job_id for job_id, _ in expired])))
+        session.commit()
+        return len(expired)
+
+    @staticmethod
+    def to_dict(job: BackgroundJob) -> Dict[str, Any]:
+        return {
+            "id": job.id,
+            "type": job.job_type,
+            "params": json.loads(job.params),
+            "status": job.status,
+            "progress": job.progress,
+            "message": job.message,
+            "error": job.error,
+            "created_by": job.created_by,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+            "result_filename": job.result_filename,
+        }
+
+
+job_runner = JobRunner()
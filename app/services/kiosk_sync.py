@@ -0,0 +1,326 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.models import (
+    AttendanceRecord, AuditLog, KioskEvent, OutboxEvent, OvertimeRequest, RequestStatus, User, WorkLocation
+)
+from app.db.settings_cache import settings_cache, OVERTIME_THRESHOLD_KEY
+from app.db.unit_of_work import transaction
+from app.db.versioning import bump_versions, user_sessions_version_name, with_change_seqs
+from app.services.outbox import SESSION_CLOSED, outbox_row, session_payload
+from app.services.presence_index import presence_index
+from app.utils.error_handler import ServiceError, ValidationError
+
+EVENT_TYPES = ("check_in", "check_out")
+
+
+class _ConcurrentCheckout(Exception):
+    """Egy lezárandó munkamenetet közben (online check-out) már lezártak."""
+
+
+def _parse_timestamp(value) -> datetime:
+    """ISO 8601 időpont; időzónás érték a szerver helyi (naiv) idejére konvertálva."""
+    parsed = datetime.fromisoformat(str(value))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+class KioskSyncService:
+    """
+    Kioszkok offline sorba állított be/kijelentkezéseinek visszajátszása.
+
+    Egy köteg sok felhasználó eseményeit tartalmazhatja. Felhasználónként az
+    események beküldési sorrendben, időrendben kell kövessék egymást (és nem
+    lehetnek korábbiak a felhasználó utolsó rögzített időpontjánál). Az
+    ellenőrzés memóriában fut néhány csoportos lekérdezés után, az írás egy
+    tranzakcióban, bulk INSERT/UPDATE utasításokkal történik.
+    A kioszk esemény azonosítók a kiosk_events táblában tárolódnak, így az
+    újraküldött események "duplicate" eredményt kapnak, nem íródnak kétszer.
+    """
+
+    def __init__(self, db: Session, operator_id: int, max_events: int = 1000,
+                 max_clock_skew_seconds: int = 300, now: Optional[datetime] = None):
+        self.db = db
+        self.operator_id = operator_id
+        self.max_events = max_events
+        self.max_clock_skew = timedelta(seconds=max_clock_skew_seconds)
+        self.now = now
+
+    def sync(self, events: List[Dict[str, Any]], kiosk_id: Optional[str] = None) -> Dict[str, Any]:
+        if not isinstance(events, list) or not events:
+            raise ValidationError("Az 'events' mezőnek nem üres listának kell lennie")
+        if len(events) > self.max_events:
+            raise ValidationError(f"Egy kötegben legfeljebb {self.max_events} esemény küldhető")
+
+        results: List[Dict[str, Any]] = [None] * len(events)
+        parsed = self._parse_events(events, results)
+
+        try:
+            with transaction(self.db):
+                accepted = self._filter_duplicates(parsed, results)
+                sessions = self._replay(accepted, results)
+                self._write(accepted, sessions, kiosk_id, results)
+        except (IntegrityError, _ConcurrentCheckout):
+            # Párhuzamos online check-in / check-out vagy ugyanazon köteg egyidejű újraküldése:
+            # a teljes köteg visszagörgetve, újraküldve a már rögzítettek duplikáltként jönnek
+            raise ValidationError("Ütköző párhuzamos módosítás, a köteg újraküldhető", status_code=409)
+        except SQLAlchemyError:
+            raise ServiceError("Adatbázis hiba a kioszk szinkron során")
+
+        self._update_presence(sessions)
+
+        summary = {status: 0 for status in ("applied", "duplicate", "rejected")}
+        for result in results:
+            summary[result["status"]] += 1
+        return {"results": results, "summary": summary}
+
+    # --- 1. Formai ellenőrzés ---
+
+    def _parse_events(self, events, results) -> List[Dict[str, Any]]:
+        now = self.now or datetime.now()
+        seen = set()
+        parsed = []
+        for i, raw in enumerate(events):
+            event_id = raw.get("event_id") if isinstance(raw, dict) else None
+            try:
+                if not event_id or len(str(event_id)) > 64:
+                    raise ValueError("Hiányzó vagy túl hosszú event_id")
+                event_id = str(event_id)
+                if event_id in seen:
+                    results[i] = {"event_id": event_id, "status": "duplicate"}
+                    continue
+                seen.add(event_id)
+
+                if raw.get("type") not in EVENT_TYPES:
+                    raise ValueError("A 'type' értéke check_in vagy check_out lehet")
+                user_id = int(raw.get("user_id"))
+                timestamp = _parse_timestamp(raw.get("timestamp"))
+                if timestamp > now + self.max_clock_skew:
+                    raise ValueError("Az esemény időpontja a jövőben van")
+                location = WorkLocation(raw["location"]) if raw.get("location") else None
+            except (TypeError, ValueError) as e:
+                results[i] = {"event_id": event_id, "status": "rejected", "error": str(e)}
+                continue
+
+            parsed.append({
+                "index": i, "event_id": event_id, "type": raw["type"],
+                "user_id": user_id, "timestamp": timestamp, "location": location,
+            })
+        return parsed
+
+    # --- 2. Duplikációk (korábbi kötegekből) ---
+
+    def _filter_duplicates(self, parsed, results) -> List[Dict[str, Any]]:
+        if not parsed:
+            return []
+        stored = dict(self.db.execute(
+            select(KioskEvent.event_id, KioskEvent.work_session_id)
+            .where(KioskEvent.event_id.in_([event["event_id"] for event in parsed]))
+        ).all())
+
+        accepted = []
+        for event in parsed:
+            if event["event_id"] in stored:
+                results[event["index"]] = {
+                    "event_id": event["event_id"], "status": "duplicate",
+                    "session_id": stored[event["event_id"]],
+                }
+            else:
+                accepted.append(event)
+        return accepted
+
+    # --- 3. Visszajátszás memóriában ---
+
+    def _replay(self, events, results) -> List[Dict[str, Any]]:
+        """Felhasználónkénti állapotgép; visszatér az érintett (új vagy lezárt) munkamenetekkel."""
+        user_ids = {event["user_id"] for event in events}
+        if not user_ids:
+            return []
+
+        active = set(self.db.execute(
+            select(User.id).where(User.id.in_(user_ids), User.is_active == True)
+        ).scalars())
+        open_sessions = {
+            row.user_id: {"id": row.id, "user_id": row.user_id, "check_in": row.check_in,
+                          "work_location": row.work_location, "check_out": None, "new": False}
+            for row in self.db.execute(
+                select(AttendanceRecord.id, AttendanceRecord.user_id, AttendanceRecord.check_in,
+                       AttendanceRecord.work_location)
+                .where(AttendanceRecord.user_id.in_(user_ids), AttendanceRecord.check_out.is_(None))
+            )
+        }
+        last_seen = {
+            user_id: max(filter(None, (last_in, last_out)))
+            for user_id, last_in, last_out in self.db.execute(
+                select(AttendanceRecord.user_id, func.max(AttendanceRecord.check_in),
+                       func.max(AttendanceRecord.check_out))
+                .where(AttendanceRecord.user_id.in_(user_ids))
+                .group_by(AttendanceRecord.user_id)
+            )
+        }
+
+        touched = []
+        for event in events:
+            user_id, timestamp = event["user_id"], event["timestamp"]
+            current = open_sessions.get(user_id)
+            error = None
+            if user_id not in active:
+                error = "Ismeretlen vagy inaktív felhasználó"
+            elif user_id in last_seen and timestamp < last_seen[user_id]:
+                error = "Időrendi hiba: korábbi, mint a felhasználó utolsó eseménye"
+            elif event["type"] == "check_in" and current is not None:
+                error = "Már van aktív munkamenet!"
+            elif event["type"] == "check_out" and current is None:
+                error = "Nincs aktív bejelentkezés."
+
+            if error:
+                results[event["index"]] = {"event_id": event["event_id"], "status": "rejected", "error": error}
+                continue
+
+            if event["type"] == "check_in":
+                current = {"id": None, "user_id": user_id, "check_in": timestamp,
+                           "work_location": event["location"] or WorkLocation.OFFICE,
+                           "check_out": None, "new": True}
+                open_sessions[user_id] = current
+                touched.append(current)
+            else:
+                current["check_out"] = timestamp
+                if event["location"]:
+                    current["work_location"] = event["location"]
+                if not current["new"]:
+                    touched.append(current)
+                del open_sessions[user_id]
+
+            last_seen[user_id] = timestamp
+            event["session"] = current
+            results[event["index"]] = {"event_id": event["event_id"], "status": "applied"}
+        return touched
+
+    # --- 4. Írás bulk utasításokkal ---
+
+    def _write(self, events, sessions, kiosk_id, results):
+        applied = [event for event in events if results[event["index"]]["status"] == "applied"]
+        if not applied:
+            return
+
+        threshold = settings_cache.get_int(OVERTIME_THRESHOLD_KEY, 540)
+        for session in sessions:
+            closed = session["check_out"] is not None
+            session["work_duration"] = (
+                int((session["check_out"] - session["check_in"]).total_seconds() / 60) if closed else None
+            )
+            session["overtime"] = (
+                session["work_duration"] - threshold if closed and session["work_duration"] > threshold else 0
+            )
+
+        closed_existing = [session for session in sessions if not session["new"]]
+        if closed_existing:
+            # Az új sorok beszúrása előtt: a kötegben újranyitott munkamenet különben a
+            # részleges unique indexbe ütközne (egy felhasználónak egy nyitott munkamenete).
+            # A _replay óta nyitottnak látott munkamenetek lefoglalása: ami közben lezárult,
+            # azt nem írjuk felül (a pontos értékeket a PK szerinti bulk UPDATE állítja be)
+            expected = {session["id"] for session in closed_existing}
+            claimed = self.db.execute(
+                update(AttendanceRecord)
+                .where(AttendanceRecord.id.in_(expected), AttendanceRecord.check_out.is_(None))
+                .values(check_out=AttendanceRecord.check_in)
+                .returning(AttendanceRecord.id)
+                .execution_options(synchronize_session=False)
+            ).scalars().all()
+            if set(claimed) != expected:
+                raise _ConcurrentCheckout()
+            self.db.execute(update(AttendanceRecord), with_change_seqs(self.db, [
+                {
+                    "id": session["id"],
+                    "check_out": session["check_out"],
+                    "work_location": session["work_location"],
+                    "work_duration": session["work_duration"],
+                    "is_overtime_generated": session["overtime"] > 0,
+                }
+                for session in closed_existing
+            ]))
+
+        new_sessions = [session for session in sessions if session["new"]]
+        if new_sessions:
+            ids = self.db.execute(
+                insert(AttendanceRecord).returning(AttendanceRecord.id, sort_by_parameter_order=True),
+                with_change_seqs(self.db, [
+                    {
+                        "user_id": session["user_id"],
+                        "check_in": session["check_in"],
+                        "check_out": session["check_out"],
+                        "work_location": session["work_location"],
+                        "work_duration": session["work_duration"],
+                        "date": session["check_in"].date(),
+                        "is_overtime_generated": session["overtime"] > 0,
+                    }
+                    for session in new_sessions
+                ]),
+            ).scalars().all()
+            for session, record_id in zip(new_sessions, ids):
+                session["id"] = record_id
+
+        overtime = [session for session in sessions if session["overtime"] > 0]
+        if overtime:
+            self.db.execute(insert(OvertimeRequest), with_change_seqs(self.db, [
+                {
+                    "user_id": session["user_id"],
+                    "work_session_id": session["id"],
+                    "overtime_minutes": session["overtime"],
+                    "status": RequestStatus.PENDING,
+                    "is_auto_generated": True,
+                }
+                for session in overtime
+            ]))
+
+        closed = [session for session in sessions if session["check_out"] is not None]
+        if closed:
+            self.db.execute(insert(OutboxEvent), [
+                outbox_row(SESSION_CLOSED, session["user_id"], session_payload(
+                    session["id"], session["user_id"], session["check_in"], session["check_out"],
+                    session["work_duration"], session["work_location"],
+                ))
+                for session in closed
+            ])
+
+        self.db.execute(insert(KioskEvent), [
+            {
+                "event_id": event["event_id"],
+                "kiosk_id": kiosk_id,
+                "user_id": event["user_id"],
+                "event_type": event["type"],
+                "occurred_at": event["timestamp"],
+                "work_session_id": event["session"]["id"],
+            }
+            for event in applied
+        ])
+        self.db.execute(insert(AuditLog), [
+            {
+                "user_id": event["user_id"],
+                "action": f"kiosk_{event['type']}",
+                "entity_type": "attendance",
+                "entity_id": event["session"]["id"],
+                "description": f"Kioszk szinkron ({kiosk_id or 'ismeretlen kioszk'}), "
+                               f"időpont: {event['timestamp'].isoformat()}, rögzítette: {self.operator_id}",
+            }
+            for event in applied
+        ])
+
+        bump_versions(self.db, (user_sessions_version_name(event["user_id"]) for event in applied))
+        for event in applied:
+            results[event["index"]]["session_id"] = event["session"]["id"]
+
+    def _update_presence(self, sessions):
+        for session in sessions:
+            if session["check_out"] is None:
+                presence_index.checked_in(AttendanceRecord(
+                    id=session["id"], user_id=session["user_id"],
+                    work_location=session["work_location"], check_in=session["check_in"],
+                ))
+            else:
+                presence_index.checked_out(session["user_id"], record_id=session["id"])
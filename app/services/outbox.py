@@ -0,0 +1,194 @@
+import hashlib
+import hmac
+import json
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.models import OutboxEvent, RequestStatus
+
+# Esemény típusok
+SESSION_CLOSED = "attendance.session_closed"
+SESSION_MODIFIED = "attendance.session_modified"
+OVERTIME_REVIEWED = "overtime.reviewed"
+
+SIGNATURE_HEADER = "X-Outbox-Signature"
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def session_payload(session_id: int, user_id: int, check_in: datetime, check_out: Optional[datetime],
+                    work_duration: Optional[int], work_location) -> Dict[str, Any]:
+    return {
+        "session_id": session_id,
+        "user_id": user_id,
+        "date": check_in.date().isoformat(),
+        "check_in": _iso(check_in),
+        "check_out": _iso(check_out),
+        "work_duration": work_duration,
+        "work_location": getattr(work_location, "value", work_location),
+    }
+
+
+def outbox_row(event_type: str, user_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Egy outbox sor oszlopai (bulk INSERT-hez is)."""
+    return {"event_type": event_type, "user_id": user_id, "payload": json.dumps(payload)}
+
+
+def publish(db: Session, event_type: str, user_id: int, payload: Dict[str, Any]) -> OutboxEvent:
+    """Esemény rögzítése a hívó tranzakciójában (commit nélkül)."""
+    event = OutboxEvent(**outbox_row(event_type, user_id, payload))
+    db.add(event)
+    return event
+
+
+def publish_session(db: Session, event_type: str, record, **extra) -> OutboxEvent:
+    payload = session_payload(record.id, record.user_id, record.check_in, record.check_out,
+                              record.work_duration, record.work_location)
+    payload.update(extra)
+    return publish(db, event_type, record.user_id, payload)
+
+
+def publish_overtime_reviewed(db: Session, request) -> Optional[OutboxEvent]:
+    if request.status not in (RequestStatus.APPROVED, RequestStatus.REJECTED):
+        return None
+    return publish(db, OVERTIME_REVIEWED, request.user_id, {
+        "overtime_request_id": request.id,
+        "user_id": request.user_id,
+        "session_id": request.work_session_id,
+        "overtime_minutes": request.overtime_minutes,
+        "status": request.status.value,
+        "reviewed_by": request.reviewed_by,
+        "reviewed_at": _iso(request.reviewed_at),
+    })
+
+
+def _post_json(url: str, body: bytes, headers: Dict[str, str], timeout: float) -> None:
+    import requests
+
+    response = requests.post(url, data=body, headers=headers, timeout=timeout)
+    response.raise_for_status()
+
+
+class OutboxDispatcher:
+    """
+    Az outbox_events tábla kiküldése egy HTTP webhookra, kötegekben.
+
+    Egy köteg egyetlen POST ({"events": [...]}); sikeres (2xx) válasz esetén a
+    köteg összes eseménye kiküldöttnek számít, hiba esetén mindegyik exponenciális
+    visszalépéssel újrapróbálódik. Felhasználónként a sorrend megmarad: ha egy
+    felhasználó korábbi eseménye várakozik, a későbbiei sem mennek ki előtte.
+    Egyszerre egy dispatcher folyamat fusson (a sorrend garancia ezen alapul).
+    A fogadó az esemény id alapján szűrheti a duplikációt (legalább egyszeri kézbesítés).
+    """
+
+    def __init__(self, db: Session, webhook_url: str, secret: Optional[str] = None, batch_size: int = 100,
+                 timeout: float = 10.0, base_backoff: float = 2.0, max_backoff: float = 300.0,
+                 post: Callable[[str, bytes, Dict[str, str], float], None] = _post_json,
+                 now: Callable[[], datetime] = datetime.now):
+        if not webhook_url:
+            raise ValueError("A webhook URL megadása kötelező")
+        self.db = db
+        self.webhook_url = webhook_url
+        self.secret = secret
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.post = post
+        self.now = now
+
+    def _next_batch(self, now: datetime) -> List[OutboxEvent]:
+        # Visszalépésben várakozó eseményű felhasználók későbbi eseményei sem mehetnek ki
+        held_users = select(OutboxEvent.user_id).where(
+            OutboxEvent.dispatched_at.is_(None), OutboxEvent.next_attempt_at > now,
+        ).distinct()
+        return self.db.execute(
+            select(OutboxEvent)
+            .where(
+                OutboxEvent.dispatched_at.is_(None),
+                or_(OutboxEvent.next_attempt_at.is_(None), OutboxEvent.next_attempt_at <= now),
+                OutboxEvent.user_id.not_in(held_users),
+            )
+            .order_by(OutboxEvent.id)
+            .limit(self.batch_size)
+        ).scalars().all()
+
+    def _body(self, batch: List[OutboxEvent]) -> bytes:
+        return json.dumps({"events": [
+            {
+                "id": event.id,
+                "type": event.event_type,
+                "user_id": event.user_id,
+                "created_at": _iso(event.created_at),
+                "payload": json.loads(event.payload),
+            }
+            for event in batch
+        ]}).encode("utf-8")
+
+    def dispatch_batch(self) -> Dict[str, int]:
+        """Egy köteg kiküldése. Visszatér: {"sent": n, "failed": n}."""
+        now = self.now()
+        try:
+            batch = self._next_batch(now)
+        except SQLAlchemyError:
+            self.db.rollback()
+            raise
+        if not batch:
+            self.db.rollback()
+            return {"sent": 0, "failed": 0}
+
+        ids = [event.id for event in batch]
+        body = self._body(batch)
+        headers = {"Content-Type": "application/json"}
+        if self.secret:
+            signature = hmac.new(self.secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            headers[SIGNATURE_HEADER] = f"sha256={signature}"
+
+        try:
+            self.post(self.webhook_url, body, headers, self.timeout)
+        except Exception as e:
+            attempts = max(event.attempts for event in batch) + 1
+            delay = min(self.max_backoff, self.base_backoff * 2 ** (attempts - 1))
+            self.db.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id.in_(ids))
+                .values(attempts=OutboxEvent.attempts + 1,
+                        next_attempt_at=now + timedelta(seconds=delay),
+                        last_error=str(e)[:1000])
+            )
+            self.db.commit()
+            print(f"Outbox dispatch failed ({len(ids)} events, retry in {delay:.0f} s):", e)
+            return {"sent": 0, "failed": len(ids)}
+
+        self.db.execute(
+            update(OutboxEvent).where(OutboxEvent.id.in_(ids)).values(dispatched_at=now, last_error=None)
+        )
+        self.db.commit()
+        return {"sent": len(ids), "failed": 0}
+
+    def drain(self, max_batches: int = 1000) -> Dict[str, int]:
+        """Kötegek kiküldése, amíg van esedékes esemény (vagy hiba történik)."""
+        totals = {"sent": 0, "failed": 0, "batches": 0}
+        for _ in range(max_batches):
+            result = self.dispatch_batch()
+            if not result["sent"] and not result["failed"]:
+                break
+            totals["sent"] += result["sent"]
+            totals["failed"] += result["failed"]
+            totals["batches"] += 1
+            if result["failed"]:
+                break
+        return totals
+
+    def purge_dispatched(self, older_than: timedelta) -> int:
+        result = self.db.execute(
+            delete(OutboxEvent).where(OutboxEvent.dispatched_at < self.now() - older_than)
+        )
+        self.db.commit()
+        return result.rowcount
@@ -0,0 +1,122 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.models import OvertimeBalance, OvertimeLedgerEntry, OvertimeRequest, RequestStatus
+
+
+class OvertimeLedgerService:
+    """
+    Felhasználónkénti jóváhagyott túlóra egyenleg, inkrementálisan karbantartva.
+
+    Minden státuszváltásnál (jóváhagyás, elutasítás, újraelbírálás) a különbség
+    kerül könyvelésre, így az egyenleg lekérdezése egyetlen PK keresés.
+    A metódusok nem commitolnak, a hívó tranzakciójának részei.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_status_change(self, request: OvertimeRequest, old_status: Optional[RequestStatus]) -> Optional[OvertimeLedgerEntry]:
+        was_approved = old_status == RequestStatus.APPROVED
+        is_approved = request.status == RequestStatus.APPROVED
+        if was_approved == is_approved:
+            return None
+
+        delta = request.overtime_minutes if is_approved else -request.overtime_minutes
+        balance = self._get_balance_for_update(request.user_id)
+        balance.approved_minutes += delta
+        balance.approved_count += 1 if is_approved else -1
+
+        entry = OvertimeLedgerEntry(
+            user_id=request.user_id,
+            overtime_request_id=request.id,
+            delta_minutes=delta,
+            balance_after=balance.approved_minutes,
+            description="Túlóra jóváhagyva" if is_approved else "Jóváhagyás visszavonva",
+        )
+        self.db.add(entry)
+        return entry
+
+    def _get_balance_for_update(self, user_id: int) -> OvertimeBalance:
+        balance = self._select_balance_for_update(user_id)
+        if balance is None:
+            # Első jóváhagyás: a FOR UPDATE nem zárol hiányzó sort, két párhuzamos
+            # elbírálás is idáig juthat – a vesztes savepointja visszagörgetődik
+            try:
+                with self.db.begin_nested():
+                    self.db.add(OvertimeBalance(user_id=user_id, approved_minutes=0, approved_count=0))
+            except IntegrityError:
+                pass
+            balance = self._select_balance_for_update(user_id)
+        return balance
+
+    def _select_balance_for_update(self, user_id: int) -> Optional[OvertimeBalance]:
+        return (
+            self.db.query(OvertimeBalance)
+            .filter(OvertimeBalance.user_id == user_id)
+            .with_for_update()
+            .first()
+        )
+
+    def get_balance(self, user_id: int) -> Dict[str, Any]:
+        """O(1) egyenleg lekérdezés."""
+        balance = self.db.get(OvertimeBalance, user_id)
+        minutes = balance.approved_minutes if balance else 0
+        return {
+            "user_id": user_id,
+            "approved_minutes": minutes,
+            "approved_hours": round(minutes / 60, 2),
+            "approved_count": balance.approved_count if balance else 0,
+            "updated_at": balance.updated_at.isoformat() if balance and balance.updated_at else None,
+        }
+
+    def reconcile(self, fix: bool = False) -> List[Dict[str, Any]]:
+        """
+        Egyenlegek összevetése a nyers túlóra kérelmekkel.
+        Visszatér az eltérésekkel; fix=True esetén korrekciós bejegyzéssel javít (commit nélkül).
+        """
+        expected = {
+            user_id: (minutes or 0, count)
+            for user_id, minutes, count in self.db.query(
+                OvertimeRequest.user_id,
+                func.sum(OvertimeRequest.overtime_minutes),
+                func.count(OvertimeRequest.id),
+            )
+            .filter(OvertimeRequest.status == RequestStatus.APPROVED)
+            .group_by(OvertimeRequest.user_id)
+            .all()
+        }
+        actual = {b.user_id: b for b in self.db.query(OvertimeBalance).all()}
+
+        mismatches = []
+        for user_id in sorted(set(expected) | set(actual)):
+            exp_minutes, exp_count = expected.get(user_id, (0, 0))
+            balance = actual.get(user_id)
+            act_minutes = balance.approved_minutes if balance else 0
+            act_count = balance.approved_count if balance else 0
+            if (exp_minutes, exp_count) == (act_minutes, act_count):
+                continue
+
+            mismatches.append({
+                "user_id": user_id,
+                "expected_minutes": exp_minutes,
+                "ledger_minutes": act_minutes,
+                "expected_count": exp_count,
+                "ledger_count": act_count,
+            })
+            if fix:
+                if balance is None:
+                    balance = OvertimeBalance(user_id=user_id, approved_minutes=0, approved_count=0)
+                    self.db.add(balance)
+                balance.approved_minutes = exp_minutes
+                balance.approved_count = exp_count
+                self.db.add(OvertimeLedgerEntry(
+                    user_id=user_id,
+                    delta_minutes=exp_minutes - act_minutes,
+                    balance_after=exp_minutes,
+                    description="Egyeztetési korrekció",
+                ))
+        return mismatches
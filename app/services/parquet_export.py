@@ -0,0 +1,178 @@
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Enum, func, select
+from sqlalchemy.orm import Session
+
+from app.db.models import AttendanceRecord, ModificationRequest, OvertimeRequest
+from app.utils.error_handler import ValidationError
+
+try:
+    import fcntl
+except ImportError:  # Windows: nincs flock, a zárolás kimarad
+    fcntl = None
+
+STATE_FILE = "_export_state.json"
+LOCK_FILE = "_export.lock"
+
+# Exportált táblák és a havi partícionálás alapjául szolgáló oszlop
+EXPORT_TABLES = {
+    "work_sessions": (AttendanceRecord.__table__, AttendanceRecord.date),
+    "overtime_requests": (OvertimeRequest.__table__, OvertimeRequest.request_date),
+    "modification_requests": (ModificationRequest.__table__, ModificationRequest.created_at),
+}
+
+
+class ParquetExporter:
+    """
+    Inkrementális Parquet export elemzési célra, havi partíciókban:
+
+        <output_dir>/<tábla>/month=YYYY-MM/data.parquet
+
+    Táblánként egyetlen aggregáló lekérdezés adja havonta a sorszámot, az ID-k
+    összegét és a legnagyobb updated_at értéket (partíciónkénti watermark).
+    Csak azok a partíciók íródnak újra, amelyek ujjlenyomata eltér az előző
+    futáskor mentettől – így módosítás, törlés és hónapok közti áthelyezés is
+    észlelhető, a változatlan hónapokat pedig nem olvassuk ki újra.
+    """
+
+    def __init__(self, db: Session, output_dir: str):
+        self.db = db
+        self.output_dir = output_dir
+
+    # --- Állapot ---
+
+    def _state_path(self) -> str:
+        return os.path.join(self.output_dir, STATE_FILE)
+
+    def load_state(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._state_path(), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    @contextmanager
+    def _exclusive(self):
+        """
+        Kizárólagos zár a célkönyvtárra (háttérfeladat és CLI is), hogy két export ne írja
+        egyszerre ugyanazokat a partíciókat és az állapotfájlt. A folyamat leállásakor a zár felszabadul.
+        """
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.output_dir, LOCK_FILE), "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise ValidationError("Ebbe a könyvtárba már fut egy Parquet export", status_code=409)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _save_state(self, state: Dict[str, Dict[str, Any]]):
+        tmp = self._state_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp, self._state_path())
+
+    # --- Lekérdezések ---
+
+    def _month_key(self, column):
+        if self.db.get_bind().dialect.name == "sqlite":
+            return func.strftime("%Y-%m", column)
+        return func.to_char(column, "YYYY-MM")
+
+    def _server_now(self) -> datetime:
+        # Az updated_at időzóna nélküli DateTime (func.now() a szerver helyi idejében tárolva).
+        # PostgreSQL-en a now() időzónás, ezért az ezzel összevethető naiv LOCALTIMESTAMP kell;
+        # SQLite-on a CURRENT_TIMESTAMP eleve naiv, és az updated_at is ebből íródik
+        if self.db.get_bind().dialect.name == "sqlite":
+            return self.db.scalar(select(func.now()))
+        return self.db.scalar(select(func.localtimestamp()))
+
+    def _fingerprints(self, table, partition_column, started_at) -> Dict[str, Dict[str, Any]]:
+        month = self._month_key(partition_column)
+        rows = self.db.execute(
+            select(month, func.count(), func.sum(table.c.id), func.max(table.c.updated_at))
+            .group_by(month)
+        ).all()
+        return {
+            m: {
+                "rows": count,
+                "id_sum": int(id_sum or 0),
+                # Az updated_at csak másodperc pontosságú: az export közben módosult
+                # partíció watermarkja nem kerül mentésre, így a következő futás újraírja
+                "watermark": watermark.isoformat() if watermark is not None and watermark < started_at else None,
+            }
+            for m, count, id_sum, watermark in rows
+            if m is not None
+        }
+
+    def _read_partition(self, table, partition_column, month: str) -> pd.DataFrame:
+        result = self.db.execute(select(table).where(self._month_key(partition_column) == month))
+        df = pd.DataFrame(result.all(), columns=list(result.keys()))
+        # Enum oszlopok az API-val egyező szöveges értékként
+        for column in table.columns:
+            if isinstance(column.type, Enum):
+                df[column.name] = df[column.name].map(lambda v: v.value if v is not None else None)
+        return df
+
+    # --- Írás ---
+
+    def _partition_dir(self, table_name: str, month: str) -> str:
+        return os.path.join(self.output_dir, table_name, f"month={month}")
+
+    def _write_partition(self, table_name: str, month: str, df: pd.DataFrame):
+        directory = self._partition_dir(table_name, month)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "data.parquet")
+        tmp = path + ".tmp"
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+        # Atomikus csere: az elemzők soha nem látnak félkész fájlt
+        os.replace(tmp, path)
+
+    def export(self, full: bool = False,
+               progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Export futtatása. full=True esetén minden partíció újraíródik.
+        Visszatér táblánként az újraírt és törölt hónapokkal.
+        progress(kész táblák, összes tábla) minden tábla után meghívódik.
+        Ha ugyanebbe a könyvtárba már fut egy export, 409-es ValidationError.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        with self._exclusive():
+            state = self.load_state()
+            summary = {}
+            started_at = self._server_now()
+
+            for table_name, (table, partition_column) in EXPORT_TABLES.items():
+                previous = state.get(table_name, {})
+                current = self._fingerprints(table, partition_column, started_at)
+
+                written = sorted(
+                    m for m, fp in current.items()
+                    if full or previous.get(m) != fp or previous[m]["watermark"] is None
+                )
+                removed = sorted(m for m in previous if m not in current)
+
+                for month in written:
+                    self._write_partition(table_name, month, self._read_partition(table, partition_column, month))
+                for month in removed:
+                    shutil.rmtree(self._partition_dir(table_name, month), ignore_errors=True)
+
+                state[table_name] = current
+                # Részleges futás után is megmarad a már kiírt partíciók állapota
+                self._save_state(state)
+                summary[table_name] = {"written": written, "removed": removed}
+                if progress:
+                    progress(len(summary), len(EXPORT_TABLES))
+        return summary
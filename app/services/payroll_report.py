@@ -0,0 +1,140 @@
+import calendar
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import String, select, type_coerce
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.models import AttendanceRecord, User, WorkLocation
+from app.db.settings_cache import OVERTIME_THRESHOLD_KEY, settings_cache
+from app.utils.error_handler import ServiceError, ValidationError
+
+# Kimeneti oszlopok sorrendje (CSV fejléc is)
+PAYROLL_COLUMNS = [
+    "user_id", "username", "worked_days", "total_minutes", "total_hours",
+    "office_days", "home_office_days", "other_days",
+    "overtime_minutes", "late_days", "short_days",
+]
+
+_LOCATION_COLUMNS = {
+    WorkLocation.OFFICE.name: "office_days",
+    WorkLocation.HOME_OFFICE.name: "home_office_days",
+    WorkLocation.OTHER.name: "other_days",
+}
+
+
+def parse_month(value: Optional[str]) -> date:
+    """'YYYY-MM' -> a hónap első napja."""
+    if not value:
+        raise ValidationError("A 'month' paraméter kötelező (YYYY-MM).")
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise ValidationError(f"Érvénytelen hónap: {value} (várt formátum: YYYY-MM)")
+
+
+class PayrollReportService:
+    """
+    Havi bérszámfejtési riport az egész szervezetre.
+
+    A hónap lezárt munkameneteit egyetlen oszlopos lekérdezéssel tölti be,
+    a felhasználónkénti mutatókat pandas group-by műveletekkel számolja,
+    így nincs felhasználónkénti lekérdezés vagy Python ciklus.
+    """
+
+    def __init__(self, db: Session, late_after: str = "09:00", short_day_minutes: int = 480,
+                 overtime_threshold: Optional[int] = None):
+        self.db = db
+        hours, minutes = (int(x) for x in late_after.split(":"))
+        self.late_after_minutes = hours * 60 + minutes
+        self.short_day_minutes = short_day_minutes
+        self.overtime_threshold = overtime_threshold
+
+    def _load_sessions(self, start: date, end: date) -> pd.DataFrame:
+        stmt = (
+            select(
+                AttendanceRecord.user_id,
+                AttendanceRecord.date,
+                AttendanceRecord.check_in,
+                AttendanceRecord.work_duration,
+                # Nyers enum név, így nem jön létre soronként Python enum objektum
+                type_coerce(AttendanceRecord.work_location, String),
+            )
+            .where(
+                AttendanceRecord.date >= start,
+                AttendanceRecord.date <= end,
+                AttendanceRecord.check_out.isnot(None),
+            )
+        )
+        rows = self.db.execute(stmt).all()
+        df = pd.DataFrame(rows, columns=["user_id", "date", "check_in", "work_duration", "work_location"])
+        df["work_duration"] = df["work_duration"].fillna(0).astype(np.int64)
+        df["check_in"] = pd.to_datetime(df["check_in"])
+        return df
+
+    def _load_users(self) -> pd.DataFrame:
+        rows = self.db.execute(
+            select(User.id, User.username).where(User.is_active == True).order_by(User.id)
+        ).all()
+        return pd.DataFrame(rows, columns=["user_id", "username"]).set_index("user_id")
+
+    def monthly_report(self, month: date) -> pd.DataFrame:
+        """Felhasználónként egy sor, PAYROLL_COLUMNS oszlopokkal."""
+        start = month.replace(day=1)
+        end = start.replace(day=calendar.monthrange(start.year, start.month)[1])
+        threshold = self.overtime_threshold
+        if threshold is None:
+            threshold = settings_cache.get_int(OVERTIME_THRESHOLD_KEY, 540)
+
+        try:
+            sessions = self._load_sessions(start, end)
+            users = self._load_users()
+        except SQLAlchemyError:
+            raise ServiceError("Adatbázis hiba a bérszámfejtési riport során")
+
+        # Napi szint: (user, nap) -> ledolgozott percek, első belépés
+        daily = sessions.groupby(["user_id", "date"], sort=False).agg(
+            minutes=("work_duration", "sum"),
+            first_in=("check_in", "min"),
+        )
+        first_in_minutes = daily["first_in"].dt.hour * 60 + daily["first_in"].dt.minute
+        daily["overtime"] = np.maximum(daily["minutes"].to_numpy() - threshold, 0)
+        daily["late"] = first_in_minutes.to_numpy() > self.late_after_minutes
+        daily["short"] = daily["minutes"].to_numpy() < self.short_day_minutes
+
+        per_user = daily.groupby(level="user_id").agg(
+            worked_days=("minutes", "size"),
+            total_minutes=("minutes", "sum"),
+            overtime_minutes=("overtime", "sum"),
+            late_days=("late", "sum"),
+            short_days=("short", "sum"),
+        )
+
+        # Helyszínenként a különböző napok száma
+        location_days = (
+            sessions.drop_duplicates(["user_id", "date", "work_location"])
+            .groupby(["user_id", "work_location"]).size()
+            .unstack(fill_value=0)
+            .rename(columns=_LOCATION_COLUMNS)
+        )
+
+        report = users.join(per_user, how="outer").join(location_days, how="left")
+        for column in PAYROLL_COLUMNS[2:]:
+            if column not in report:
+                report[column] = 0
+        report = report.fillna({c: 0 for c in PAYROLL_COLUMNS[2:]})
+        report["total_hours"] = (report["total_minutes"] / 60).round(2)
+
+        report = report.reset_index().rename(columns={"index": "user_id"})
+        int_columns = [c for c in PAYROLL_COLUMNS[2:] if c != "total_hours"]
+        report[int_columns] = report[int_columns].astype(np.int64)
+        return report[PAYROLL_COLUMNS].sort_values("user_id", ignore_index=True)
+
+    @staticmethod
+    def to_records(report: pd.DataFrame) -> List[Dict[str, Any]]:
+        """JSON-kompatibilis lista (numpy típusok nélkül)."""
+        records = report.astype(object).where(report.notna(), None).to_dict(orient="records")
+        return records
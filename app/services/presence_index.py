@@ -0,0 +1,155 @@
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.models import CHANGE_SEQ_NAME, AttendanceRecord, WorkLocation
+from app.db.versioning import read_version
+
+
+class PresenceEntry(NamedTuple):
+    user_id: int
+    record_id: int
+    work_location: WorkLocation
+    check_in: datetime
+
+
+class PresenceIndex:
+    """
+    Ki van bent most: user_id -> nyitott munkamenet, helyszínenkénti számlálókkal.
+
+    Induláskor a nyitott munkamenetekből épül fel (a részleges unique index miatt
+    ez O(jelenlévők)), utána az AttendanceService check_in/check_out frissíti O(1)-ben.
+    Mivel workerenként külön példány él, legfeljebb `resync_interval` másodpercenként
+    a change_seq számlálóhoz igazodik: ha az nem lépett, nincs több lekérdezés,
+    különben csak az utoljára látott sorszám óta változott munkamenetek töltődnek
+    be (change_seq indexen). Teljes újraépítés csak indításkor, illetve akkor van,
+    ha a lemaradás több mint `max_delta` sor.
+    """
+
+    def __init__(
+        self,
+        resync_interval: float = 5.0,
+        max_delta: int = 5000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._entries: Dict[int, PresenceEntry] = {}
+        self._counts: Dict[WorkLocation, int] = {location: 0 for location in WorkLocation}
+        self._lock = threading.Lock()
+        self._seq: Optional[int] = None
+        self._checked_at = 0.0
+        self.resync_interval = resync_interval
+        self.max_delta = max_delta
+        self.clock = clock
+
+    def init_app(self, app):
+        from app.db.engine import db
+
+        self.resync_interval = app.config.get("PRESENCE_RESYNC_SECONDS", self.resync_interval)
+        with app.app_context():
+            self.rebuild(db.session)
+
+    def rebuild(self, session: Session):
+        """Teljes újraépítés a nyitott munkamenetekből."""
+        # A számláló a tábla előtt: a közben commitolt változásokat a következő resync újra alkalmazza
+        seq = read_version(session, CHANGE_SEQ_NAME)
+        rows = session.query(
+            AttendanceRecord.user_id, AttendanceRecord.id, AttendanceRecord.work_location, AttendanceRecord.check_in
+        ).filter(AttendanceRecord.check_out.is_(None)).all()
+
+        entries = {row[0]: PresenceEntry(*row) for row in rows}
+        counts = {location: 0 for location in WorkLocation}
+        for entry in entries.values():
+            counts[entry.work_location] += 1
+
+        with self._lock:
+            self._entries = entries
+            self._counts = counts
+            self._seq = seq
+            self._checked_at = self.clock()
+
+    def resync_if_stale(self, session: Session):
+        if self._seq is not None and self.clock() - self._checked_at < self.resync_interval:
+            return
+        try:
+            if self._seq is None:
+                self.rebuild(session)
+            else:
+                self._apply_changes(session)
+        except SQLAlchemyError as e:
+            print("Presence index resync failed:", e)
+
+    def _apply_changes(self, session: Session):
+        """
+        Az utoljára látott change_seq óta módosult munkamenetek alkalmazása.
+        A számláló commitolt értékénél nagyobb sorszámot nem olvas (mint a ChangeFeedService),
+        így nyitott tranzakció sorát sem hagyja ki.
+        """
+        high_water = read_version(session, CHANGE_SEQ_NAME)
+        if high_water == self._seq:
+            self._checked_at = self.clock()
+            return
+
+        rows = session.query(
+            AttendanceRecord.user_id, AttendanceRecord.id, AttendanceRecord.work_location,
+            AttendanceRecord.check_in, AttendanceRecord.check_out,
+        ).filter(
+            AttendanceRecord.change_seq > self._seq, AttendanceRecord.change_seq <= high_water
+        ).order_by(AttendanceRecord.change_seq).limit(self.max_delta + 1).all()
+        if len(rows) > self.max_delta:
+            self.rebuild(session)
+            return
+
+        # Soronként az aktuális állapot jön; az ismételt alkalmazás idempotens
+        for user_id, record_id, work_location, check_in, check_out in rows:
+            if check_out is None:
+                self._set_entry(PresenceEntry(user_id, record_id, work_location, check_in))
+            else:
+                self.checked_out(user_id, record_id=record_id)
+        self._seq = high_water
+        self._checked_at = self.clock()
+
+    # --- O(1) frissítések ---
+
+    def checked_in(self, record: AttendanceRecord):
+        self._set_entry(PresenceEntry(record.user_id, record.id, record.work_location, record.check_in))
+
+    def _set_entry(self, entry: PresenceEntry):
+        with self._lock:
+            previous = self._entries.get(entry.user_id)
+            if previous:
+                self._counts[previous.work_location] -= 1
+            self._entries[entry.user_id] = entry
+            self._counts[entry.work_location] += 1
+
+    def checked_out(self, user_id: int, record_id: Optional[int] = None):
+        """Kijelentkezés; ha record_id meg van adva, csak az adott munkamenet lezárása számít."""
+        with self._lock:
+            previous = self._entries.get(user_id)
+            if previous is None or (record_id is not None and previous.record_id != record_id):
+                return
+            del self._entries[user_id]
+            self._counts[previous.work_location] -= 1
+
+    # --- Lekérdezések ---
+
+    def is_present(self, user_id: int) -> bool:
+        return user_id in self._entries
+
+    def counts(self) -> Dict[str, int]:
+        """Helyszínenkénti létszám, O(1)."""
+        with self._lock:
+            result = {location.value: count for location, count in self._counts.items()}
+            result["total"] = len(self._entries)
+        return result
+
+    def roster(self) -> List[PresenceEntry]:
+        """Jelenlévők listája, O(jelenlévők)."""
+        with self._lock:
+            return sorted(self._entries.values(), key=lambda e: e.check_in)
+
+
+presence_index = PresenceIndex()
@@ -1,17 +1,55 @@
-from datetime import date
+from datetime import date, datetime
+from typing import Optional
 
+import numpy as np
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from app.db.models import AttendanceRecord, WorkLocation
+from app.db.models import AttendanceRecord, User, WorkLocation
+from app.db.replica import is_replica_session
+from app.db.versioning import read_version, user_sessions_version_name
+from app.services.working_calendar import WorkingCalendarService, day_range
+from app.utils.cache import ATTENDANCE_TAG, SharedCache, shared_cache, user_tag
 from app.utils.error_handler import ServiceError, NotFoundError, ValidationError
 
+# Egy egyenleg lekérdezés legfeljebb ennyi napot fedhet le
+MAX_BALANCE_RANGE_DAYS = 3660
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
 class ReportService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, calendar: Optional[WorkingCalendarService] = None,
+                 cache: Optional[SharedCache] = None):
         self.db = db
+        self.calendar = calendar or WorkingCalendarService(db)
+        self.cache = cache or shared_cache
 
     def get_summary(self, user_id=None, start_date=None, end_date=None):
-        """Riport lekérdezése időszakra és felhasználóra"""
+        """Riport lekérdezése időszakra és felhasználóra (workerek között közös cache-ből)"""
+        user_id = int(user_id) if user_id else None
+        key = "report:summary:{}:{}:{}".format(
+            user_id or "all",
+            start_date.isoformat() if start_date else "",
+            end_date.isoformat() if end_date else "",
+        )
+        if user_id:
+            # A számláló a kulcsban: a felhasználó írása után új kulcs, érvénytelenítés nélkül.
+            # A számolás előtt olvasva, így régebbi adat nem kerülhet újabb verzió alá.
+            key += ":v{}".format(read_version(self.db, user_sessions_version_name(user_id)))
+            tags = [user_tag(user_id)]
+        else:
+            tags = [ATTENDANCE_TAG]
+        return self._cached(key, lambda: self._compute_summary(user_id, start_date, end_date), tags)
+
+    def _cached(self, key, compute, tags):
+        # Replikáról számolt érték nem kerül a cache-be: a késés miatt egy érvénytelenítés után is
+        # a régi állapotot tenné vissza. Olvasni szabad, a bejegyzések a primary-ról számolódtak.
+        return self.cache.get_or_compute(key, compute, tags, store=not is_replica_session(self.db))
+
+    def _compute_summary(self, user_id, start_date, end_date):
         try:
             q = self.db.query(AttendanceRecord)
 
@@ -65,6 +103,9 @@ class ReportService:
 
     def get_location_stats(self):
         """Home office vs office napok arány statisztika"""
+        return self._cached("report:location_stats", self._compute_location_stats, [ATTENDANCE_TAG])
+
+    def _compute_location_stats(self):
         try:
             total_days = self.db.query(func.count(AttendanceRecord.id)).scalar()
             office_days = self.db.query(func.count(AttendanceRecord.id)).filter(AttendanceRecord.work_location == WorkLocation.OFFICE).scalar()
@@ -78,3 +119,67 @@ class ReportService:
             }
         except SQLAlchemyError:
             raise ServiceError("Adatbázis hiba a statisztika lekérdezés során")
+
+    def get_balance(self, user_id, start_date, end_date, daily=False):
+        """
+        Elvárt vs. ledolgozott percek és egyenleg tetszőleges időszakra.
+        Az elvárt percek a munkanaptárból (ünnepnapok, heti munkarend) jönnek,
+        a napi tömbök összevetése vektorosan történik.
+        """
+        if not user_id:
+            raise ValidationError("user_id megadása kötelező")
+        if not start_date or not end_date:
+            raise ValidationError("start_date és end_date megadása kötelező")
+        start, end = _as_date(start_date), _as_date(end_date)
+        if end < start:
+            raise ValidationError("A kezdő dátum nem lehet későbbi a záró dátumnál")
+        if (end - start).days >= MAX_BALANCE_RANGE_DAYS:
+            raise ValidationError(f"Az időszak legfeljebb {MAX_BALANCE_RANGE_DAYS} nap lehet")
+
+        try:
+            if self.db.get(User, user_id) is None:
+                raise NotFoundError(f"Felhasználó nem található: {user_id}")
+
+            rows = (
+                self.db.query(AttendanceRecord.date, func.coalesce(func.sum(AttendanceRecord.work_duration), 0))
+                .filter(
+                    AttendanceRecord.user_id == user_id,
+                    AttendanceRecord.date >= start,
+                    AttendanceRecord.date <= end,
+                )
+                .group_by(AttendanceRecord.date)
+                .all()
+            )
+        except SQLAlchemyError:
+            raise ServiceError("Adatbázis hiba az egyenleg lekérdezés során")
+
+        expected = self.calendar.expected_minutes(user_id, start, end).astype(np.int64)
+        actual = np.zeros(len(expected), dtype=np.int64)
+        if rows:
+            days, minutes = zip(*rows)
+            offsets = (np.array(days, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+            actual[offsets] = minutes
+        balance = actual - expected
+        working = expected > 0
+
+        result = {
+            "user_id": user_id,
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "expected_minutes": int(expected.sum()),
+            "actual_minutes": int(actual.sum()),
+            "balance_minutes": int(balance.sum()),
+            "expected_hours": round(int(expected.sum()) / 60, 2),
+            "actual_hours": round(int(actual.sum()) / 60, 2),
+            "balance_hours": round(int(balance.sum()) / 60, 2),
+            "working_days": int(working.sum()),
+            "under_time_days": int((working & (actual < expected)).sum()),
+        }
+        if daily:
+            result["daily"] = {
+                "dates": [str(day) for day in day_range(start, end)],
+                "expected": expected.tolist(),
+                "actual": actual.tolist(),
+                "cumulative_balance": np.cumsum(balance).tolist(),
+            }
+        return result
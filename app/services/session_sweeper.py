@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.models import AttendanceRecord, AuditLog, OutboxEvent, OvertimeRequest, RequestStatus
+from app.db.settings_cache import settings_cache, OVERTIME_THRESHOLD_KEY
+from app.db.versioning import bump_versions, user_sessions_version_name, with_change_seqs
+from app.services.outbox import SESSION_CLOSED, outbox_row, session_payload
+from app.services.presence_index import presence_index
+from app.utils.error_handler import ServiceError
+
+
+class SessionSweeper:
+    """
+    Elfelejtett (túl régóta nyitott) munkamenetek automatikus lezárása.
+
+    A munkamenetet check_in + max_open_minutes időpontra zárja, a küszöb feletti
+    részre túlóra kérelmet generál, és audit bejegyzést ír. Mindez kötegekben,
+    soronkénti commit nélkül: kötegenként két bulk UPDATE és néhány bulk INSERT, egy commit.
+
+    A lezárás egy "check_out IS NULL" feltételes UPDATE ... RETURNING-gal indul: ha a
+    felhasználó közben kijelentkezett, a munkamenetét nem írja felül, és csak a
+    ténylegesen lezárt munkamenetekhez készül túlóra, audit és outbox bejegyzés.
+    """
+
+    def __init__(self, db: Session, max_open_minutes: int, batch_size: int = 5000,
+                 now: Optional[datetime] = None):
+        if max_open_minutes <= 0:
+            raise ValueError("max_open_minutes pozitív kell legyen")
+        self.db = db
+        self.max_open_minutes = max_open_minutes
+        self.batch_size = batch_size
+        self.now = now
+
+    def run(self) -> Dict[str, int]:
+        now = self.now or datetime.now()
+        cutoff = now - timedelta(minutes=self.max_open_minutes)
+        threshold = settings_cache.get_int(OVERTIME_THRESHOLD_KEY, 540)
+        overtime_minutes = self.max_open_minutes - threshold
+        totals = {"closed": 0, "overtime_created": 0, "batches": 0}
+
+        last_id = 0
+        while True:
+            try:
+                candidates = self.db.execute(
+                    select(AttendanceRecord.id, AttendanceRecord.user_id, AttendanceRecord.check_in,
+                           AttendanceRecord.work_location)
+                    .where(
+                        AttendanceRecord.check_out.is_(None),
+                        AttendanceRecord.check_in < cutoff,
+                        AttendanceRecord.id > last_id,
+                    )
+                    .order_by(AttendanceRecord.id)
+                    .limit(self.batch_size)
+                ).all()
+                if not candidates:
+                    break
+
+                rows = self._close(candidates, overtime_minutes)
+                if rows:
+                    self._write_follow_ups(rows, overtime_minutes)
+                self.db.commit()
+            except SQLAlchemyError:
+                self.db.rollback()
+                raise ServiceError("Adatbázis hiba a nyitott munkamenetek lezárásakor")
+
+            for row in rows:
+                presence_index.checked_out(row.user_id, record_id=row.id)
+
+            last_id = candidates[-1].id
+            totals["closed"] += len(rows)
+            totals["overtime_created"] += len(rows) if overtime_minutes > 0 else 0
+            totals["batches"] += 1
+
+        return totals
+
+    def _close(self, rows, overtime_minutes: int):
+        """
+        A kiválasztott munkamenetek lezárása; visszatér a ténylegesen lezártakkal.
+        A pontos check_out soronként más (check_in + max_open_minutes), ezért az első,
+        feltételes UPDATE csak lefoglalja a még nyitott sorokat, a második PK szerint állítja be.
+        """
+        claimed = self.db.execute(
+            update(AttendanceRecord)
+            .where(AttendanceRecord.id.in_([row.id for row in rows]), AttendanceRecord.check_out.is_(None))
+            .values(check_out=AttendanceRecord.check_in, work_duration=self.max_open_minutes,
+                    is_overtime_generated=overtime_minutes > 0)
+            .returning(AttendanceRecord.id, AttendanceRecord.user_id, AttendanceRecord.check_in,
+                       AttendanceRecord.work_location)
+            .execution_options(synchronize_session=False)
+        ).all()
+        claimed.sort(key=lambda row: row.id)
+        if claimed:
+            self.db.execute(update(AttendanceRecord), with_change_seqs(self.db, [
+                {"id": row.id, "check_out": row.check_in + timedelta(minutes=self.max_open_minutes)}
+                for row in claimed
+            ]))
+        return claimed
+
+    def _write_follow_ups(self, rows, overtime_minutes: int):
+        """Túlóra, audit és outbox sorok a ténylegesen lezárt munkamenetekhez."""
+        if overtime_minutes > 0:
+            self.db.execute(insert(OvertimeRequest), with_change_seqs(self.db, [
+                {
+                    "user_id": row.user_id,
+                    "work_session_id": row.id,
+                    "overtime_minutes": overtime_minutes,
+                    "status": RequestStatus.PENDING,
+                    "is_auto_generated": True,
+                }
+                for row in rows
+            ]))
+
+        self.db.execute(insert(AuditLog), [
+            {
+                "user_id": row.user_id,
+                "action": "auto_check_out",
+                "entity_type": "attendance",
+                "entity_id": row.id,
+                "description": f"Automatikus kijelentkeztetés {self.max_open_minutes} perc után",
+            }
+            for row in rows
+        ])
+
+        self.db.execute(insert(OutboxEvent), [
+            outbox_row(SESSION_CLOSED, row.user_id, session_payload(
+                row.id, row.user_id, row.check_in,
+                row.check_in + timedelta(minutes=self.max_open_minutes),
+                self.max_open_minutes, row.work_location,
+            ))
+            for row in rows
+        ])
+
+        # Per-user cache-ek (pl. hőtérkép) érvénytelenítése
+        bump_versions(self.db, (user_sessions_version_name(row.user_id) for row in rows))
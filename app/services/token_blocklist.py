@@ -0,0 +1,181 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional, Set
+
+from flask import has_app_context
+from sqlalchemy import delete
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.models import RevokedToken, UserTokenRevocation
+from app.db.unit_of_work import in_transaction, transaction
+from app.db.versioning import bump_version, read_version
+
+TOKEN_BLOCKLIST_VERSION_NAME = "token_blocklist"
+# Kiadás ideje tört másodperccel: az "iat" csak egész másodperc, ami a visszavonás
+# másodpercében kiadott tokeneknél nem dönti el, melyik volt előbb
+PRECISE_IAT_CLAIM = "iat_precise"
+
+
+def _utc_from_timestamp(value: float) -> datetime:
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+
+
+def _timestamp_from_utc(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class TokenBlocklist:
+    """
+    Visszavont JWT-k nyilvántartása.
+
+    Az adatbázisban tárolódik (revoked_tokens: egyedi tokenek jti szerint,
+    user_token_revocations: felhasználónkénti "minden munkamenet" visszavonás),
+    de a kérésenkénti ellenőrzés egy memóriabeli halmaz / dict keresés.
+    A többi worker változásait a "token_blocklist" verziószámláló alapján,
+    legfeljebb `check_interval` késéssel veszi át; a saját írásai azonnal élnek.
+    A lejárt tokenek betöltéskor kimaradnak, így a halmaz nem nő korlátlanul.
+    """
+
+    def __init__(self, check_interval: float = 1.0, clock: Callable[[], float] = time.monotonic,
+                 now: Callable[[], float] = time.time):
+        self._jtis: Set[str] = set()
+        self._user_cutoffs: Dict[str, float] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.check_interval = check_interval
+        self.clock = clock
+        self.now = now
+
+    def init_app(self, app, jwt_manager):
+        """Betöltés induláskor és bekötés a JWTManager blocklist loaderébe."""
+        from app.db.engine import db
+
+        self.check_interval = app.config.get("TOKEN_BLOCKLIST_CHECK_INTERVAL", self.check_interval)
+        with app.app_context():
+            self.load(db.session)
+
+        @jwt_manager.additional_claims_loader
+        def add_precise_iat(identity):
+            return {PRECISE_IAT_CLAIM: self.now()}
+
+        @jwt_manager.token_in_blocklist_loader
+        def check_if_token_revoked(jwt_header, jwt_payload):
+            if has_app_context():
+                self.refresh_if_stale(db.session)
+            return self.is_revoked(jwt_payload)
+
+    def load(self, session: Session):
+        """Teljes betöltés: a még le nem járt tokenek és a felhasználónkénti határidők."""
+        # Előbb a verzió: ha közben változik, a következő ellenőrzés újratölt
+        version = read_version(session, TOKEN_BLOCKLIST_VERSION_NAME)
+        now = _utc_from_timestamp(self.now())
+        jtis = {
+            jti for (jti,) in session.query(RevokedToken.jti).filter(
+                (RevokedToken.expires_at.is_(None)) | (RevokedToken.expires_at > now)
+            )
+        }
+        cutoffs = {
+            str(user_id): _timestamp_from_utc(revoked_before)
+            for user_id, revoked_before in session.query(
+                UserTokenRevocation.user_id, UserTokenRevocation.revoked_before
+            )
+        }
+        with self._lock:
+            self._jtis, self._user_cutoffs = jtis, cutoffs
+            self._version = version
+            self._checked_at = self.clock()
+
+    def invalidate(self):
+        """A következő ellenőrzés kötelezően lekérdezi a verziót."""
+        self._checked_at = float("-inf")
+
+    def refresh_if_stale(self, session: Session):
+        """Verzió-ellenőrzés legfeljebb check_interval másodpercenként; eltérés esetén újratöltés."""
+        if self._version is not None and self.clock() - self._checked_at < self.check_interval:
+            return
+        try:
+            if self._version is None or read_version(session, TOKEN_BLOCKLIST_VERSION_NAME) != self._version:
+                self.load(session)
+            else:
+                self._checked_at = self.clock()
+        except SQLAlchemyError as e:
+            # Hiba esetén a régi állapot marad érvényben
+            print("Token blocklist refresh failed:", e)
+
+    def is_revoked(self, payload: dict) -> bool:
+        """O(1) ellenőrzés a token claimjei alapján (adatbázis lekérdezés nélkül)."""
+        if payload.get("jti") in self._jtis:
+            return True
+        cutoff = self._user_cutoffs.get(str(payload.get("sub")))
+        if cutoff is None:
+            return False
+        issued_at = payload.get(PRECISE_IAT_CLAIM)
+        if issued_at is None:
+            # Régi, tört másodperc nélküli token: a visszavonás másodpercében kiadott is érvénytelen
+            return payload.get("iat", 0) <= int(cutoff)
+        # A visszavonás után (akár ugyanabban a másodpercben) kiadott token érvényes
+        return issued_at < cutoff
+
+    # --- Visszavonás ---
+
+    def revoke_token(self, session: Session, payload: dict):
+        """Egyetlen token visszavonása (kijelentkezés)."""
+        jti = payload["jti"]
+        outer = in_transaction(session)
+        with transaction(session):
+            self._store_revoked_token(session, payload)
+            bump_version(session, TOKEN_BLOCKLIST_VERSION_NAME)
+        self._apply(outer, lambda: self._jtis.add(jti))
+
+    def revoke_user(self, session: Session, user_id: int, current_token: Optional[dict] = None):
+        """
+        A felhasználó összes eddig kiadott tokenjének visszavonása.
+        current_token: a kérést küldő token claimjei; ha a felhasználóé, a jti-je is
+        visszavonásra kerül, így a workerek közti óraeltérés esetén sem marad érvényes.
+        """
+        cutoff = self.now()
+        own_jti = None
+        if current_token is not None and str(current_token.get("sub")) == str(user_id):
+            own_jti = current_token.get("jti")
+        outer = in_transaction(session)
+        with transaction(session):
+            entry = session.get(UserTokenRevocation, user_id)
+            if entry is None:
+                session.add(UserTokenRevocation(user_id=user_id, revoked_before=_utc_from_timestamp(cutoff)))
+            else:
+                entry.revoked_before = _utc_from_timestamp(cutoff)
+            if own_jti:
+                self._store_revoked_token(session, current_token)
+            bump_version(session, TOKEN_BLOCKLIST_VERSION_NAME)
+
+        def change():
+            self._user_cutoffs[str(user_id)] = cutoff
+            if own_jti:
+                self._jtis.add(own_jti)
+        self._apply(outer, change)
+
+    def _store_revoked_token(self, session: Session, payload: dict):
+        expires_at = _utc_from_timestamp(payload["exp"]) if payload.get("exp") else None
+        sub = payload.get("sub")
+        session.merge(RevokedToken(
+            jti=payload["jti"],
+            user_id=int(sub) if sub is not None and str(sub).isdigit() else None,
+            expires_at=expires_at,
+        ))
+        # A már lejárt bejegyzések takarítása (indexelt feltétel)
+        session.execute(delete(RevokedToken).where(RevokedToken.expires_at < _utc_from_timestamp(self.now())))
+
+    def _apply(self, in_outer_transaction: bool, change: Callable[[], None]):
+        if in_outer_transaction:
+            # A külső tranzakció még nincs commitolva: a helyi állapotot nem
+            # módosítjuk előre; a commit után a verzió-eltérés miatt újratölt
+            self.invalidate()
+            return
+        with self._lock:
+            change()
+
+
+token_blocklist = TokenBlocklist()
@@ -0,0 +1,152 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.models import User
+from app.db.versioning import read_version
+
+USERS_VERSION_NAME = "users"
+
+
+class UserSearchEntry(NamedTuple):
+    id: int
+    username: str
+    email: str
+
+
+class UserSearchIndex:
+    """
+    Prefix (typeahead) keresés felhasználónévre és email címre.
+
+    Két rendezett tömb (kisbetűs kulcs, user_id) párokból; a keresés bisect-tel
+    az első találatra ugrik, és csak a prefixszel kezdődő kulcsokat járja be,
+    így nincs LIKE '%..%' tábla-scan. Felhasználónév találatok megelőzik az
+    email találatokat. Az aktív felhasználókat tartalmazza.
+
+    A saját worker írásai azonnal frissítik (upsert/remove), a többi workerét
+    a "users" verziószámláló alapján legfeljebb `check_interval` késéssel veszi át.
+    A saját írások számlálónövelései (írásonként egy bump_version) számon vannak
+    tartva, így csak akkor épül újra, ha a számláló ennél többet lépett.
+    """
+
+    def __init__(self, check_interval: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self._entries: Dict[int, UserSearchEntry] = {}
+        self._usernames: List[Tuple[str, int]] = []
+        self._emails: List[Tuple[str, int]] = []
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._local_bumps = 0  # a _version óta upsert/remove-val már alkalmazott saját növelések
+        self._checked_at = 0.0
+        self.check_interval = check_interval
+        self.clock = clock
+
+    def init_app(self, app):
+        from app.db.engine import db
+
+        self.check_interval = app.config.get("USER_SEARCH_CHECK_INTERVAL", self.check_interval)
+        with app.app_context():
+            self.rebuild(db.session)
+
+    def rebuild(self, session: Session):
+        """Teljes újraépítés egyetlen lekérdezéssel."""
+        version = read_version(session, USERS_VERSION_NAME)
+        rows = session.query(User.id, User.username, User.email).filter(User.is_active == True).all()
+
+        entries = {row[0]: UserSearchEntry(*row) for row in rows}
+        usernames = sorted((e.username.lower(), e.id) for e in entries.values())
+        emails = sorted((e.email.lower(), e.id) for e in entries.values())
+        with self._lock:
+            self._entries, self._usernames, self._emails = entries, usernames, emails
+            self._version = version
+            self._local_bumps = 0
+            self._checked_at = self.clock()
+
+    def resync_if_stale(self, session: Session):
+        """Verzió-ellenőrzés legfeljebb check_interval másodpercenként; eltérés esetén újraépítés."""
+        if self._version is not None and self.clock() - self._checked_at < self.check_interval:
+            return
+        try:
+            version = read_version(session, USERS_VERSION_NAME) if self._version is not None else None
+            with self._lock:
+                # Csak a saját (már alkalmazott) írások léptették a számlálót: nincs idegen változás
+                own_only = version is not None and version == self._version + self._local_bumps
+                if own_only:
+                    self._version, self._local_bumps = version, 0
+                    self._checked_at = self.clock()
+            if not own_only:
+                self.rebuild(session)
+        except SQLAlchemyError as e:
+            print("User search index resync failed:", e)
+
+    # --- Inkrementális frissítések ---
+
+    def _remove_locked(self, user_id: int):
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return
+        for keys, key in ((self._usernames, entry.username.lower()), (self._emails, entry.email.lower())):
+            i = bisect_left(keys, (key, user_id))
+            if i < len(keys) and keys[i] == (key, user_id):
+                del keys[i]
+
+    def upsert(self, user: User):
+        """Regisztráció / módosítás után; inaktív felhasználó kikerül az indexből."""
+        if user.id is None:
+            return
+        with self._lock:
+            self._local_bumps += 1
+            self._remove_locked(user.id)
+            if not user.is_active:
+                return
+            entry = UserSearchEntry(user.id, user.username, user.email)
+            self._entries[user.id] = entry
+            insort(self._usernames, (entry.username.lower(), entry.id))
+            insort(self._emails, (entry.email.lower(), entry.id))
+
+    def remove(self, user_id: int):
+        with self._lock:
+            self._local_bumps += 1
+            self._remove_locked(user_id)
+
+    # --- Keresés ---
+
+    @staticmethod
+    def _scan(keys: List[Tuple[str, int]], prefix: str):
+        i = bisect_left(keys, (prefix,))
+        while i < len(keys) and keys[i][0].startswith(prefix):
+            yield keys[i][1]
+            i += 1
+
+    def search(self, query: str, limit: int = 10) -> List[UserSearchEntry]:
+        prefix = (query or "").strip().lower()
+        if not prefix or limit <= 0:
+            return []
+
+        with self._lock:
+            entries = self._entries
+            result: List[UserSearchEntry] = []
+            seen = set()
+
+            # Numerikus lekérdezés: pontos ID egyezés elöl
+            if prefix.isdigit() and int(prefix) in entries:
+                result.append(entries[int(prefix)])
+                seen.add(int(prefix))
+
+            for keys in (self._usernames, self._emails):
+                for user_id in self._scan(keys, prefix):
+                    if len(result) >= limit:
+                        return result
+                    if user_id not in seen:
+                        seen.add(user_id)
+                        result.append(entries[user_id])
+            return result
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_search_index = UserSearchIndex()
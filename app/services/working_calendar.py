@@ -0,0 +1,169 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.models import Holiday, User, WorkSchedule
+from app.db.unit_of_work import transaction
+from app.db.versioning import bump_version, read_version
+from app.utils.error_handler import NotFoundError, ServiceError, ValidationError
+
+WORKING_CALENDAR_VERSION_NAME = "working_calendar"
+
+# Heti munkarend hétfőtől vasárnapig, ha a felhasználónak nincs saját bejegyzése
+DEFAULT_WEEKLY_MINUTES = (480, 480, 480, 480, 480, 0, 0)
+
+
+def day_range(start: date, end: date) -> np.ndarray:
+    """Napok [start, end] zárt intervallumban datetime64[D] tömbként."""
+    return np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+
+
+def _weekdays(days: np.ndarray) -> np.ndarray:
+    # 1970-01-01 csütörtök volt: (napszám + 3) % 7 -> hétfő = 0
+    return (days.astype(np.int64) + 3) % 7
+
+
+class WorkingCalendarCache:
+    """
+    Lefordított éves naptárak LRU cache-e (user_id, év) kulccsal.
+    A bejegyzés a "working_calendar" verzióval együtt tárolódik; ünnepnap vagy
+    munkarend módosítás után a következő olvasás újrafordít.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self._entries: "OrderedDict[Tuple[int, int], Tuple[int, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+
+    def get(self, key: Tuple[int, int], version: int) -> Optional[np.ndarray]:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None or cached[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return cached[1]
+
+    def put(self, key: Tuple[int, int], version: int, expected: np.ndarray):
+        expected.setflags(write=False)
+        with self._lock:
+            self._entries[key] = (version, expected)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+working_calendar_cache = WorkingCalendarCache()
+
+
+class WorkingCalendarService:
+    """
+    Munkanaptár: ünnepnapok (holidays) és felhasználónkénti heti munkarendek
+    (work_schedules), felhasználónként és évenként napi elvárt perceket tartalmazó
+    numpy tömbbé fordítva. A tartomány-lekérdezések ezeket szeletelik, napi
+    Python ciklus nélkül.
+    """
+
+    def __init__(self, db: Session, cache: WorkingCalendarCache = working_calendar_cache):
+        self.db = db
+        self.cache = cache
+
+    # --- Lekérdezés ---
+
+    def expected_minutes(self, user_id: int, start: date, end: date) -> np.ndarray:
+        """Napi elvárt percek a [start, end] zárt intervallumra (int32 tömb)."""
+        if end < start:
+            raise ValidationError("A kezdő dátum nem lehet későbbi a záró dátumnál")
+        try:
+            version = read_version(self.db, WORKING_CALENDAR_VERSION_NAME)
+            parts = []
+            for year in range(start.year, end.year + 1):
+                compiled = self._year(user_id, year, version)
+                first = (max(start, date(year, 1, 1)) - date(year, 1, 1)).days
+                last = (min(end, date(year, 12, 31)) - date(year, 1, 1)).days
+                parts.append(compiled[first:last + 1])
+        except SQLAlchemyError:
+            raise ServiceError("Adatbázis hiba a munkanaptár lekérdezése során")
+        return np.concatenate(parts)
+
+    def _year(self, user_id: int, year: int, version: int) -> np.ndarray:
+        compiled = self.cache.get((user_id, year), version)
+        if compiled is None:
+            compiled = self._compile(user_id, date(year, 1, 1), date(year, 12, 31))
+            self.cache.put((user_id, year), version, compiled)
+        return compiled
+
+    def _compile(self, user_id: int, start: date, end: date) -> np.ndarray:
+        days = day_range(start, end)
+        schedules = (
+            self.db.query(WorkSchedule)
+            .filter(WorkSchedule.user_id == user_id, WorkSchedule.valid_from <= end)
+            .order_by(WorkSchedule.valid_from)
+            .all()
+        )
+        # 0. sor: alapértelmezett munkarend az első bejegyzés előtti napokra
+        patterns = np.array([DEFAULT_WEEKLY_MINUTES] + [s.weekly_minutes for s in schedules], dtype=np.int32)
+        valid_from = np.array([s.valid_from for s in schedules], dtype="datetime64[D]")
+        period = np.searchsorted(valid_from, days, side="right")
+        expected = patterns[period, _weekdays(days)]
+
+        holidays = np.array(
+            [day for (day,) in self.db.query(Holiday.day).filter(Holiday.day >= start, Holiday.day <= end)],
+            dtype="datetime64[D]",
+        )
+        expected[np.isin(days, holidays)] = 0
+        return expected
+
+    def list_holidays(self, year: int) -> List[Dict[str, Any]]:
+        rows = (
+            self.db.query(Holiday)
+            .filter(Holiday.day >= date(year, 1, 1), Holiday.day <= date(year, 12, 31))
+            .order_by(Holiday.day)
+            .all()
+        )
+        return [{"day": row.day.isoformat(), "name": row.name} for row in rows]
+
+    def list_schedules(self, user_id: int) -> List[Dict[str, Any]]:
+        rows = self.db.query(WorkSchedule).filter(WorkSchedule.user_id == user_id).order_by(WorkSchedule.valid_from)
+        return [{"valid_from": row.valid_from.isoformat(), "weekly_minutes": row.weekly_minutes} for row in rows]
+
+    # --- Módosítás ---
+
+    def set_holiday(self, day: date, name: str) -> Holiday:
+        if not name:
+            raise ValidationError("Az ünnepnap neve kötelező")
+        with transaction(self.db):
+            holiday = self.db.merge(Holiday(day=day, name=name))
+            bump_version(self.db, WORKING_CALENDAR_VERSION_NAME)
+        return holiday
+
+    def delete_holiday(self, day: date):
+        with transaction(self.db):
+            holiday = self.db.get(Holiday, day)
+            if holiday is None:
+                raise NotFoundError(f"Nincs ünnepnap ezen a napon: {day.isoformat()}")
+            self.db.delete(holiday)
+            bump_version(self.db, WORKING_CALENDAR_VERSION_NAME)
+
+    def set_schedule(self, user_id: int, valid_from: date, weekly_minutes: Sequence[int]) -> WorkSchedule:
+        """Heti munkarend (7 érték hétfőtől, napi percek) valid_from naptól."""
+        if (not isinstance(weekly_minutes, (list, tuple)) or len(weekly_minutes) != 7
+                or not all(isinstance(m, int) and 0 <= m <= 1440 for m in weekly_minutes)):
+            raise ValidationError("A 'weekly_minutes' 7 darab 0 és 1440 közötti egész szám (hétfőtől vasárnapig)")
+        with transaction(self.db):
+            if self.db.get(User, user_id) is None:
+                raise NotFoundError(f"Felhasználó nem található: {user_id}")
+            schedule = self.db.merge(WorkSchedule(
+                user_id=user_id, valid_from=valid_from,
+                **dict(zip(WorkSchedule.WEEKDAY_COLUMNS, weekly_minutes)),
+            ))
+            bump_version(self.db, WORKING_CALENDAR_VERSION_NAME)
+        return schedule
@@ -0,0 +1,75 @@
+import gzip
+
+import pytest
+from flask import Flask, jsonify
+
+from app.config.settings import Config
+from app.main import create_app
+from app.utils.assets import build_assets
+from app.utils.compression import init_json_compression
+
+
+@pytest.fixture
+def app(tmp_path):
+    config = type("AssetsConfig", (Config,), {"ASSETS_OUTPUT_DIR": str(tmp_path / "assets")})
+    return create_app(config)
+
+
+def test_build_rewrites_html_references(tmp_path):
+    static = tmp_path / "static"
+    (static / "js").mkdir(parents=True)
+    (static / "js" / "app.js").write_text("console.log('x');" * 50)
+    (static / "index.html").write_text('<script src="/static/js/app.js"></script><img src="/static/logo.png">')
+
+    manifest = build_assets(str(static), str(tmp_path / "out"))
+
+    hashed = manifest["assets"]["js/app.js"]
+    assert hashed.startswith("js/app.") and hashed.endswith(".js")
+    html = (tmp_path / "out" / "pages" / "index.html").read_text()
+    assert f'src="/assets/{hashed}"' in html
+    # Nem fingerprintelt hivatkozás változatlan marad
+    assert 'src="/static/logo.png"' in html
+    assert "gzip" in manifest["encodings"][hashed]
+    assert gzip.decompress((tmp_path / "out" / (hashed + ".gz")).read_bytes()) == (static / "js" / "app.js").read_bytes()
+
+
+def test_fingerprinted_asset_is_immutable_and_precompressed(app):
+    client = app.test_client()
+    hashed = app.extensions["assets_manifest"]["assets"]["js/dashboard.js"]
+
+    response = client.get(f"/assets/{hashed}", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "immutable" in response.headers["Cache-Control"]
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.mimetype in ("text/javascript", "application/javascript")
+
+    plain = client.get(f"/assets/{hashed}", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+    assert gzip.decompress(response.data) == plain.data
+
+    assert client.get("/assets/js/unknown.js").status_code == 404
+
+
+def test_pages_reference_hashed_assets(app):
+    response = app.test_client().get("/dashboard")
+    html = response.get_data(as_text=True)
+    assert "/static/js/dashboard.js" not in html
+    assert "/assets/js/dashboard." in html
+    assert response.headers["Cache-Control"] == "no-cache"
+
+
+def test_large_json_responses_are_gzipped():
+    app = Flask(__name__)
+    app.config["JSON_GZIP_MIN_BYTES"] = 100
+    init_json_compression(app)
+    app.add_url_rule("/big", "big", lambda: jsonify(list(range(200))))
+    app.add_url_rule("/small", "small", lambda: jsonify({"ok": True}))
+    client = app.test_client()
+
+    big = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert big.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(big.data).startswith(b"[0,")
+
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/big").headers
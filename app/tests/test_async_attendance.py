@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.db.async_engine import async_database_url, create_async_db
+from app.db.base import Base
+from app.db.models import AttendanceRecord, AuditLog, OvertimeRequest, User, WorkLocation
+from app.services.async_attendance_service import AsyncAttendanceService
+from app.utils.error_handler import ValidationError
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def make_session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.sqlite'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as db:
+        db.add(User(id=1, username="john", email="john@example.com", password_hash="x"))
+        await db.commit()
+    return engine, factory
+
+
+def test_async_database_url():
+    assert async_database_url("sqlite:///worktrack.db") == "sqlite+aiosqlite:///worktrack.db"
+    assert async_database_url("postgresql+psycopg2://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+    with pytest.raises(ValueError):
+        async_database_url("sqlite:///:memory:")
+
+
+def test_missing_async_driver_is_a_clear_error(monkeypatch):
+    def missing_driver(url, **options):
+        raise ModuleNotFoundError("No module named 'asyncpg'", name="asyncpg")
+
+    monkeypatch.setattr("app.db.async_engine.create_async_engine", missing_driver)
+    with pytest.raises(RuntimeError, match="asyncpg"):
+        create_async_db({"SQLALCHEMY_DATABASE_URI": "postgresql://u:p@db/worktrack"})
+
+
+def test_check_in_and_out(tmp_path):
+    async def scenario():
+        engine, factory = await make_session_factory(tmp_path)
+        async with factory() as db:
+            record = await AsyncAttendanceService(db, 1).check_in(WorkLocation.HOME_OFFICE)
+            assert record.id is not None
+            with pytest.raises(ValidationError):
+                await AsyncAttendanceService(db, 1).check_in()
+
+        async with factory() as db:
+            closed = await AsyncAttendanceService(db, 1).check_out()
+            assert closed.check_out is not None
+            logs = await db.scalar(select(func.count(AuditLog.id)))
+            assert logs == 2
+        await engine.dispose()
+
+    run(scenario())
+
+
+def test_check_out_without_session(tmp_path):
+    async def scenario():
+        engine, factory = await make_session_factory(tmp_path)
+        async with factory() as db:
+            with pytest.raises(ValidationError):
+                await AsyncAttendanceService(db, 1).check_out()
+        await engine.dispose()
+
+    run(scenario())
+
+
+def test_check_out_generates_overtime(tmp_path):
+    async def scenario():
+        engine, factory = await make_session_factory(tmp_path)
+        async with factory() as db:
+            start = datetime.now() - timedelta(hours=10)
+            db.add(AttendanceRecord(user_id=1, check_in=start, date=start.date()))
+            await db.commit()
+
+        async with factory() as db:
+            record = await AsyncAttendanceService(db, 1).check_out()
+            assert record.is_overtime_generated
+            overtime = (await db.execute(select(OvertimeRequest))).scalars().one()
+            assert overtime.overtime_minutes == record.work_duration - 540
+        await engine.dispose()
+
+    run(scenario())
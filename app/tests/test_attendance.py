@@ -2,7 +2,7 @@ import pytest
 from unittest.mock import MagicMock, patch
 from datetime import datetime, date, timedelta
 
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from app.services.attendance_service import AttendanceService
 from app.utils.error_handler import ValidationError, NotFoundError, ForbiddenError, ServiceError
@@ -27,7 +27,9 @@ def make_record(user_id=1, check_in=None, check_out=None, date_value=None):
 # --- FIXTURE: fake DB session ---
 @pytest.fixture
 def db():
-    return MagicMock()
+    session = MagicMock()
+    session.info = {}
+    return session
 
 
 @pytest.fixture
@@ -50,11 +52,31 @@ def test_check_in_success(service, db):
 
 
 def test_check_in_when_active_session_exists(service, db):
-    db.query().filter().first.return_value = make_record()  # Active session
+    # A részleges unique index utasítja el a második nyitott munkamenetet
+    db.flush.side_effect = IntegrityError(
+        "INSERT", {}, Exception("UNIQUE constraint failed: work_sessions.user_id")
+    )
 
     with pytest.raises(ValidationError):
         service.check_in()
 
+    db.rollback.assert_called()
+
+
+def test_check_in_does_not_query_before_insert(service, db):
+    service.check_in()
+
+    db.query.assert_not_called()
+
+
+def test_check_in_other_integrity_error(service, db):
+    db.flush.side_effect = IntegrityError("INSERT", {}, Exception("FOREIGN KEY constraint failed"))
+
+    with pytest.raises(ServiceError) as exc:
+        service.check_in()
+
+    assert not isinstance(exc.value, ValidationError)
+
 
 def test_check_in_database_error(service, db):
     db.query().filter().first.return_value = None
@@ -98,6 +120,17 @@ def test_check_out_overtime_generated(service, db):
     db.add.assert_called()  # OvertimeRequest created
 
 
+def test_check_out_uses_configured_threshold(service, db):
+    record = make_record(check_in=datetime.now() - timedelta(hours=10))
+    record.calculate_duration = lambda: 600
+    db.query().filter().first.return_value = record
+
+    with patch("app.services.attendance_service.settings_cache.get_int", return_value=660):
+        service.check_out()
+
+    assert not record.is_overtime_generated
+
+
 def test_check_out_database_error(service, db):
     record = make_record(check_in=datetime.now())
     db.query().filter().first.return_value = record
@@ -143,6 +176,7 @@ def test_request_modification_forbidden(service, db):
 
 def test_review_modification_approve(service, db):
     mod = MagicMock(spec=ModificationRequest)
+    mod.id = 1
     mod.requested_check_in = datetime.now()
     mod.requested_check_out = datetime.now()
     mod.requested_work_location = WorkLocation.OFFICE
@@ -7,7 +7,9 @@ from app.utils.error_handler import ServiceError, ValidationError
 
 @pytest.fixture
 def db():
-    return MagicMock()
+    session = MagicMock()
+    session.info = {}
+    return session
 
 @pytest.fixture
 def service(db):
@@ -80,7 +82,7 @@ def test_register_success(service, db):
         user = service.register(username="abc", email="a@b.com", password="123")
         db.add.assert_called_once_with(user)
         db.commit.assert_called_once()
-        db.refresh.assert_called_once_with(user)
+        db.refresh.assert_not_called()
         assert user.username == "abc"
         assert user.email == "a@b.com"
         assert user.password_hash == "hashedpw"
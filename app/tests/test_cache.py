@@ -0,0 +1,154 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import AttendanceRecord, User, WorkLocation
+from app.services.attendance_service import AttendanceService
+from app.services.report_service import ReportService
+from app.utils.cache import (
+    ATTENDANCE_TAG, MemoryCacheBackend, SQLiteCacheBackend, SharedCache, shared_cache, user_tag
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend_and_clock(request, tmp_path):
+    clock = FakeClock()
+    if request.param == "memory":
+        return MemoryCacheBackend(clock=clock), clock
+    return SQLiteCacheBackend(str(tmp_path / "cache.sqlite"), clock=clock), clock
+
+
+def test_set_get_and_ttl(backend_and_clock):
+    backend, clock = backend_and_clock
+    backend.set("k", {"total_hours": 8.5}, ttl=10)
+
+    assert backend.get("k") == {"total_hours": 8.5}
+    clock.now += 10
+    assert backend.get("k") is None
+
+
+def test_tag_invalidation(backend_and_clock):
+    backend, _ = backend_and_clock
+    backend.set("summary:1", 1, ttl=60, tags=[user_tag(1)])
+    backend.set("summary:2", 2, ttl=60, tags=[user_tag(2)])
+    backend.set("summary:all", 3, ttl=60, tags=[ATTENDANCE_TAG])
+
+    backend.invalidate_tags([user_tag(1), ATTENDANCE_TAG])
+
+    assert backend.get("summary:1") is None
+    assert backend.get("summary:all") is None
+    assert backend.get("summary:2") == 2
+
+
+def test_sqlite_backend_is_shared_between_workers(tmp_path):
+    # Két példány ugyanazon a fájlon, mint két gunicorn worker
+    first = SharedCache(SQLiteCacheBackend(str(tmp_path / "cache.sqlite")))
+    second = SharedCache(SQLiteCacheBackend(str(tmp_path / "cache.sqlite")))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"value": 42}
+
+    assert first.get_or_compute("report", compute, [user_tag(1)]) == {"value": 42}
+    assert second.get_or_compute("report", compute, [user_tag(1)]) == {"value": 42}
+    assert len(calls) == 1
+
+    second.invalidate_tags([user_tag(1)])
+    first.get_or_compute("report", compute, [user_tag(1)])
+    assert len(calls) == 2
+
+
+def test_report_cache_invalidated_after_check_in_commit(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_cache, "backend", SQLiteCacheBackend(str(tmp_path / "cache.sqlite")))
+    monkeypatch.setattr(shared_cache, "coalesce_seconds", 0.0)
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    session.add_all([User(id=i, username=f"u{i}", email=f"u{i}@x.hu", password_hash="x") for i in (1, 2, 3)])
+    session.commit()
+
+    AttendanceService(session, current_user_id=1).check_in()
+    assert ReportService(session).get_location_stats()["total_days"] == 1
+
+    # Cache találat: a service rétegen kívüli írást nem látja
+    record = session.get(AttendanceRecord, 1)
+    session.add(AttendanceRecord(user_id=2, check_in=record.check_in, date=record.date,
+                                 work_location=WorkLocation.OFFICE))
+    session.commit()
+    assert ReportService(session).get_location_stats()["total_days"] == 1
+
+    # A service réteg írása a commit után érvényteleníti az összesített bejegyzéseket
+    AttendanceService(session, current_user_id=3).check_in()
+    assert ReportService(session).get_location_stats()["total_days"] == 3
+    assert ReportService(session).get_summary(user_id=3)["total_records"] == 1
+
+
+def test_set_rejected_when_invalidated_during_compute(backend_and_clock):
+    backend, _ = backend_and_clock
+    cache = SharedCache(backend)
+
+    def compute_while_writer_commits():
+        # A számolás még a régi adatot látta, közben egy író commitolt és érvénytelenített
+        cache.invalidate_tags([ATTENDANCE_TAG])
+        return {"total_days": 1}
+
+    assert cache.get_or_compute("report", compute_while_writer_commits, [ATTENDANCE_TAG]) == {"total_days": 1}
+    assert backend.get("report") is None
+    assert cache.get_or_compute("report", lambda: {"total_days": 2}, [ATTENDANCE_TAG]) == {"total_days": 2}
+    assert backend.get("report") == {"total_days": 2}
+
+
+def test_store_false_reads_but_does_not_write():
+    cache = SharedCache(MemoryCacheBackend())
+
+    assert cache.get_or_compute("report", lambda: 1, [ATTENDANCE_TAG], store=False) == 1
+    assert cache.backend.get("report") is None
+    cache.get_or_compute("report", lambda: 2, [ATTENDANCE_TAG])
+    assert cache.get_or_compute("report", lambda: 3, [ATTENDANCE_TAG], store=False) == 2
+
+
+def test_coalesced_invalidations_are_one_backend_write(monkeypatch):
+    backend = MemoryCacheBackend()
+    cache = SharedCache(backend, coalesce_seconds=60.0)
+    writes = []
+    invalidate = backend.invalidate_tags
+    monkeypatch.setattr(backend, "invalidate_tags", lambda tags: (writes.append(set(tags)), invalidate(tags)))
+    backend.set("summary:all", 3, ttl=60, tags=[ATTENDANCE_TAG])
+
+    for _ in range(100):
+        cache.invalidate_tags([ATTENDANCE_TAG], coalesce=True)
+    assert writes == [] and backend.get("summary:all") == 3
+
+    cache._flush_timer.cancel()
+    cache.flush_deferred()
+    assert writes == [{ATTENDANCE_TAG}]
+    assert backend.get("summary:all") is None
+
+
+def test_user_summary_key_follows_session_version(monkeypatch):
+    monkeypatch.setattr(shared_cache, "backend", MemoryCacheBackend())
+    monkeypatch.setattr(shared_cache, "coalesce_seconds", 60.0)
+    monkeypatch.setattr(shared_cache, "invalidate_tags", lambda tags, coalesce=False: None)
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    session.add(User(id=1, username="u1", email="u1@x.hu", password_hash="x"))
+    session.commit()
+
+    attendance = AttendanceService(session, current_user_id=1)
+    attendance.check_in()
+    assert ReportService(session).get_summary(user_id=1)["total_records"] == 1
+    # Érvénytelenítő cache írás nélkül is friss: a service írása növeli a kulcsban lévő számlálót
+    attendance.check_out()
+    attendance.check_in()
+    assert ReportService(session).get_summary(user_id=1)["total_records"] == 2
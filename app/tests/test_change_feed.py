@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine, event, insert, update
+from sqlalchemy.orm import sessionmaker
+
+from app.config.settings import Config
+from app.db.base import Base
+from app.db.models import AttendanceRecord, CacheVersion, User, reserve_change_seqs
+from app.db.synthetic import create_open_sessions
+from app.main import create_app
+from app.services.attendance_service import AttendanceService
+from app.services.change_feed import ChangeFeedService
+from app.services.session_sweeper import SessionSweeper
+from app.utils.error_handler import ValidationError
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    session.add_all([User(id=i, username=f"u{i}", email=f"u{i}@x.hu", password_hash="x") for i in (1, 2, 3)])
+    session.commit()
+    return session
+
+
+def test_insert_and_update_get_increasing_sequence(session):
+    service = AttendanceService(session, current_user_id=1)
+    record = service.check_in()
+    after_insert = record.change_seq
+    service.check_out()
+
+    feed = ChangeFeedService(session).changes(since=0)
+    assert [(c["table"], c["change_seq"]) for c in feed["changes"]] == [("work_sessions", record.change_seq)]
+    assert record.change_seq > after_insert
+    assert feed["changes"][0]["data"]["check_out"] is not None
+
+    assert ChangeFeedService(session).changes(since=feed["next_cursor"]) == {
+        "changes": [], "next_cursor": feed["next_cursor"], "has_more": False,
+    }
+
+
+def test_bulk_paths_and_paging_across_tables(session):
+    now = datetime(2025, 1, 10, 12, 0)
+    create_open_sessions(session, [1, 2, 3], now - timedelta(hours=20))
+    # Lezárás 16 óra után: munkamenet UPDATE + túlóra kérelem INSERT
+    SessionSweeper(session, max_open_minutes=16 * 60, now=now).run()
+
+    seen, cursor = [], 0
+    while True:
+        page = ChangeFeedService(session).changes(since=cursor, limit=2)
+        seen.extend(page["changes"])
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            break
+
+    seqs = [change["change_seq"] for change in seen]
+    assert seqs == sorted(set(seqs))
+    assert sorted(change["table"] for change in seen) == ["overtime_requests"] * 3 + ["work_sessions"] * 3
+    assert all(change["data"]["check_out"] for change in seen if change["table"] == "work_sessions")
+
+
+def test_orm_flush_reserves_one_block(session):
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    session.add_all([AttendanceRecord(user_id=i, check_in=datetime(2025, 1, 10, 8), date=datetime(2025, 1, 10).date())
+                     for i in (1, 2, 3)])
+    session.commit()
+
+    assert sum("UPDATE cache_versions" in statement for statement in statements) == 1
+    seqs = sorted(record.change_seq for record in session.query(AttendanceRecord))
+    assert seqs == list(range(seqs[0], seqs[0] + 3))
+
+
+def test_cursor_stops_at_committed_counter(session):
+    AttendanceService(session, current_user_id=1).check_in()
+    # Egy párhuzamos író tranzakciója: sorszámot foglalt és sort írt, de még nem commitolt,
+    # a feed viszont már látja a sort (pl. a táblák külön lekérdezései között commitol)
+    in_flight = reserve_change_seqs(session.connection())[0]
+    session.execute(insert(AttendanceRecord), [{
+        "user_id": 2, "check_in": datetime(2025, 1, 10, 8), "date": datetime(2025, 1, 10).date(),
+        "change_seq": in_flight,
+    }])
+    session.execute(update(CacheVersion).where(CacheVersion.name == "change_seq")
+                    .values(version=in_flight - 1))
+
+    feed = ChangeFeedService(session).changes(since=0)
+    assert in_flight not in [change["change_seq"] for change in feed["changes"]]
+    assert feed["next_cursor"] < in_flight
+
+    # A commit után a számláló is látszik: a sor a következő lekérdezésben jön
+    session.execute(update(CacheVersion).where(CacheVersion.name == "change_seq")
+                    .values(version=in_flight))
+    session.commit()
+    feed = ChangeFeedService(session).changes(since=feed["next_cursor"])
+    assert [change["change_seq"] for change in feed["changes"]] == [in_flight]
+
+
+def test_invalid_arguments(session):
+    with pytest.raises(ValidationError):
+        ChangeFeedService(session).changes(since=-1)
+    with pytest.raises(ValidationError):
+        ChangeFeedService(session, max_limit=10).changes(limit=11)
+
+
+def test_changes_endpoint_is_admin_only(tmp_path):
+    config = type("ChangeFeedConfig", (Config,), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.sqlite'}",
+        "RATE_LIMIT_ENABLED": False,
+    })
+    app = create_app(config)
+    client = app.test_client()
+    with app.app_context():
+        user = {"Authorization": f"Bearer {create_access_token(identity='1', additional_claims={'role': 'user'})}"}
+        admin = {"Authorization": f"Bearer {create_access_token(identity='3', additional_claims={'role': 'admin'})}"}
+
+    assert client.get("/api/admin/changes", headers=user).status_code == 403
+    assert client.get("/api/admin/changes?since=abc", headers=admin).status_code == 400
+
+    response = client.get("/api/admin/changes?since=0", headers=admin)
+    assert response.status_code == 200
+    body = response.get_json()
+    # A dev seed munkamenete is sorszámot kapott
+    assert body["changes"][-1]["table"] == "work_sessions"
+    assert body["next_cursor"] == body["changes"][-1]["change_seq"]
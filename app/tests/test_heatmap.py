@@ -0,0 +1,58 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import AttendanceRecord, User, WorkLocation
+from app.db.versioning import bump_version, user_sessions_version_name
+from app.services.heatmap_service import HeatmapCache, HeatmapService, LOCATION_CODES
+
+
+def _add(session, day, minutes, location=WorkLocation.OFFICE):
+    check_in = datetime.combine(day, datetime.min.time()).replace(hour=8)
+    session.add(AttendanceRecord(user_id=1, check_in=check_in, check_out=check_in + timedelta(minutes=minutes),
+                                 work_duration=minutes, date=day, work_location=location))
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(id=1, username="u1", email="u1@x.hu", password_hash="x"))
+    _add(session, date(2024, 1, 1), 240)
+    _add(session, date(2024, 1, 1), 300, WorkLocation.HOME_OFFICE)
+    _add(session, date(2024, 12, 31), 480)
+    _add(session, date(2025, 1, 1), 100)
+    session.commit()
+    return session
+
+
+def test_year_is_compact_array(session):
+    result = HeatmapService(session, HeatmapCache()).get_year(1, 2024)
+
+    assert len(result["minutes"]) == 366  # szökőév
+    assert result["minutes"][0] == 540
+    assert LOCATION_CODES[result["locations"][0]] == "home_office"
+    assert result["minutes"][365] == 480
+    assert result["total_minutes"] == 1020
+    assert result["worked_days"] == 2
+
+
+def test_cached_until_user_sessions_version_changes(session):
+    cache = HeatmapCache()
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    HeatmapService(session, cache).get_year(1, 2024)
+    statements.clear()
+    HeatmapService(session, cache).get_year(1, 2024)
+    assert len(statements) == 1  # csak a verzió lekérdezés
+
+    _add(session, date(2024, 6, 3), 60)
+    bump_version(session, user_sessions_version_name(1))
+    session.commit()
+
+    assert HeatmapService(session, cache).get_year(1, 2024)["total_minutes"] == 1080
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.config.settings import Config
+from app.db.engine import db
+from app.db.models import AttendanceRecord, IdempotencyKey
+from app.main import create_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    config = type("IdempotencyConfig", (Config,), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.sqlite'}",
+        "RATE_LIMIT_ENABLED": False,
+    })
+    return create_app(config)
+
+
+def _headers(app, user_id, key=None):
+    with app.app_context():
+        token = create_access_token(identity=str(user_id), additional_claims={"role": "user"})
+    headers = {"Authorization": f"Bearer {token}"}
+    if key:
+        headers["Idempotency-Key"] = key
+    return headers
+
+
+def _session_count(app, user_id):
+    with app.app_context():
+        return db.session.query(AttendanceRecord).filter_by(user_id=user_id).count()
+
+
+def test_retry_replays_stored_response(app):
+    client = app.test_client()
+    headers = _headers(app, 2, key="k-1")
+    before = _session_count(app, 2)
+
+    first = client.post("/api/attendance/checkin", json={"location": "office"}, headers=headers)
+    retry = client.post("/api/attendance/checkin", json={"location": "office"}, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json == first.json
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert _session_count(app, 2) == before + 1
+
+    # Másik worker: üres memóriabeli LRU, a válasz az adatbázisból jön
+    app.extensions["idempotency_store"]._memory.clear()
+    again = client.post("/api/attendance/checkin", json={"location": "office"}, headers=headers)
+    assert again.json == first.json and again.headers["Idempotent-Replayed"] == "true"
+
+
+def test_error_responses_are_stored_and_keys_are_per_user(app):
+    client = app.test_client()
+    first = client.post("/api/attendance/checkout", json={}, headers=_headers(app, 2, key="same"))
+    retry = client.post("/api/attendance/checkout", json={}, headers=_headers(app, 2, key="same"))
+    assert first.status_code == retry.status_code == 400
+    assert "Idempotent-Replayed" in retry.headers
+
+    # Ugyanaz a kulcs másik felhasználónál független
+    other = client.post("/api/attendance/checkin", json={"location": "office"}, headers=_headers(app, 1, key="same"))
+    assert "Idempotent-Replayed" not in other.headers
+
+
+def test_key_reuse_with_different_body_and_in_flight(app):
+    client = app.test_client()
+    headers = _headers(app, 2, key="k-2")
+    client.post("/api/attendance/checkin", json={"location": "office"}, headers=headers)
+    assert client.post("/api/attendance/checkin", json={"location": "home_office"}, headers=headers).status_code == 422
+
+    with app.app_context():
+        db.session.add(IdempotencyKey(user_id=2, key="busy", fingerprint="x",
+                                      expires_at=datetime.now() + timedelta(minutes=5)))
+        db.session.commit()
+    response = client.post("/api/attendance/checkout", json={}, headers=_headers(app, 2, key="busy"))
+    assert response.status_code == 409
+
+
+def test_without_header_nothing_is_stored(app):
+    client = app.test_client()
+    client.post("/api/attendance/checkin", json={"location": "office"}, headers=_headers(app, 2))
+    with app.app_context():
+        assert db.session.query(IdempotencyKey).count() == 0
+
+
+def test_expired_lease_is_taken_over(app):
+    client = app.test_client()
+    store = app.extensions["idempotency_store"]
+    with app.app_context():
+        # Félbemaradt kérés: a worker a foglalás után leállt
+        assert store.reserve(db.session, 2, "crashed", "x")
+        row = db.session.get(IdempotencyKey, (2, "crashed"))
+        assert row.expires_at <= datetime.now() + store.lease
+        row.expires_at = datetime.now() - timedelta(seconds=1)
+        db.session.commit()
+
+    response = client.post("/api/attendance/checkin", json={"location": "office"},
+                           headers=_headers(app, 2, key="crashed"))
+    assert response.status_code == 200 and "Idempotent-Replayed" not in response.headers
+
+
+def test_failed_reserve_without_stored_row_is_409(app, monkeypatch):
+    client = app.test_client()
+    store = app.extensions["idempotency_store"]
+    before = _session_count(app, 2)
+    # A reserve ütközik, de a foglaló sor a get előtt eltűnik
+    monkeypatch.setattr(store, "reserve", lambda *args: False)
+
+    response = client.post("/api/attendance/checkin", json={"location": "office"},
+                           headers=_headers(app, 2, key="vanished"))
+    assert response.status_code == 409
+    assert _session_count(app, 2) == before
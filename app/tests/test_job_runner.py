@@ -0,0 +1,132 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config.settings import Config
+from app.db.base import Base
+from app.db.models import AttendanceRecord, BackgroundJob, User, WorkLocation
+from app.main import create_app
+from app.services import job_runner as job_runner_module
+from app.services.job_runner import (
+    JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, PARQUET_EXPORT, PAYROLL_REPORT, JobRunner, JobType,
+    job_runner
+)
+from app.utils.error_handler import ValidationError
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    session.add(User(id=1, username="u1", email="u1@x.hu", password_hash="x"))
+    check_in = datetime(2025, 11, 3, 8, 0)
+    session.add(AttendanceRecord(user_id=1, check_in=check_in, check_out=check_in + timedelta(hours=8),
+                                 work_duration=480, date=check_in.date(), work_location=WorkLocation.OFFICE))
+    session.commit()
+    return session
+
+
+@pytest.fixture
+def runner(tmp_path):
+    # Memóriabeli adatbázis: a feladat a hívó folyamatban fut le
+    runner = JobRunner(results_dir=str(tmp_path / "jobs"))
+    runner.config = {"PAYROLL_LATE_AFTER": "09:00", "PAYROLL_SHORT_DAY_MINUTES": 480}
+    return runner
+
+
+def test_payroll_job_stores_result_file(session, runner):
+    job = runner.submit(session, PAYROLL_REPORT, {"month": "2025-11"}, user_id=1)
+
+    assert (job.status, job.progress) == (JOB_SUCCEEDED, 100)
+    assert job.result_filename == "payroll-2025-11.csv"
+    with open(job.result_path, encoding="utf-8") as f:
+        assert "u1" in f.read()
+
+    with pytest.raises(ValidationError):
+        runner.submit(session, PAYROLL_REPORT, {"month": "2025-13"})
+    with pytest.raises(ValidationError):
+        runner.submit(session, "unknown", {})
+
+
+def test_failing_job_is_marked_failed(session, runner, monkeypatch):
+    def explode(session, params, progress, config):
+        progress(50, "félúton")
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(job_runner_module.JOB_TYPES, "explode", JobType(lambda params: params, explode))
+
+    job = runner.submit(session, "explode", {})
+
+    assert job.status == JOB_FAILED
+    assert job.progress == 50
+    assert "boom" in job.error
+
+
+def test_single_flight_job_is_coalesced_while_running(session, runner):
+    session.add(BackgroundJob(id="running", job_type=PARQUET_EXPORT, params='{"full": false}',
+                              status=JOB_RUNNING, heartbeat_at=datetime.now()))
+    session.commit()
+
+    assert runner.submit(session, PARQUET_EXPORT, {}).id == "running"
+    with pytest.raises(ValidationError) as error:
+        runner.submit(session, PARQUET_EXPORT, {"full": True})
+    assert error.value.status_code == 409
+    assert session.query(BackgroundJob).count() == 1
+
+
+def test_recover_stale_and_purge_expired(session, runner):
+    old = datetime.now() - timedelta(hours=2)
+    session.add(BackgroundJob(id="stale", job_type=PAYROLL_REPORT, params="{}", status=JOB_QUEUED,
+                              heartbeat_at=old))
+    session.commit()
+
+    assert runner.recover_stale(session) == 1
+    job = runner.get(session, "stale")
+    assert job.status == JOB_FAILED
+
+    job.expires_at = old
+    session.commit()
+    assert runner.purge_expired(session) == 1
+    assert session.get(BackgroundJob, "stale") is None
+
+
+def test_report_endpoint_runs_in_process_pool(tmp_path):
+    config = type("JobConfig", (Config,), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.sqlite'}",
+        "RATE_LIMIT_ENABLED": False,
+        "JOB_RESULTS_DIR": str(tmp_path / "jobs"),
+        "JOB_WORKERS": 1,
+    })
+    app = create_app(config)
+    client = app.test_client()
+    with app.app_context():
+        admin = {"Authorization": f"Bearer {create_access_token(identity='3', additional_claims={'role': 'admin'})}"}
+        user = {"Authorization": f"Bearer {create_access_token(identity='1', additional_claims={'role': 'user'})}"}
+
+    try:
+        assert client.post("/api/admin/reports/payroll", json={"month": "2025-11"}, headers=user).status_code == 403
+        assert client.post("/api/admin/reports/payroll", json={"month": "x"}, headers=admin).status_code == 400
+
+        response = client.post("/api/admin/reports/payroll", json={"month": "2025-11"}, headers=admin)
+        assert response.status_code == 202
+        status_url = response.headers["Location"]
+
+        deadline = time.monotonic() + 60
+        while True:
+            status = client.get(status_url, headers=admin).get_json()
+            if status["status"] in (JOB_SUCCEEDED, JOB_FAILED) or time.monotonic() > deadline:
+                break
+            time.sleep(0.1)
+        assert status["status"] == JOB_SUCCEEDED, status
+
+        download = client.get(f"{status_url}/result", headers=admin)
+        assert download.status_code == 200
+        assert download.mimetype == "text/csv"
+        assert download.data.startswith(b"user_id")
+    finally:
+        job_runner.shutdown()
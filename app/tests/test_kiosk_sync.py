@@ -0,0 +1,126 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import AttendanceRecord, KioskEvent, OutboxEvent, OvertimeRequest, User
+from app.services.kiosk_sync import KioskSyncService
+from app.utils.error_handler import ValidationError
+
+NOW = datetime(2025, 3, 10, 20, 0)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    for i in (1, 2, 3):
+        session.add(User(id=i, username=f"u{i}", email=f"u{i}@x.hu", password_hash="x"))
+    session.add(User(id=4, username="off", email="off@x.hu", password_hash="x", is_active=False))
+    session.commit()
+    return session
+
+
+def punch(event_id, user_id, kind, hhmm, **extra):
+    return {"event_id": event_id, "user_id": user_id, "type": kind,
+            "timestamp": f"2025-03-10T{hhmm}:00", **extra}
+
+
+def sync(session, events):
+    return KioskSyncService(session, operator_id=99, now=NOW).sync(events, kiosk_id="lobby-1")
+
+
+def test_batch_applies_many_users_in_one_commit(session):
+    commits = []
+    event.listen(session.get_bind(), "commit", lambda conn: commits.append(1))
+
+    result = sync(session, [
+        punch("e1", 1, "check_in", "08:00"),
+        punch("e2", 2, "check_in", "08:05", location="home_office"),
+        punch("e3", 1, "check_out", "18:30"),
+    ])
+
+    assert [r["status"] for r in result["results"]] == ["applied"] * 3
+    assert len(commits) == 1
+    closed = session.get(AttendanceRecord, result["results"][2]["session_id"])
+    assert closed.check_out == datetime(2025, 3, 10, 18, 30) and closed.work_duration == 630
+    assert session.query(OvertimeRequest).one().overtime_minutes == 90
+    assert session.query(AttendanceRecord).filter_by(user_id=2).one().check_out is None
+
+
+def test_resent_events_are_duplicates(session):
+    first = sync(session, [punch("e1", 1, "check_in", "08:00")])
+    again = sync(session, [punch("e1", 1, "check_in", "08:00"), punch("e2", 1, "check_out", "12:00")])
+
+    assert again["results"][0] == {"event_id": "e1", "status": "duplicate",
+                                   "session_id": first["results"][0]["session_id"]}
+    assert again["results"][1]["status"] == "applied"
+    assert session.query(AttendanceRecord).count() == 1
+    assert session.query(KioskEvent).count() == 2
+
+
+def test_per_user_ordering_and_state_validation(session):
+    result = sync(session, [
+        punch("a", 1, "check_in", "09:00"),
+        punch("b", 1, "check_out", "08:00"),   # korábbi, mint a bejelentkezés
+        punch("c", 2, "check_out", "09:00"),   # nincs nyitott munkamenet
+        punch("d", 4, "check_in", "09:00"),    # inaktív felhasználó
+        punch("e", 3, "check_in", "23:00"),    # a jövőben
+        {"event_id": "f", "user_id": 3, "type": "lunch", "timestamp": "2025-03-10T09:00:00"},
+        punch("a", 3, "check_in", "09:00"),    # ugyanabban a kötegben ismételt azonosító
+    ])
+
+    assert [r["status"] for r in result["results"]] == [
+        "applied", "rejected", "rejected", "rejected", "rejected", "rejected", "duplicate",
+    ]
+    assert result["summary"] == {"applied": 1, "duplicate": 1, "rejected": 5}
+    assert session.query(AttendanceRecord).count() == 1
+
+
+def test_offline_overnight_checkout_then_checkin(session):
+    sync(session, [punch("in", 1, "check_in", "08:00")])
+
+    # A kioszk egész éjjel offline volt: a lezárás és az új nap bejelentkezése egy kötegben jön
+    result = KioskSyncService(session, operator_id=99, now=datetime(2025, 3, 11, 9, 0)).sync([
+        punch("out", 1, "check_out", "17:00"),
+        {"event_id": "next", "user_id": 1, "type": "check_in", "timestamp": "2025-03-11T08:00:00"},
+    ], kiosk_id="lobby-1")
+
+    assert [r["status"] for r in result["results"]] == ["applied", "applied"]
+    records = session.query(AttendanceRecord).filter_by(user_id=1).order_by(AttendanceRecord.check_in).all()
+    assert [(r.check_out, r.work_duration) for r in records] == [(datetime(2025, 3, 10, 17, 0), 540), (None, None)]
+
+
+def test_batch_size_limit(session):
+    service = KioskSyncService(session, operator_id=99, max_events=2, now=NOW)
+    with pytest.raises(ValidationError):
+        service.sync([punch(str(i), 1, "check_in", "08:00") for i in range(3)])
+
+
+def test_concurrent_online_checkout_rejects_batch(session, monkeypatch):
+    sync(session, [punch("in", 1, "check_in", "06:00")])
+    online_check_out = datetime(2025, 3, 10, 16, 0)
+    service = KioskSyncService(session, operator_id=99, now=NOW)
+    replay = service._replay
+
+    def replay_then_online_checkout(events, results):
+        touched = replay(events, results)
+        # A _replay után, az írás előtt a felhasználó online kijelentkezik
+        session.execute(update(AttendanceRecord).where(AttendanceRecord.user_id == 1)
+                        .values(check_out=online_check_out, work_duration=600))
+        return touched
+
+    monkeypatch.setattr(service, "_replay", replay_then_online_checkout)
+    with pytest.raises(ValidationError) as error:
+        service.sync([punch("out", 1, "check_out", "17:30")], kiosk_id="lobby-1")
+
+    assert error.value.status_code == 409
+    # A teljes köteg visszagörgetve: a kioszk nem zárta le (és nem írta felül) a munkamenetet
+    record = session.query(AttendanceRecord).filter_by(user_id=1).one()
+    assert record.check_out != datetime(2025, 3, 10, 17, 30)
+    assert session.query(OvertimeRequest).count() == 0
+    assert session.query(OutboxEvent).count() == 0
+    assert session.query(KioskEvent).filter_by(event_id="out").count() == 0
@@ -0,0 +1,107 @@
+import hashlib
+import hmac
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import OutboxEvent, User
+from app.services.attendance_service import AttendanceService
+from app.services.outbox import SESSION_CLOSED, SIGNATURE_HEADER, OutboxDispatcher, publish
+
+
+class StubWebhook:
+    """Helyi HTTP szerver a webhook helyett; a beállított státuszkódokat adja vissza sorban."""
+
+    def __init__(self):
+        self.batches, self.statuses, self.signatures = [], [], []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stub.batches.append(json.loads(body))
+                stub.signatures.append((body, self.headers.get(SIGNATURE_HEADER)))
+                self.send_response(stub.statuses.pop(0) if stub.statuses else 200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/payroll"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def webhook():
+    stub = StubWebhook()
+    yield stub
+    stub.server.shutdown()
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    session.add(User(id=1, username="u1", email="u1@x.hu", password_hash="x"))
+    session.commit()
+    return session
+
+
+class FakeNow:
+    def __init__(self):
+        self.value = datetime(2025, 1, 1, 12, 0)
+
+    def __call__(self):
+        return self.value
+
+
+def test_check_out_writes_outbox_event_in_same_transaction(session):
+    service = AttendanceService(session, current_user_id=1)
+    service.check_in()
+    record = service.check_out()
+
+    event = session.query(OutboxEvent).one()
+    assert event.event_type == SESSION_CLOSED
+    assert json.loads(event.payload)["session_id"] == record.id
+
+
+def test_batches_are_delivered_and_signed(session, webhook):
+    for i in range(5):
+        publish(session, SESSION_CLOSED, 1 + i % 2, {"n": i})
+    session.commit()
+
+    dispatcher = OutboxDispatcher(session, webhook.url, secret="s3cret", batch_size=3)
+    assert dispatcher.drain() == {"sent": 5, "failed": 0, "batches": 2}
+
+    assert [[e["payload"]["n"] for e in batch["events"]] for batch in webhook.batches] == [[0, 1, 2], [3, 4]]
+    body, signature = webhook.signatures[0]
+    assert signature == "sha256=" + hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()
+    assert session.query(OutboxEvent).filter(OutboxEvent.dispatched_at.is_(None)).count() == 0
+
+
+def test_failed_batch_backs_off_and_keeps_per_user_order(session, webhook):
+    now = FakeNow()
+    dispatcher = OutboxDispatcher(session, webhook.url, batch_size=1, base_backoff=10, now=now)
+    publish(session, SESSION_CLOSED, 1, {"n": 1})
+    publish(session, SESSION_CLOSED, 1, {"n": 2})
+    publish(session, SESSION_CLOSED, 2, {"n": 3})
+    session.commit()
+
+    webhook.statuses = [500]
+    assert dispatcher.dispatch_batch() == {"sent": 0, "failed": 1}
+
+    # Az 1-es felhasználó várakozik: a 2. eseménye sem mehet ki, a 2-es felhasználóé igen
+    assert dispatcher.drain()["sent"] == 1
+    assert webhook.batches[-1]["events"][0]["payload"] == {"n": 3}
+
+    now.value += timedelta(seconds=11)
+    assert dispatcher.drain()["sent"] == 2
+    assert [batch["events"][0]["payload"]["n"] for batch in webhook.batches[-2:]] == [1, 2]
@@ -0,0 +1,126 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.crud import review_overtime_request
+from app.db.models import (
+    OutboxEvent, OvertimeBalance, OvertimeLedgerEntry, OvertimeRequest, RequestStatus, User
+)
+from app.services.overtime_ledger import OvertimeLedgerService
+from app.utils.error_handler import ValidationError
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(id=1, username="u1", email="u1@x.hu", password_hash="x"))
+    session.add_all([
+        OvertimeRequest(id=i, user_id=1, overtime_minutes=30 * i)
+        for i in range(1, 4)
+    ])
+    session.commit()
+    return session
+
+
+def _review(session, request_id, status):
+    req = session.get(OvertimeRequest, request_id)
+    old_status = req.status
+    req.status = status
+    OvertimeLedgerService(session).record_status_change(req, old_status)
+    session.commit()
+
+
+def test_balance_follows_reviews(session):
+    service = OvertimeLedgerService(session)
+    _review(session, 1, RequestStatus.APPROVED)
+    _review(session, 2, RequestStatus.APPROVED)
+    _review(session, 3, RequestStatus.REJECTED)
+
+    balance = service.get_balance(1)
+    assert balance["approved_minutes"] == 90
+    assert balance["approved_count"] == 2
+
+    # Újraelbírálás: a jóváhagyott kérelem elutasítása visszakönyvel
+    _review(session, 2, RequestStatus.REJECTED)
+    assert service.get_balance(1)["approved_minutes"] == 30
+
+    entries = session.query(OvertimeLedgerEntry).order_by(OvertimeLedgerEntry.id).all()
+    assert [(e.delta_minutes, e.balance_after) for e in entries] == [(30, 30), (60, 90), (-60, 30)]
+    assert service.reconcile() == []
+
+
+def test_first_approval_race_reuses_concurrently_created_balance(session, monkeypatch):
+    _review(session, 1, RequestStatus.APPROVED)
+    service = OvertimeLedgerService(session)
+    select_balance = service._select_balance_for_update
+    calls = []
+
+    def stale_first_read(user_id):
+        # Az első olvasáskor a párhuzamos tranzakció sora még nem látszott
+        calls.append(user_id)
+        return None if len(calls) == 1 else select_balance(user_id)
+
+    monkeypatch.setattr(service, "_select_balance_for_update", stale_first_read)
+    req = session.get(OvertimeRequest, 2)
+    req.status = RequestStatus.APPROVED
+    service.record_status_change(req, RequestStatus.PENDING)
+    session.commit()
+
+    assert len(calls) == 2
+    assert session.query(OvertimeBalance).count() == 1
+    assert service.get_balance(1)["approved_minutes"] == 90
+
+
+def test_concurrent_reviews_book_the_balance_once(session):
+    # Két admin (két session) ugyanazt a PENDING állapotot olvasta be
+    other = sessionmaker(bind=session.get_bind())()
+    stale = other.get(OvertimeRequest, 2)
+    req = session.get(OvertimeRequest, 2)
+    assert stale.status == req.status == RequestStatus.PENDING
+
+    review_overtime_request(session, req, RequestStatus.APPROVED, reviewer_id=1)
+    session.commit()
+    with pytest.raises(ValidationError) as error:
+        review_overtime_request(other, stale, RequestStatus.APPROVED, reviewer_id=1)
+    other.rollback()
+
+    assert error.value.status_code == 409
+    assert OvertimeLedgerService(session).get_balance(1)["approved_minutes"] == 60
+    assert session.query(OvertimeLedgerEntry).count() == 1
+
+
+def test_unchanged_re_review_publishes_no_event(session):
+    req = session.get(OvertimeRequest, 1)
+    review_overtime_request(session, req, RequestStatus.APPROVED, reviewer_id=1)
+    review_overtime_request(session, req, RequestStatus.APPROVED, reviewer_id=1)
+    session.commit()
+    assert session.query(OutboxEvent).count() == 1
+
+    review_overtime_request(session, req, RequestStatus.REJECTED, reviewer_id=1, reason="tévedés")
+    session.commit()
+    assert session.query(OutboxEvent).count() == 2
+
+
+def test_unknown_user_has_zero_balance(session):
+    assert OvertimeLedgerService(session).get_balance(99)["approved_minutes"] == 0
+
+
+def test_reconcile_fixes_drift(session):
+    service = OvertimeLedgerService(session)
+    _review(session, 1, RequestStatus.APPROVED)
+    # Közvetlen módosítás a főkönyv megkerülésével
+    session.get(OvertimeRequest, 3).status = RequestStatus.APPROVED
+    session.commit()
+
+    mismatches = service.reconcile(fix=True)
+    session.commit()
+
+    assert mismatches == [{
+        "user_id": 1, "expected_minutes": 120, "ledger_minutes": 30,
+        "expected_count": 2, "ledger_count": 1,
+    }]
+    assert session.get(OvertimeBalance, 1).approved_minutes == 120
+    assert service.reconcile() == []
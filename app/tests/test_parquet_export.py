@@ -0,0 +1,87 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from app.db.base import Base
+from app.db.models import AttendanceRecord, User, WorkLocation
+from app.services.parquet_export import LOCK_FILE, ParquetExporter, fcntl
+from app.utils.error_handler import ValidationError
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(id=1, username="u1", email="u1@x.hu", password_hash="x"))
+    for day in (date(2025, 10, 1), date(2025, 11, 3), date(2025, 11, 4)):
+        check_in = datetime.combine(day, datetime.min.time()).replace(hour=8)
+        session.add(AttendanceRecord(user_id=1, check_in=check_in, date=day,
+                                     check_out=check_in.replace(hour=16), work_duration=480,
+                                     updated_at=datetime(2025, 12, 1)))
+    session.commit()
+    return session
+
+
+def _read(tmp_path, month):
+    return pq.read_table(tmp_path / "work_sessions" / f"month={month}" / "data.parquet").to_pydict()
+
+
+def test_only_changed_partitions_are_rewritten(session, tmp_path):
+    exporter = ParquetExporter(session, str(tmp_path))
+
+    first = exporter.export()
+    assert first["work_sessions"]["written"] == ["2025-10", "2025-11"]
+    assert _read(tmp_path, "2025-11")["work_location"] == ["office", "office"]
+
+    # Változatlan adat: semmi sem íródik újra
+    assert exporter.export()["work_sessions"] == {"written": [], "removed": []}
+
+    # Áthelyezés októberből novemberbe: mindkét partíció érintett
+    record = session.query(AttendanceRecord).filter_by(date=date(2025, 10, 1)).one()
+    record.date = date(2025, 11, 5)
+    record.work_location = WorkLocation.HOME_OFFICE
+    session.commit()
+
+    second = exporter.export()
+    assert second["work_sessions"] == {"written": ["2025-11"], "removed": ["2025-10"]}
+    assert sorted(_read(tmp_path, "2025-11")["work_location"]) == ["home_office", "office", "office"]
+    assert not (tmp_path / "work_sessions" / "month=2025-10").exists()
+
+
+def test_state_stores_naive_iso_watermarks(session, tmp_path):
+    exporter = ParquetExporter(session, str(tmp_path))
+    exporter.export()
+
+    state = exporter.load_state()["work_sessions"]
+    assert state["2025-11"]["watermark"] == datetime(2025, 12, 1).isoformat()
+    assert "None" not in {fp["watermark"] for fp in state.values()}
+
+
+def test_update_within_partition_detected(session, tmp_path):
+    exporter = ParquetExporter(session, str(tmp_path))
+    exporter.export()
+
+    record = session.query(AttendanceRecord).filter_by(date=date(2025, 11, 3)).one()
+    record.work_duration = 300
+    session.commit()
+
+    assert exporter.export()["work_sessions"]["written"] == ["2025-11"]
+    assert sorted(_read(tmp_path, "2025-11")["work_duration"]) == [300, 480]
+
+
+@pytest.mark.skipif(fcntl is None, reason="flock csak POSIX rendszeren")
+def test_concurrent_export_to_same_directory_is_rejected(session, tmp_path):
+    # Egy másik folyamat (pl. CLI) exportja tartja a könyvtár zárját
+    with open(tmp_path / LOCK_FILE, "a") as held:
+        fcntl.flock(held, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        with pytest.raises(ValidationError) as error:
+            ParquetExporter(session, str(tmp_path)).export()
+        assert error.value.status_code == 409
+        assert not (tmp_path / "work_sessions").exists()
+
+    assert ParquetExporter(session, str(tmp_path)).export()["work_sessions"]["written"] == ["2025-10", "2025-11"]
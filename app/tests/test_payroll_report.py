@@ -0,0 +1,64 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import AttendanceRecord, User, WorkLocation
+from app.services.payroll_report import PayrollReportService, parse_month
+from app.utils.error_handler import ValidationError
+
+
+def _session(session, user_id, start, minutes, location=WorkLocation.OFFICE):
+    session.add(AttendanceRecord(
+        user_id=user_id, check_in=start, check_out=start + timedelta(minutes=minutes),
+        work_duration=minutes, date=start.date(), work_location=location,
+    ))
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([User(id=i, username=f"u{i}", email=f"u{i}@x.hu", password_hash="x") for i in range(1, 4)])
+
+    # u1: két rész egy napon (9 óra túlóra küszöb felett 60 perc), egy késés + rövid nap
+    _session(session, 1, datetime(2025, 11, 3, 8, 0), 300)
+    _session(session, 1, datetime(2025, 11, 3, 13, 30), 300)
+    _session(session, 1, datetime(2025, 11, 4, 9, 45), 240, WorkLocation.HOME_OFFICE)
+    # u2: csak home office
+    _session(session, 2, datetime(2025, 11, 5, 8, 30), 480, WorkLocation.HOME_OFFICE)
+    # Más hónap és nyitott munkamenet nem számít
+    _session(session, 2, datetime(2025, 10, 31, 8, 0), 480)
+    session.add(AttendanceRecord(user_id=3, check_in=datetime(2025, 11, 6, 8, 0), date=date(2025, 11, 6)))
+    session.commit()
+    return session
+
+
+def test_monthly_report_metrics(session):
+    report = PayrollReportService(session, overtime_threshold=540).monthly_report(date(2025, 11, 1))
+    rows = {r["user_id"]: r for r in PayrollReportService.to_records(report)}
+
+    assert rows[1] == {
+        "user_id": 1, "username": "u1", "worked_days": 2, "total_minutes": 840, "total_hours": 14.0,
+        "office_days": 1, "home_office_days": 1, "other_days": 0,
+        "overtime_minutes": 60, "late_days": 1, "short_days": 1,
+    }
+    assert rows[2]["total_minutes"] == 480
+    assert rows[2]["home_office_days"] == 1 and rows[2]["office_days"] == 0
+    # Munka nélküli aktív felhasználó is szerepel, nullákkal
+    assert rows[3]["worked_days"] == 0 and rows[3]["total_hours"] == 0
+
+
+def test_empty_month(session):
+    report = PayrollReportService(session, overtime_threshold=540).monthly_report(date(2024, 1, 1))
+    assert len(report) == 3
+    assert report["total_minutes"].sum() == 0
+
+
+def test_parse_month():
+    assert parse_month("2025-02") == date(2025, 2, 1)
+    with pytest.raises(ValidationError):
+        parse_month("2025/02")
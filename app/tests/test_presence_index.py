@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import AttendanceRecord, User, WorkLocation
+from app.services.presence_index import PresenceIndex
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_record(record_id, user_id, location=WorkLocation.OFFICE):
+    return AttendanceRecord(id=record_id, user_id=user_id, work_location=location, check_in=datetime.now())
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([User(id=i, username=f"u{i}", email=f"u{i}@x.hu", password_hash="x") for i in (1, 2, 3)])
+    now = datetime.now()
+    session.add_all([
+        AttendanceRecord(user_id=1, check_in=now, date=now.date(), work_location=WorkLocation.OFFICE),
+        AttendanceRecord(user_id=2, check_in=now, date=now.date(), work_location=WorkLocation.HOME_OFFICE),
+        AttendanceRecord(user_id=3, check_in=now - timedelta(hours=2), check_out=now, date=now.date()),
+    ])
+    session.commit()
+    return session
+
+
+def test_rebuild_from_open_sessions(session):
+    index = PresenceIndex()
+    index.rebuild(session)
+
+    assert index.counts() == {"office": 1, "home_office": 1, "other": 0, "total": 2}
+    assert {e.user_id for e in index.roster()} == {1, 2}
+    assert not index.is_present(3)
+
+
+def test_check_in_and_out_update_counts():
+    index = PresenceIndex()
+    index.checked_in(make_record(10, 1))
+    index.checked_in(make_record(11, 2, WorkLocation.OTHER))
+    assert index.counts()["total"] == 2
+    assert index.counts()["other"] == 1
+
+    index.checked_out(2)
+    assert index.counts() == {"office": 1, "home_office": 0, "other": 0, "total": 1}
+
+
+def test_checked_out_ignores_other_record():
+    index = PresenceIndex()
+    index.checked_in(make_record(10, 1))
+
+    # Egy korábbi, már lezárt munkamenet módosítása nem jelentkezteti ki
+    index.checked_out(1, record_id=5)
+    assert index.is_present(1)
+
+    index.checked_out(1, record_id=10)
+    assert not index.is_present(1)
+
+
+def test_resync_after_interval(session):
+    clock = FakeClock()
+    index = PresenceIndex(resync_interval=5, clock=clock)
+    index.rebuild(session)
+
+    # Egy másik worker kijelentkezteti az 1-es felhasználót
+    record = session.query(AttendanceRecord).filter_by(user_id=1).one()
+    record.check_out = datetime.now()
+    session.commit()
+
+    clock.now = 1
+    index.resync_if_stale(session)
+    assert index.is_present(1)
+
+    clock.now = 6
+    index.resync_if_stale(session)
+    assert not index.is_present(1)
+
+
+def test_resync_applies_changes_without_full_rebuild(session, monkeypatch):
+    clock = FakeClock()
+    index = PresenceIndex(resync_interval=5, clock=clock)
+    index.rebuild(session)
+    rebuilds = []
+    monkeypatch.setattr(index, "rebuild", lambda s: rebuilds.append(1))
+
+    # Változatlan számláló mellett nincs mit betölteni
+    clock.now = 6
+    index.resync_if_stale(session)
+    assert index.counts()["total"] == 2
+
+    # Egy másik worker: az 1-es kijelentkezik, a 3-as bejelentkezik
+    record = session.query(AttendanceRecord).filter_by(user_id=1).one()
+    record.check_out = datetime.now()
+    now = datetime.now()
+    session.add(AttendanceRecord(user_id=3, check_in=now, date=now.date(), work_location=WorkLocation.OTHER))
+    session.commit()
+
+    clock.now = 12
+    index.resync_if_stale(session)
+    assert rebuilds == []
+    assert index.counts() == {"office": 0, "home_office": 1, "other": 1, "total": 2}
+    assert not index.is_present(1)
+    assert index.is_present(3)
+
+
+def test_resync_rebuilds_when_far_behind(session, monkeypatch):
+    clock = FakeClock()
+    index = PresenceIndex(resync_interval=5, max_delta=1, clock=clock)
+    index.rebuild(session)
+
+    for record in session.query(AttendanceRecord).filter(AttendanceRecord.check_out.is_(None)):
+        record.check_out = datetime.now()
+    session.commit()
+
+    rebuilds = []
+    original = index.rebuild
+    monkeypatch.setattr(index, "rebuild", lambda s: (rebuilds.append(1), original(s)))
+    clock.now = 6
+    index.resync_if_stale(session)
+    assert rebuilds == [1]
+    assert index.counts()["total"] == 0
@@ -0,0 +1,155 @@
+import pytest
+from flask import Flask, jsonify
+
+from app.utils.rate_limit import (
+    MemoryRateLimitBackend, SQLiteRateLimitBackend, RateLimiter, login_rate_limited
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend_and_clock(request, tmp_path):
+    clock = FakeClock()
+    if request.param == "memory":
+        return MemoryRateLimitBackend(clock=clock), clock
+    return SQLiteRateLimitBackend(str(tmp_path / "rl.sqlite"), clock=clock), clock
+
+
+def test_burst_then_blocked(backend_and_clock):
+    backend, clock = backend_and_clock
+    results = [backend.consume("k", capacity=3, rate=1.0)[0] for _ in range(4)]
+    assert results == [True, True, True, False]
+
+
+def test_refill_over_time(backend_and_clock):
+    backend, clock = backend_and_clock
+    for _ in range(2):
+        backend.consume("k", capacity=2, rate=0.5)
+    allowed, retry_after = backend.consume("k", capacity=2, rate=0.5)
+    assert not allowed
+    assert retry_after == pytest.approx(2.0)
+
+    clock.now += 2.0
+    assert backend.consume("k", capacity=2, rate=0.5)[0]
+
+
+def test_sqlite_backend_shared_between_instances(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "rl.sqlite")
+    worker_a = SQLiteRateLimitBackend(path, clock=clock)
+    worker_b = SQLiteRateLimitBackend(path, clock=clock)
+
+    assert worker_a.consume("k", capacity=1, rate=0.01)[0]
+    assert not worker_b.consume("k", capacity=1, rate=0.01)[0]
+
+
+def test_sqlite_backend_sweeps_refilled_buckets(tmp_path):
+    clock = FakeClock()
+    backend = SQLiteRateLimitBackend(str(tmp_path / "rl.sqlite"), clock=clock, sweep_every=50)
+    # Lassan visszatöltődő, lemerített vödör: a takarítás nem dobhatja el
+    for _ in range(3):
+        backend.consume("login_user:victim", capacity=3, rate=0.001)
+
+    # Credential stuffing: véletlen felhasználónevek, mindegyik egyszer
+    for i in range(96):
+        backend.consume(f"login_ip:10.0.0.{i}", capacity=20, rate=1.0)
+        clock.now += 0.1
+    clock.now += 60.0
+    backend.consume("login_ip:fresh", capacity=20, rate=1.0)  # a 100. elvétel takarít
+
+    conn = backend._connect()
+    keys = {row[0] for row in conn.execute("SELECT key FROM rate_limit_buckets")}
+    assert keys == {"login_user:victim", "login_ip:fresh"}
+    assert not backend.consume("login_user:victim", capacity=3, rate=0.001)[0]
+
+
+def test_sqlite_backend_upgrades_old_table(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "rl.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE rate_limit_buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)")
+    conn.close()
+
+    backend = SQLiteRateLimitBackend(path, clock=FakeClock())
+    assert backend.consume("k", capacity=1, rate=0.01)[0]
+    assert not backend.consume("k", capacity=1, rate=0.01)[0]
+
+
+def test_memory_prune_keeps_partly_drained_buckets_of_other_rules():
+    clock = FakeClock()
+    backend = MemoryRateLimitBackend(clock=clock, max_keys=2)
+    # login_ip vödör (kapacitás 20) félig lemerítve; 10 s alatt 5 token töltődik vissza
+    for _ in range(10):
+        backend.consume("login_ip:1.2.3.4", capacity=20, rate=0.5)
+    backend.consume("login_user:a", capacity=5, rate=1.0)
+    clock.now += 10.0
+
+    # Új login_user kulcs: csak a saját szabálya szerint teli login_user:a vödör dobható el
+    backend.consume("login_user:b", capacity=5, rate=1.0)
+    results = [backend.consume("login_ip:1.2.3.4", capacity=20, rate=0.5)[0] for _ in range(16)]
+    assert results == [True] * 15 + [False]
+
+
+def test_memory_backend_key_count_is_bounded():
+    clock = FakeClock()
+    backend = MemoryRateLimitBackend(clock=clock, max_keys=100)
+    for i in range(1000):
+        # Egyik vödör sem töltődik vissza, a legrégebbiek kerülnek ki
+        backend.consume(f"login_user:{i}", capacity=5, rate=0.001)
+    assert len(backend._buckets) <= 100
+    assert "login_user:999" in backend._buckets
+    assert "login_user:0" not in backend._buckets
+
+
+def make_app(limiter):
+    app = Flask(__name__)
+    app.extensions["rate_limiter"] = limiter
+    calls = []
+
+    @app.post("/login")
+    @login_rate_limited()
+    def login():
+        calls.append(1)
+        return jsonify({"ok": True})
+
+    return app, calls
+
+
+def test_decorator_returns_429_before_handler():
+    limiter = RateLimiter(MemoryRateLimitBackend(), {"login_ip": (100, 1.0), "login_user": (2, 0.001)})
+    app, calls = make_app(limiter)
+    client = app.test_client()
+
+    statuses = [client.post("/login", json={"username": "John"}).status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+    assert len(calls) == 2
+    # Másik felhasználónévvel ugyanarról az IP-ről még mehet
+    assert client.post("/login", json={"username": "jane"}).status_code == 200
+
+
+def test_decorator_sets_retry_after():
+    limiter = RateLimiter(MemoryRateLimitBackend(), {"login_ip": (1, 0.1), "login_user": (10, 1.0)})
+    app, _ = make_app(limiter)
+    client = app.test_client()
+
+    client.post("/login", json={})
+    response = client.post("/login", json={})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_disabled_limiter_allows_everything():
+    limiter = RateLimiter(MemoryRateLimitBackend(), {"login_ip": (1, 0.0), "login_user": (1, 0.0)}, enabled=False)
+    app, calls = make_app(limiter)
+    client = app.test_client()
+    for _ in range(5):
+        assert client.post("/login", json={"username": "x"}).status_code == 200
@@ -0,0 +1,98 @@
+from datetime import date, datetime
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config.settings import Config
+from app.db import read_models
+from app.db.base import Base
+from app.db.models import AttendanceRecord, ModificationRequest, RequestStatus, User, WorkLocation
+from app.main import create_app
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    session.add_all([User(id=i, username=f"u{i}", email=f"u{i}@x.hu", password_hash="x") for i in (1, 2)])
+    session.add_all([
+        AttendanceRecord(id=1, user_id=1, check_in=datetime(2025, 3, 3, 8, 0), check_out=datetime(2025, 3, 3, 16, 30),
+                         work_duration=510, date=date(2025, 3, 3), work_location=WorkLocation.OFFICE),
+        AttendanceRecord(id=2, user_id=1, check_in=datetime(2025, 3, 4, 9, 0), date=date(2025, 3, 4),
+                         work_location=WorkLocation.HOME_OFFICE),
+        AttendanceRecord(id=3, user_id=2, check_in=datetime(2025, 3, 4, 7, 45), date=date(2025, 3, 4),
+                         work_location=WorkLocation.OFFICE),
+    ])
+    session.add_all([
+        ModificationRequest(id=1, user_id=1, work_session_id=1, requested_check_in=datetime(2025, 3, 3, 7, 30),
+                            reason="Korábban érkeztem"),
+        ModificationRequest(id=2, user_id=2, work_session_id=3, requested_work_location=WorkLocation.HOME_OFFICE,
+                            reason="Otthonról", status=RequestStatus.APPROVED),
+    ])
+    session.commit()
+    return session
+
+
+def test_attendance_records_match_orm_fields(session):
+    rows = read_models.attendance_record_dicts(session)
+    record = session.get(AttendanceRecord, 1)
+    assert rows[0] == {
+        "id": 1, "user_id": 1, "check_in": "2025-03-03T08:00:00", "check_out": "2025-03-03T16:30:00",
+        "work_location": "office", "work_duration": 510, "date": "2025-03-03", "is_overtime_generated": False,
+        "created_at": record.created_at.isoformat(), "updated_at": record.updated_at.isoformat(),
+    }
+    assert [(row["id"], row["check_out"]) for row in rows[1:]] == [(2, None), (3, None)]
+
+
+def test_user_attendance_filters_and_orders_newest_first(session):
+    assert read_models.find_user_id(session, "1") == 1
+    assert read_models.find_user_id(session, "u2") == 2
+    assert read_models.find_user_id(session, "nobody") is None
+
+    assert read_models.user_attendance_dicts(session, 1) == [
+        {"date": "2025-03-04", "check_in": "2025-03-04T09:00:00", "check_out": None,
+         "work_location": "home_office", "work_duration": None},
+        {"date": "2025-03-03", "check_in": "2025-03-03T08:00:00", "check_out": "2025-03-03T16:30:00",
+         "work_location": "office", "work_duration": 510},
+    ]
+    assert [row["date"] for row in read_models.user_attendance_dicts(session, 1, end_date=date(2025, 3, 3))] == [
+        "2025-03-03"
+    ]
+
+
+def test_modification_requests_join_username_and_day(session):
+    rows = read_models.modification_request_dicts(session)
+    assert [(row["id"], row["username"], row["date"], row["status"]) for row in rows] == [
+        (1, "u1", "2025-03-03", "pending"), (2, "u2", "2025-03-04", "approved"),
+    ]
+    assert rows[0]["requested_check_in"] == "2025-03-03T07:30:00"
+    assert rows[0]["requested_work_location"] is None
+    assert rows[1]["requested_work_location"] == "home_office"
+
+    pending = read_models.modification_request_dicts(session, RequestStatus.PENDING)
+    assert [row["id"] for row in pending] == [1]
+
+
+def test_admin_endpoints_serve_read_models(tmp_path):
+    app = create_app(type("ReadModelConfig", (Config,), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.sqlite'}",
+        "RATE_LIMIT_ENABLED": False,
+    }))
+    client = app.test_client()
+    with app.app_context():
+        headers = {"Authorization": f"Bearer {create_access_token(identity='3', additional_claims={'role': 'admin'})}"}
+
+    records = client.get("/api/admin/attendancerecords", headers=headers).get_json()
+    assert [record["user_id"] for record in records] == [1]
+
+    by_name = client.get("/api/admin/users/john/attendance", headers=headers).get_json()
+    assert by_name == client.get("/api/admin/users/1/attendance", headers=headers).get_json()
+    assert by_name[0]["check_in"] == records[0]["check_in"]
+    assert client.get("/api/admin/users/nobody/attendance", headers=headers).status_code == 404
+
+    response = client.get("/api/admin/modification-requests?status=pending", headers=headers)
+    assert response.status_code == 200
+    assert response.get_json() == []
@@ -0,0 +1,69 @@
+import pytest
+from flask import Flask
+from flask_jwt_extended import create_access_token
+
+from app.config.settings import Config
+from app.db.replica import PRIMARY_COOKIE, replica_router, sync_sqlite_replica
+from app.main import create_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    config = type("ReplicaConfig", (Config,), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'primary.sqlite'}",
+        "REPLICA_DATABASE_URI": f"sqlite:///{tmp_path / 'replica.sqlite'}",
+        "RATE_LIMIT_ENABLED": False,
+    })
+    app = create_app(config)
+    yield app
+    # A singleton router ne maradjon replikára állítva a többi tesztnek
+    replica_router.init_app(Flask(__name__))
+
+
+def _headers(app, user_id, role="user"):
+    with app.app_context():
+        token = create_access_token(identity=str(user_id), additional_claims={"role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_reports_read_replica_until_synced(app):
+    admin = _headers(app, 3, role="admin")
+    john = _headers(app, 1)
+    before = len(app.test_client().get("/api/admin/attendancerecords", headers=admin).json)
+
+    # Saját írás után a saját dashboard azonnal a primary-ról olvas
+    client = app.test_client()
+    response = client.post("/api/attendance/checkin", json={"location": "office"}, headers=_headers(app, 2))
+    assert response.status_code == 200
+    assert PRIMARY_COOKIE in response.headers.get("Set-Cookie", "")
+
+    # Admin riport a replikáról: még nem látszik az új munkamenet
+    assert len(app.test_client().get("/api/admin/attendancerecords", headers=admin).json) == before
+
+    sync_sqlite_replica(app.config["SQLALCHEMY_DATABASE_URI"], app.config["REPLICA_DATABASE_URI"])
+    assert len(app.test_client().get("/api/admin/attendancerecords", headers=admin).json) == before + 1
+    assert app.test_client().get("/api/attendance/weekly", headers=john).status_code == 200
+
+
+def test_read_your_writes_after_checkin(app):
+    client = app.test_client()
+    headers = _headers(app, 2)
+    client.post("/api/attendance/checkin", json={"location": "office"}, headers=headers)
+    assert client.get("/api/attendance/weekly", headers=headers).json["active_session"] is not None
+
+    # Másik worker (üres folyamaton belüli jelzés) a cookie alapján is a primary-t választja
+    replica_router._recent_writes.clear()
+    assert client.get("/api/attendance/weekly", headers=headers).json["active_session"] is not None
+
+    # Cookie nélkül a replikáról olvas, ahol a bejelentkezés még nem látszik
+    assert app.test_client().get("/api/attendance/weekly", headers=headers).json["active_session"] is None
+
+
+def test_replica_session_is_read_only(app):
+    with app.test_request_context():
+        session = replica_router.read_session()
+        assert session.get_bind().url.database.endswith("replica.sqlite")
+        from app.db.models import SystemSettings
+        session.add(SystemSettings(key="x", value="y"))
+        with pytest.raises(RuntimeError):
+            session.flush()
@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import MagicMock
 from datetime import date
 from app.services.report_service import ReportService
+from app.utils.cache import SharedCache
 from app.utils.error_handler import ServiceError, NotFoundError, ValidationError
 from app.db.models import WorkLocation
 from sqlalchemy.exc import SQLAlchemyError
@@ -13,7 +14,8 @@ def db():
 
 @pytest.fixture
 def service(db):
-    return ReportService(db)
+    # Cache nélkül: minden hívás a (mock) adatbázist kérdezi
+    return ReportService(db, cache=SharedCache())
 
 
 # -----------------------------
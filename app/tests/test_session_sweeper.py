@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, update
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import AttendanceRecord, AuditLog, OutboxEvent, OvertimeRequest, User
+from app.services.presence_index import presence_index
+from app.services.session_sweeper import SessionSweeper
+
+NOW = datetime(2025, 11, 20, 12, 0)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([User(id=i, username=f"u{i}", email=f"u{i}@x.hu", password_hash="x") for i in range(1, 7)])
+    for user_id in range(1, 6):
+        check_in = NOW - timedelta(hours=20)  # elfelejtett
+        session.add(AttendanceRecord(user_id=user_id, check_in=check_in, date=check_in.date()))
+    # Friss, még futó munkamenet
+    session.add(AttendanceRecord(user_id=6, check_in=NOW - timedelta(hours=2), date=NOW.date()))
+    session.commit()
+    return session
+
+
+def test_closes_only_stale_sessions_in_batches(session):
+    result = SessionSweeper(session, max_open_minutes=600, batch_size=2, now=NOW).run()
+
+    assert result == {"closed": 5, "overtime_created": 5, "batches": 3}
+    assert session.query(AttendanceRecord).filter(AttendanceRecord.check_out.is_(None)).count() == 1
+
+    record = session.query(AttendanceRecord).filter_by(user_id=1).one()
+    assert record.work_duration == 600
+    assert record.check_out == record.check_in + timedelta(minutes=600)
+    assert record.is_overtime_generated
+
+
+def test_creates_overtime_and_audit_rows(session):
+    SessionSweeper(session, max_open_minutes=600, now=NOW).run()
+
+    assert session.query(func.sum(OvertimeRequest.overtime_minutes)).scalar() == 5 * 60
+    assert session.query(OvertimeRequest).filter_by(is_auto_generated=True).count() == 5
+    assert session.query(AuditLog).filter_by(action="auto_check_out").count() == 5
+
+
+def test_no_overtime_below_threshold(session):
+    result = SessionSweeper(session, max_open_minutes=480, now=NOW).run()
+
+    assert result["closed"] == 5
+    assert result["overtime_created"] == 0
+    assert session.query(OvertimeRequest).count() == 0
+
+
+def test_checkout_between_select_and_close_is_kept(session, monkeypatch):
+    sweeper = SessionSweeper(session, max_open_minutes=600, now=NOW)
+    close = sweeper._close
+    real_check_out = NOW - timedelta(hours=19)
+
+    def close_after_concurrent_checkout(rows, overtime_minutes):
+        # Az 1-es felhasználó a SELECT után, a lezárás előtt kijelentkezik
+        session.execute(update(AttendanceRecord).where(AttendanceRecord.user_id == 1)
+                        .values(check_out=real_check_out, work_duration=60))
+        return close(rows, overtime_minutes)
+
+    monkeypatch.setattr(sweeper, "_close", close_after_concurrent_checkout)
+    assert sweeper.run()["closed"] == 4
+
+    record = session.query(AttendanceRecord).filter_by(user_id=1).one()
+    assert (record.check_out, record.work_duration) == (real_check_out, 60)
+    assert session.query(OvertimeRequest).filter_by(work_session_id=record.id).count() == 0
+    assert session.query(AuditLog).filter_by(action="auto_check_out").count() == 4
+    assert session.query(OutboxEvent).count() == 4
+
+
+def test_updates_presence_index(session):
+    presence_index.rebuild(session)
+    assert presence_index.is_present(1)
+
+    SessionSweeper(session, max_open_minutes=600, now=NOW).run()
+
+    assert not presence_index.is_present(1)
+    assert presence_index.is_present(6)
+
+
+def test_invalid_limit(session):
+    with pytest.raises(ValueError):
+        SessionSweeper(session, max_open_minutes=0)
@@ -0,0 +1,117 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config.settings import Config
+from app.db.base import Base
+from app.db.models import SystemSettings
+from app.db.settings_cache import SettingsCache, SETTINGS_VERSION_NAME, OVERTIME_THRESHOLD_KEY, validate_setting
+from app.main import create_app
+from app.utils.error_handler import ValidationError
+from app.db.versioning import bump_version, read_version
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def make_cache(session, clock):
+    cache = SettingsCache({OVERTIME_THRESHOLD_KEY: "540"}, check_interval=1.0, clock=clock)
+    cache._session_factory = lambda: session
+    cache.load(session)
+    return cache
+
+
+def set_value(session, key, value):
+    session.add(SystemSettings(key=key, value=value))
+    bump_version(session, SETTINGS_VERSION_NAME)
+    session.commit()
+
+
+def test_default_used_when_not_in_db(session_factory):
+    cache = make_cache(session_factory(), FakeClock())
+    assert cache.get_int(OVERTIME_THRESHOLD_KEY) == 540
+    assert cache.get("missing", "x") == "x"
+
+
+def test_bump_version_creates_and_increments(session_factory):
+    session = session_factory()
+    assert read_version(session, "foo") == 0
+    bump_version(session, "foo")
+    bump_version(session, "foo")
+    session.commit()
+    assert read_version(session, "foo") == 2
+
+
+def test_other_worker_change_visible_after_interval(session_factory):
+    clock = FakeClock()
+    cache = make_cache(session_factory(), clock)
+
+    # Egy másik "worker" módosítja a beállítást
+    set_value(session_factory(), OVERTIME_THRESHOLD_KEY, "600")
+
+    clock.now = 0.5
+    assert cache.get_int(OVERTIME_THRESHOLD_KEY) == 540  # még nem ellenőrzött
+
+    clock.now = 1.5
+    assert cache.get_int(OVERTIME_THRESHOLD_KEY) == 600
+
+
+def test_no_reload_when_version_unchanged(session_factory):
+    clock = FakeClock()
+    session = session_factory()
+    cache = make_cache(session, clock)
+
+    # Verzióbump nélküli közvetlen írást nem tölt újra
+    session.add(SystemSettings(key=OVERTIME_THRESHOLD_KEY, value="700"))
+    session.commit()
+
+    clock.now = 5
+    assert cache.get_int(OVERTIME_THRESHOLD_KEY) == 540
+
+
+def test_invalidate_forces_check(session_factory):
+    clock = FakeClock()
+    session = session_factory()
+    cache = make_cache(session, clock)
+
+    set_value(session, OVERTIME_THRESHOLD_KEY, "480")
+    cache.invalidate()
+    assert cache.get_int(OVERTIME_THRESHOLD_KEY) == 480
+
+
+def test_validate_setting_checks_numeric_keys():
+    assert validate_setting(OVERTIME_THRESHOLD_KEY, " 600 ") == "600"
+    assert validate_setting("company_name", "ACME") == "ACME"
+    for bad in ("abc", "-5", "0", "1441", "9.5"):
+        with pytest.raises(ValidationError):
+            validate_setting(OVERTIME_THRESHOLD_KEY, bad)
+
+
+def test_update_setting_endpoint_rejects_invalid_value(tmp_path):
+    config = type("SettingsConfig", (Config,), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.sqlite'}",
+        "RATE_LIMIT_ENABLED": False,
+    })
+    app = create_app(config)
+    with app.app_context():
+        token = create_access_token(identity="3", additional_claims={"role": "admin"})
+    client, headers = app.test_client(), {"Authorization": f"Bearer {token}"}
+    url = f"/api/admin/settings/{OVERTIME_THRESHOLD_KEY}"
+
+    assert client.put(url, json={"value": "abc"}, headers=headers).status_code == 400
+    assert client.put(url, json={"value": "-5"}, headers=headers).status_code == 400
+    response = client.put(url, json={"value": 600}, headers=headers)
+    assert response.status_code == 200 and response.json["value"] == "600"
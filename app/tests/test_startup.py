@@ -0,0 +1,56 @@
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+from app.config.settings import Config
+from app.db.base import Base
+from app.db.engine import alembic_head_revision
+from app.main import create_app
+
+
+def write_revision(directory, revision, down_revision):
+    down = repr(down_revision) if down_revision else "None"
+    (directory / f"{revision}_x.py").write_text(
+        f"revision = '{revision}'\ndown_revision = {down}\n", encoding="utf-8"
+    )
+
+
+def make_config(db_path, **overrides):
+    attrs = {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}", "DB_STARTUP_MODE": "production", **overrides}
+    return type("TestConfig", (Config,), attrs)
+
+
+def test_head_revision_from_files(tmp_path):
+    write_revision(tmp_path, "0001", None)
+    write_revision(tmp_path, "0002", "0001")
+    app = Flask(__name__)
+    app.config["ALEMBIC_VERSIONS_DIR"] = str(tmp_path)
+
+    assert alembic_head_revision(app) == "0002"
+
+
+def test_repo_migrations_have_single_head():
+    app = Flask(__name__)
+    app.config["ALEMBIC_VERSIONS_DIR"] = Config.ALEMBIC_VERSIONS_DIR
+    assert alembic_head_revision(app)
+
+
+def test_production_mode_refuses_unmigrated_database(tmp_path):
+    with pytest.raises(RuntimeError):
+        create_app(make_config(tmp_path / "empty.sqlite", ALEMBIC_EXPECTED_HEAD="0001"))
+
+
+def test_production_mode_skips_ddl_and_seed(tmp_path):
+    db_path = tmp_path / "migrated.sqlite"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        conn.execute(text("INSERT INTO alembic_version VALUES ('0001')"))
+
+    app = create_app(make_config(db_path, ALEMBIC_EXPECTED_HEAD="0001"))
+
+    assert app.test_client().get("/login").status_code == 200
+    with engine.connect() as conn:
+        # Production módban nincs seed
+        assert conn.execute(text("SELECT COUNT(*) FROM users")).scalar() == 0
@@ -0,0 +1,138 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config.settings import Config
+from app.db.base import Base
+from app.main import create_app
+from app.services.token_blocklist import PRECISE_IAT_CLAIM, TokenBlocklist
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def make_blocklist(session, clock, now):
+    blocklist = TokenBlocklist(check_interval=1.0, clock=clock, now=now)
+    blocklist.load(session)
+    return blocklist
+
+
+def test_logout_revokes_only_that_token(session_factory):
+    session, now = session_factory(), FakeClock(1_000_000)
+    blocklist = make_blocklist(session, FakeClock(), now)
+
+    blocklist.revoke_token(session, {"jti": "a", "sub": "1", "iat": 999_000, "exp": 1_000_900})
+
+    assert blocklist.is_revoked({"jti": "a", "sub": "1", "iat": 999_000})
+    assert not blocklist.is_revoked({"jti": "b", "sub": "1", "iat": 999_000})
+
+
+def test_revoke_user_cuts_off_older_tokens(session_factory):
+    session, now = session_factory(), FakeClock(1_000_000)
+    blocklist = make_blocklist(session, FakeClock(), now)
+
+    blocklist.revoke_user(session, 7)
+
+    assert blocklist.is_revoked({"jti": "x", "sub": "7", "iat": 999_999})
+    assert not blocklist.is_revoked({"jti": "y", "sub": "7", "iat": 1_000_001})
+    assert not blocklist.is_revoked({"jti": "z", "sub": "8", "iat": 999_999})
+
+
+def test_token_issued_in_the_revocation_second_is_ordered_precisely(session_factory):
+    session, now = session_factory(), FakeClock(1_000_000.5)
+    blocklist = make_blocklist(session, FakeClock(), now)
+    blocklist.revoke_user(session, 7)
+
+    assert blocklist.is_revoked({"jti": "x", "sub": "7", "iat": 1_000_000, PRECISE_IAT_CLAIM: 1_000_000.2})
+    assert not blocklist.is_revoked({"jti": "y", "sub": "7", "iat": 1_000_000, PRECISE_IAT_CLAIM: 1_000_000.7})
+    # Másik worker a tárolt (tört másodperces) határidővel ugyanígy dönt
+    blocklist.load(session)
+    assert not blocklist.is_revoked({"jti": "y", "sub": "7", "iat": 1_000_000, PRECISE_IAT_CLAIM: 1_000_000.7})
+    # Tört másodperc nélküli régi token: a visszavonás másodpercében kiadott is érvénytelen
+    assert blocklist.is_revoked({"jti": "z", "sub": "7", "iat": 1_000_000})
+
+
+def test_revoke_user_also_revokes_current_token(session_factory):
+    session, now = session_factory(), FakeClock(1_000_000.5)
+    blocklist = make_blocklist(session, FakeClock(), now)
+    # A kérést küldő token "későbbinek" látszik (óraeltérés a workerek között)
+    current = {"jti": "self", "sub": "7", "iat": 1_000_001, PRECISE_IAT_CLAIM: 1_000_001.0, "exp": 1_000_900}
+
+    blocklist.revoke_user(session, 7, current_token=current)
+    assert blocklist.is_revoked(current)
+    blocklist.load(session)
+    assert blocklist.is_revoked(current)
+
+    # Más felhasználó tokenje nem kerül a listára
+    blocklist.revoke_user(session, 8, current_token={"jti": "admin", "sub": "3", "exp": 1_000_900})
+    assert not blocklist.is_revoked({"jti": "admin", "sub": "3"})
+
+
+def test_other_worker_sees_revocation_after_interval(session_factory):
+    now, clock = FakeClock(1_000_000), FakeClock()
+    worker_a = make_blocklist(session_factory(), clock, now)
+    worker_b_session = session_factory()
+    worker_b = make_blocklist(worker_b_session, clock, now)
+
+    worker_a.revoke_token(session_factory(), {"jti": "a", "sub": "1", "exp": 1_000_900})
+
+    worker_b.refresh_if_stale(worker_b_session)
+    assert not worker_b.is_revoked({"jti": "a"})  # még a check_interval-on belül
+    clock.now += 2
+    worker_b.refresh_if_stale(worker_b_session)
+    assert worker_b.is_revoked({"jti": "a"})
+
+
+def test_expired_tokens_are_not_loaded(session_factory):
+    session, now = session_factory(), FakeClock(1_000_000)
+    blocklist = make_blocklist(session, FakeClock(), now)
+    blocklist.revoke_token(session, {"jti": "old", "sub": "1", "exp": 1_000_100})
+
+    now.now = 1_000_200
+    blocklist.load(session)
+    assert not blocklist.is_revoked({"jti": "old"})
+
+
+@pytest.fixture
+def app(tmp_path):
+    config = type("BlocklistConfig", (Config,), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.sqlite'}",
+        "RATE_LIMIT_ENABLED": False,
+    })
+    return create_app(config)
+
+
+def _headers(app, user_id, role="user"):
+    with app.app_context():
+        token = create_access_token(identity=str(user_id), additional_claims={"role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_logout_and_admin_revoke_endpoints(app):
+    client = app.test_client()
+    phone, laptop = _headers(app, 1), _headers(app, 1)
+
+    assert client.post("/api/auth/logout", headers=phone).status_code == 200
+    assert client.get("/api/attendance/weekly", headers=phone).status_code == 401
+    assert client.get("/api/attendance/weekly", headers=laptop).status_code == 200
+
+    admin = _headers(app, 3, role="admin")
+    assert client.post("/api/admin/users/1/revoke-sessions", headers=admin).status_code == 200
+    assert client.get("/api/attendance/weekly", headers=laptop).status_code == 401
+    assert client.post("/api/admin/users/9999/revoke-sessions", headers=admin).status_code == 404
+
+    # Közvetlenül a visszavonás után (ugyanabban a másodpercben) kiadott token érvényes
+    assert client.get("/api/attendance/weekly", headers=_headers(app, 1)).status_code == 200
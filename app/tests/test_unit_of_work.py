@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import AttendanceRecord, AuditLog, CacheVersion, CHANGE_SEQ_NAME, User
+from app.db.versioning import user_sessions_version_name
+from app.db.unit_of_work import commit_or_flush, transaction
+from app.services.attendance_service import AttendanceService
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    session.add(User(id=1, username="u1", email="u1@x.hu", password_hash="x"))
+    # Már létező számlálók (állandósult állapot, nincs első használatos INSERT)
+    session.add_all([CacheVersion(name=CHANGE_SEQ_NAME, version=0),
+                     CacheVersion(name=user_sessions_version_name(1), version=0)])
+    session.commit()
+    return session
+
+
+@pytest.fixture
+def recorder(session):
+    """Kiadott SQL utasítások és commitok számlálása."""
+    stats = {"statements": [], "commits": 0}
+
+    @event.listens_for(session.get_bind(), "before_cursor_execute")
+    def count_statement(conn, cursor, statement, *args):
+        if not statement.startswith(("SAVEPOINT", "RELEASE")):
+            stats["statements"].append(statement)
+
+    # Motor szintű esemény: csak a valódi COMMIT számít, a savepoint RELEASE nem
+    @event.listens_for(session.get_bind(), "commit")
+    def count_commit(conn):
+        stats["commits"] += 1
+
+    return stats
+
+
+def test_check_in_commits_once_without_refresh(session, recorder):
+    record = AttendanceService(session, current_user_id=1).check_in()
+
+    assert recorder["commits"] == 1
+    # INSERT rekord + sorszám UPDATE + verzió UPDATE + audit INSERT; nincs utólagos SELECT
+    assert len(recorder["statements"]) <= 4
+    assert not any(s.lstrip().upper().startswith("SELECT") for s in recorder["statements"])
+
+    before = len(recorder["statements"])
+    assert record.id is not None and record.check_in is not None
+    assert len(recorder["statements"]) == before
+
+
+def test_check_out_commits_once(session, recorder):
+    service = AttendanceService(session, current_user_id=1)
+    service.check_in()
+    recorder["statements"].clear()
+    recorder["commits"] = 0
+
+    record = service.check_out()
+
+    assert recorder["commits"] == 1
+    assert record.work_duration is not None
+    assert session.query(AuditLog).count() == 2
+
+
+def test_nested_transactions_commit_at_outermost(session, recorder):
+    with transaction(session):
+        AttendanceService(session, current_user_id=1).check_in()
+        with transaction(session):
+            commit_or_flush(session)
+        assert recorder["commits"] == 0
+
+    assert recorder["commits"] == 1
+
+
+def test_exception_rolls_back_whole_unit(session):
+    with pytest.raises(RuntimeError):
+        with transaction(session):
+            AttendanceService(session, current_user_id=1).check_in()
+            raise RuntimeError("boom")
+
+    assert session.query(AttendanceRecord).count() == 0
+    assert session.info["unit_of_work_depth"] == 0
@@ -0,0 +1,107 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import User
+from app.db.versioning import bump_version
+from app.services.user_search_index import USERS_VERSION_NAME, UserSearchIndex
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        User(id=1, username="john", email="john@example.com", password_hash="x"),
+        User(id=2, username="Johanna", email="jo@corp.hu", password_hash="x"),
+        User(id=3, username="admin", email="johnny.admin@example.com", password_hash="x"),
+        User(id=4, username="jack", email="jack@example.com", password_hash="x", is_active=False),
+    ])
+    session.commit()
+    return session
+
+
+def _names(entries):
+    return [e.username for e in entries]
+
+
+def test_prefix_search_usernames_before_emails(session):
+    index = UserSearchIndex()
+    index.rebuild(session)
+
+    assert _names(index.search("jo")) == ["Johanna", "john", "admin"]
+    assert _names(index.search("JOHN", limit=1)) == ["john"]
+    assert _names(index.search("ja")) == []  # inaktív felhasználó nincs az indexben
+    assert _names(index.search("3")) == ["admin"]
+    assert index.search("") == []
+
+
+def test_incremental_updates(session):
+    index = UserSearchIndex()
+    index.rebuild(session)
+
+    user = session.get(User, 1)
+    user.username = "zoltan"
+    index.upsert(user)
+    assert _names(index.search("zo")) == ["zoltan"]
+    assert "john" not in _names(index.search("john"))
+
+    index.remove(2)
+    assert _names(index.search("jo")) == ["zoltan", "admin"]  # email találatok
+
+
+def test_resync_picks_up_other_workers_changes(session):
+    clock = FakeClock()
+    index = UserSearchIndex(check_interval=1.0, clock=clock)
+    index.rebuild(session)
+
+    session.add(User(id=5, username="joe", email="joe@example.com", password_hash="x"))
+    bump_version(session, USERS_VERSION_NAME)
+    session.commit()
+
+    index.resync_if_stale(session)
+    assert "joe" not in _names(index.search("joe"))
+
+    clock.now += 1.5
+    index.resync_if_stale(session)
+    assert _names(index.search("joe")) == ["joe"]
+
+
+def test_own_writes_do_not_trigger_rebuild(session, monkeypatch):
+    clock = FakeClock()
+    index = UserSearchIndex(check_interval=1.0, clock=clock)
+    index.rebuild(session)
+    rebuilds = []
+    original = index.rebuild
+    monkeypatch.setattr(index, "rebuild", lambda s: (rebuilds.append(1), original(s)))
+
+    user = User(id=5, username="joe", email="joe@example.com", password_hash="x")
+    session.add(user)
+    bump_version(session, USERS_VERSION_NAME)
+    session.commit()
+    index.upsert(user)
+
+    clock.now += 1.5
+    index.resync_if_stale(session)
+    assert rebuilds == []
+    assert _names(index.search("joe")) == ["joe"]
+
+    # Egy másik worker írása mellett már újraépül
+    bump_version(session, USERS_VERSION_NAME)
+    session.commit()
+    index.upsert(user)
+    bump_version(session, USERS_VERSION_NAME)
+    session.commit()
+    clock.now += 1.5
+    index.resync_if_stale(session)
+    assert rebuilds == [1]
@@ -0,0 +1,108 @@
+from datetime import date, datetime
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config.settings import Config
+from app.db.base import Base
+from app.db.models import AttendanceRecord, User, WorkLocation
+from app.main import create_app
+from app.services.report_service import ReportService
+from app.services.working_calendar import WorkingCalendarCache, WorkingCalendarService
+from app.utils.error_handler import ValidationError
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    session.add(User(id=1, username="u1", email="u1@x.hu", password_hash="x"))
+    session.commit()
+    return session
+
+
+@pytest.fixture
+def calendar(session):
+    return WorkingCalendarService(session, cache=WorkingCalendarCache())
+
+
+def _worked(session, day, minutes):
+    check_in = datetime(day.year, day.month, day.day, 8, 0)
+    session.add(AttendanceRecord(user_id=1, check_in=check_in, check_out=check_in, date=day,
+                                 work_duration=minutes, work_location=WorkLocation.OFFICE))
+    session.commit()
+
+
+def test_weekends_and_holidays_are_free(calendar):
+    calendar.set_holiday(date(2025, 10, 23), "Nemzeti ünnep")
+
+    # 2025-10-20 hétfő ... 2025-10-26 vasárnap
+    expected = calendar.expected_minutes(1, date(2025, 10, 20), date(2025, 10, 26))
+
+    assert expected.tolist() == [480, 480, 480, 0, 480, 0, 0]
+
+
+def test_schedule_change_across_year_boundary(calendar):
+    calendar.set_schedule(1, date(2026, 1, 1), [240, 240, 240, 240, 240, 0, 0])
+
+    # 2025-12-29 hétfő ... 2026-01-02 péntek
+    expected = calendar.expected_minutes(1, date(2025, 12, 29), date(2026, 1, 2))
+
+    assert expected.tolist() == [480, 480, 480, 240, 240]
+    with pytest.raises(ValidationError):
+        calendar.set_schedule(1, date(2026, 1, 1), [480] * 6)
+
+
+def test_compiled_year_is_reused_until_calendar_changes(session, calendar):
+    calendar.expected_minutes(1, date(2025, 3, 1), date(2025, 3, 31))
+    cached = calendar.cache._entries[(1, 2025)][1]
+    calendar.expected_minutes(1, date(2025, 6, 1), date(2025, 6, 30))
+    assert calendar.cache._entries[(1, 2025)][1] is cached
+
+    calendar.set_holiday(date(2025, 6, 9), "Pünkösdhétfő")
+    assert calendar.expected_minutes(1, date(2025, 6, 9), date(2025, 6, 9)).tolist() == [0]
+
+
+def test_balance_expected_vs_actual(session, calendar):
+    _worked(session, date(2025, 10, 20), 480)
+    _worked(session, date(2025, 10, 21), 300)
+    _worked(session, date(2025, 10, 25), 120)  # szombati munka
+
+    report = ReportService(session, calendar=calendar).get_balance(
+        1, datetime(2025, 10, 20), datetime(2025, 10, 26), daily=True,
+    )
+
+    assert report["expected_minutes"] == 5 * 480
+    assert report["actual_minutes"] == 900
+    assert report["balance_minutes"] == 900 - 5 * 480
+    assert report["working_days"] == 5
+    assert report["under_time_days"] == 4
+    assert report["daily"]["actual"] == [480, 300, 0, 0, 0, 120, 0]
+    assert report["daily"]["cumulative_balance"][-1] == report["balance_minutes"]
+
+
+def test_balance_endpoints(tmp_path):
+    config = type("CalendarConfig", (Config,), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.sqlite'}",
+        "RATE_LIMIT_ENABLED": False,
+    })
+    app = create_app(config)
+    client = app.test_client()
+    with app.app_context():
+        user = {"Authorization": f"Bearer {create_access_token(identity='1', additional_claims={'role': 'user'})}"}
+        admin = {"Authorization": f"Bearer {create_access_token(identity='3', additional_claims={'role': 'admin'})}"}
+
+    assert client.put("/api/admin/holidays/2030-01-01", json={"name": "Újév"}, headers=user).status_code == 403
+    assert client.put("/api/admin/holidays/2030-01-01", json={"name": "Újév"}, headers=admin).status_code == 200
+
+    query = "start_date=2030-01-01&end_date=2030-01-06"
+    own = client.get(f"/api/users/balance?{query}", headers=user)
+    assert own.status_code == 200
+    # 2030-01-01 kedd (ünnep), szerda-péntek munkanap
+    assert own.get_json()["expected_minutes"] == 3 * 480
+
+    assert client.get(f"/api/admin/reports/balance?user_id=1&{query}", headers=admin).status_code == 200
+    assert client.get("/api/admin/reports/balance?user_id=1", headers=admin).status_code == 400
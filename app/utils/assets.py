@@ -0,0 +1,183 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from typing import Dict, List, Optional
+
+from flask import abort, current_app, request, send_file, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # opcionális: nélküle csak gzip változat készül
+    brotli = None
+
+MANIFEST_FILE = "manifest.json"
+ASSETS_URL_PREFIX = "/assets"
+PAGES_DIR = "pages"
+
+# Tartalom-hash-elt (örökre cache-elhető) fájlok és a tömörítendő típusok
+FINGERPRINT_EXTENSIONS = (".css", ".js")
+COMPRESS_EXTENSIONS = (".css", ".js", ".html", ".svg", ".json")
+
+# HTML hivatkozások a static mappára: href="/static/css/x.css", src="/static/js/x.js"
+_STATIC_REF_RE = re.compile(r'(?P<attr>href|src)="/static/(?P<path>[^"?#]+)"')
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _write_with_variants(path: str, data: bytes, min_compress_bytes: int) -> List[str]:
+    """Fájl és előtömörített változatai; visszatér az elkészült kódolásokkal."""
+    _write_atomic(path, data)
+    encodings = []
+    if not path.endswith(COMPRESS_EXTENSIONS) or len(data) < min_compress_bytes:
+        return encodings
+
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        if len(compressed) < len(data):
+            _write_atomic(path + ".br", compressed)
+            encodings.append("br")
+    # mtime=0: determinisztikus kimenet, több worker is ugyanazt írja
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) < len(data):
+        _write_atomic(path + ".gz", compressed)
+        encodings.append("gzip")
+    return encodings
+
+
+def _source_files(static_dir: str, output_dir: str) -> Dict[str, bytes]:
+    """Fingerprintelendő fájlok tartalma relatív útvonal szerint (az output_dir kihagyásával)."""
+    output_abs = os.path.abspath(output_dir)
+    sources = {}
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != output_abs)
+        for name in sorted(files):
+            if name.endswith(FINGERPRINT_EXTENSIONS) or (root == static_dir and name.endswith(".html")):
+                path = os.path.join(root, name)
+                with open(path, "rb") as f:
+                    sources[os.path.relpath(path, static_dir).replace(os.sep, "/")] = f.read()
+    return sources
+
+
+def build_assets(static_dir: str, output_dir: str, min_compress_bytes: int = 256, force: bool = False) -> Dict:
+    """
+    Asset pipeline lépés:
+      1. a CSS/JS fájlok tartalom-hash-elt névvel kerülnek az output_dir-be,
+      2. a gyökér HTML oldalak hivatkozásai a hash-elt nevekre íródnak át,
+      3. minden tömöríthető fájlhoz gzip (és ha elérhető, brotli) változat készül.
+    A manifest.json tartalmazza a leképezést és a meglévő kódolásokat.
+    Ha a forrásfájlok nem változtak az előző build óta, a meglévő manifestet adja vissza.
+    """
+    sources = _source_files(static_dir, output_dir)
+    source_digest = hashlib.sha256()
+    for rel, data in sources.items():
+        source_digest.update(rel.encode("utf-8") + b"\0" + hashlib.sha256(data).digest())
+    source_digest = source_digest.hexdigest()
+
+    previous = None if force else load_manifest(output_dir)
+    if previous and previous.get("source_digest") == source_digest:
+        return previous
+
+    assets: Dict[str, str] = {}
+    encodings: Dict[str, List[str]] = {}
+
+    for rel, data in sources.items():
+        if rel.endswith(FINGERPRINT_EXTENSIONS):
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            stem, ext = os.path.splitext(rel)
+            hashed = f"{stem}.{digest}{ext}"
+            assets[rel] = hashed
+            encodings[hashed] = _write_with_variants(os.path.join(output_dir, hashed), data, min_compress_bytes)
+
+    def rewrite(match):
+        hashed = assets.get(match.group("path"))
+        if hashed is None:
+            return match.group(0)
+        return f'{match.group("attr")}="{ASSETS_URL_PREFIX}/{hashed}"'
+
+    pages = []
+    for name, data in sources.items():
+        if not name.endswith(".html"):
+            continue
+        html = _STATIC_REF_RE.sub(rewrite, data.decode("utf-8"))
+        rel = f"{PAGES_DIR}/{name}"
+        encodings[rel] = _write_with_variants(os.path.join(output_dir, rel), html.encode("utf-8"), min_compress_bytes)
+        pages.append(name)
+
+    manifest = {"source_digest": source_digest, "assets": assets, "pages": pages, "encodings": encodings}
+    _write_atomic(os.path.join(output_dir, MANIFEST_FILE), json.dumps(manifest, indent=2).encode("utf-8"))
+    return manifest
+
+
+def load_manifest(output_dir: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _send_precompressed(directory: str, rel: str, available: List[str], immutable: bool):
+    """Fájl küldése a kliens Accept-Encoding-ja szerinti előtömörített változatban."""
+    path = os.path.join(directory, rel)
+    encoding = next((e for e in ("br", "gzip") if e in available and request.accept_encodings[e]), None)
+    suffix = {"br": ".br", "gzip": ".gz"}.get(encoding, "")
+
+    response = send_file(path + suffix, mimetype=mimetypes.guess_type(rel)[0], conditional=True)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if available:
+        response.vary.add("Accept-Encoding")
+
+    if immutable:
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        # HTML: mindig újraellenőrzés (ETag), hogy az új hash-ek azonnal érvényesüljenek
+        response.cache_control.no_cache = True
+    return response
+
+
+def init_assets(app):
+    """
+    Fingerprintelt assetek kiszolgálása /assets alatt.
+    ASSETS_BUILD_ON_STARTUP esetén induláskor lefut a pipeline, különben a
+    (deploy során `flask build-assets`-szel készült) manifestet használja.
+    Manifest nélkül az oldalak a static mappából, változatlanul mennek ki.
+    """
+    output_dir = app.config["ASSETS_OUTPUT_DIR"]
+    manifest = None
+    if app.config.get("ASSETS_ENABLED", True):
+        if app.config.get("ASSETS_BUILD_ON_STARTUP", True):
+            manifest = build_assets(app.static_folder, output_dir)
+        else:
+            manifest = load_manifest(output_dir)
+    app.extensions["assets_manifest"] = manifest
+
+    @app.route(f"{ASSETS_URL_PREFIX}/<path:filename>")
+    def fingerprinted_asset(filename):
+        current = app.extensions.get("assets_manifest")
+        if not current or filename not in current["encodings"] or filename.startswith(f"{PAGES_DIR}/"):
+            abort(404)
+        return _send_precompressed(output_dir, filename, current["encodings"][filename], immutable=True)
+
+
+def send_page(name: str):
+    """HTML oldal küldése: átírt, tömörített változat, ha van manifest."""
+    manifest = current_app.extensions.get("assets_manifest")
+    if manifest and name in manifest["pages"]:
+        rel = f"{PAGES_DIR}/{name}"
+        return _send_precompressed(current_app.config["ASSETS_OUTPUT_DIR"], rel,
+                                   manifest["encodings"].get(rel, []), immutable=False)
+    return send_from_directory(current_app.static_folder, name)
@@ -0,0 +1,369 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+# Az összesített (minden felhasználót lefedő) bejegyzések címkéje; minden munkamenet-változás
+# érvényteleníti, összevonva (lásd SharedCache.coalesce_seconds). A felhasználónkénti bejegyzések
+# kulcsában a user_sessions:<id> verziószám szerepel, azokhoz nem kell érvénytelenítő írás.
+ATTENDANCE_TAG = "attendance"
+
+
+def user_tag(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+class NullCacheBackend:
+    """Nem tárol semmit (cache kikapcsolva, illetve init_app előtt)."""
+
+    def get(self, key: str) -> Optional[Any]:
+        return None
+
+    def set(self, key: str, value: Any, ttl: float, tags: Iterable[str] = (),
+            generations: Optional[Dict[str, int]] = None):
+        pass
+
+    def generations(self, tags: Iterable[str]) -> Dict[str, int]:
+        return {}
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        pass
+
+    def clear(self):
+        pass
+
+
+class MemoryCacheBackend:
+    """Folyamaton belüli LRU tároló – egy workerre érvényes (tesztekhez, egy workeres futtatáshoz)."""
+
+    def __init__(self, max_entries: int = 10_000, clock: Callable[[], float] = time.time):
+        self._entries: "OrderedDict[str, Tuple[float, str, Set[str]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self._clock = clock
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return json.loads(entry[1])
+
+    def set(self, key: str, value: Any, ttl: float, tags: Iterable[str] = (),
+            generations: Optional[Dict[str, int]] = None):
+        # JSON-ként tárolva, így a hívó nem módosíthatja a cache-elt példányt
+        payload, tags = json.dumps(value), set(tags)
+        with self._lock:
+            if generations is not None and self._current_generations(generations) != generations:
+                # Számolás közben érvénytelenítették: az érték már elavult lehet
+                return
+            self._drop(key)
+            self._entries[key] = (self._clock() + ttl, payload, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def generations(self, tags: Iterable[str]) -> Dict[str, int]:
+        with self._lock:
+            return self._current_generations(tags)
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in self._tags.pop(tag, set()):
+                    self._drop(key)
+
+    def clear(self):
+        # A generációk megmaradnak, hogy egy folyamatban lévő számolás ne írhasson vissza
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _current_generations(self, tags: Iterable[str]) -> Dict[str, int]:
+        return {tag: self._generations.get(tag, 0) for tag in tags}
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for tag in entry[2]:
+                keys = self._tags.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tags[tag]
+
+
+class SQLiteCacheBackend:
+    """
+    Fájl alapú SQLite tároló – az összes gunicorn worker ugyanazt a cache-t látja,
+    így egy riportot egyetlen worker számol ki. Címkénként (pl. "user:7")
+    érvényteleníthető; a lejárt bejegyzések írás közben, mintavételesen törlődnek.
+    Az érvénytelenítés címkénként generációt is növel, a set ezzel ellenőrzi,
+    hogy a számolás alatt nem érvénytelenítették-e az értéket.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time, purge_every: int = 500):
+        self.path = path
+        self._clock = clock
+        self._local = threading.local()
+        self._writes = 0
+        self.purge_every = purge_every
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_tags ("
+            "tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key)) WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_tag_generations ("
+            "tag TEXT PRIMARY KEY, generation INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_tags_key ON cache_tags (key)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        # Fork után (gunicorn preload_app) a szülő kapcsolatát nem használjuk tovább
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._connect().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?", (key, self._clock())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: float, tags: Iterable[str] = (),
+            generations: Optional[Dict[str, int]] = None):
+        conn = self._connect()
+        now = self._clock()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if generations is not None and self._read_generations(conn, generations) != generations:
+                # Számolás közben érvénytelenítették: az érték már elavult lehet
+                conn.execute("COMMIT")
+                return
+            conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+            conn.execute(
+                "INSERT INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                (key, json.dumps(value), now + ttl),
+            )
+            conn.executemany("INSERT INTO cache_tags (tag, key) VALUES (?, ?)", [(tag, key) for tag in set(tags)])
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                self._purge_expired(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def generations(self, tags: Iterable[str]) -> Dict[str, int]:
+        return self._read_generations(self._connect(), tags)
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        tags = sorted(set(tags))
+        if not tags:
+            return
+        placeholders = ", ".join("?" * len(tags))
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO cache_tag_generations (tag, generation) VALUES (?, 1) "
+                "ON CONFLICT(tag) DO UPDATE SET generation = generation + 1",
+                [(tag,) for tag in tags],
+            )
+            keys = f"SELECT key FROM cache_tags WHERE tag IN ({placeholders})"
+            conn.execute(f"DELETE FROM cache_entries WHERE key IN ({keys})", tags)
+            conn.execute(f"DELETE FROM cache_tags WHERE key IN ({keys})", tags)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM cache_entries")
+        conn.execute("DELETE FROM cache_tags")
+
+    @staticmethod
+    def _read_generations(conn: sqlite3.Connection, tags: Iterable[str]) -> Dict[str, int]:
+        tags = sorted(set(tags))
+        if not tags:
+            return {}
+        placeholders = ", ".join("?" * len(tags))
+        current = dict(conn.execute(
+            f"SELECT tag, generation FROM cache_tag_generations WHERE tag IN ({placeholders})", tags
+        ).fetchall())
+        return {tag: current.get(tag, 0) for tag in tags}
+
+    @staticmethod
+    def _purge_expired(conn: sqlite3.Connection, now: float):
+        expired = "SELECT key FROM cache_entries WHERE expires_at <= ?"
+        conn.execute(f"DELETE FROM cache_tags WHERE key IN ({expired})", (now,))
+        conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+
+
+class SharedCache:
+    """
+    A service réteg által használt cache; a tárolót az init_app választja ki
+    (CACHE_BACKEND: "sqlite", "memory" vagy "none"). A kulcsok a get_or_compute
+    hívójától jönnek, az érvénytelenítés címkékkel történik.
+    Hiba esetén a cache kimarad, a hívó kiszámolja az értéket.
+
+    Az összevont (coalesce) érvénytelenítések legfeljebb coalesce_seconds
+    másodpercenként egyetlen írással jutnak el a tárolóig; ennyi ideig
+    az érintett bejegyzések még a régi értéket adhatják.
+    """
+
+    def __init__(self, backend=None, default_ttl: float = 300.0, coalesce_seconds: float = 0.0):
+        self.backend = backend or NullCacheBackend()
+        self.default_ttl = default_ttl
+        self.coalesce_seconds = coalesce_seconds
+        self._deferred_tags: Set[str] = set()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._deferred_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.default_ttl = app.config.get("CACHE_DEFAULT_TTL", self.default_ttl)
+        self.coalesce_seconds = app.config.get("CACHE_COALESCE_SECONDS", self.coalesce_seconds)
+        self.backend = _backend_from_config(app.config)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], tags: Iterable[str] = (),
+                       ttl: Optional[float] = None, store: bool = True) -> Any:
+        """
+        Cache-elt érték, vagy compute() eredménye. store=False esetén csak olvas
+        (pl. replikáról számolt, esetleg késésben lévő eredményt nem teszünk vissza).
+        """
+        tags = list(tags)
+        try:
+            cached = self.backend.get(key)
+        except sqlite3.Error as e:
+            print("Cache read failed:", e)
+            cached = None
+        if cached is not None:
+            return cached
+
+        # A generációk a számolás előtt: ha közben érvénytelenítenek, a set eldobja az értéket
+        generations = None
+        if store:
+            try:
+                generations = self.backend.generations(tags)
+            except sqlite3.Error as e:
+                print("Cache read failed:", e)
+
+        value = compute()
+        if generations is not None:
+            try:
+                self.backend.set(key, value, self.default_ttl if ttl is None else ttl, tags, generations)
+            except sqlite3.Error as e:
+                print("Cache write failed:", e)
+        return value
+
+    def invalidate_tags(self, tags: Iterable[str], coalesce: bool = False):
+        """
+        Címkék érvénytelenítése. coalesce=True esetén a címkék összegyűlnek, és
+        coalesce_seconds múlva egyetlen írással érvénytelenítődnek (forró írási utakhoz).
+        """
+        tags = set(tags)
+        if coalesce and self.coalesce_seconds > 0:
+            with self._deferred_lock:
+                self._deferred_tags |= tags
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.coalesce_seconds, self.flush_deferred)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+            return
+        self._invalidate(tags)
+
+    def flush_deferred(self):
+        """Az összegyűlt címkék érvénytelenítése azonnal (időzítő, illetve leállás előtt)."""
+        with self._deferred_lock:
+            tags, self._deferred_tags = self._deferred_tags, set()
+            self._flush_timer = None
+        if tags:
+            self._invalidate(tags)
+
+    def _invalidate(self, tags: Set[str]):
+        if not tags:
+            return
+        try:
+            self.backend.invalidate_tags(tags)
+        except sqlite3.Error as e:
+            # A bejegyzések legkésőbb a TTL lejártával frissülnek
+            print("Cache invalidation failed:", e)
+
+
+def _backend_from_config(config):
+    kind = config.get("CACHE_BACKEND", "sqlite")
+    if kind == "none":
+        return NullCacheBackend()
+    database = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    in_memory_db = database.get_backend_name() == "sqlite" and database.database in (None, "", ":memory:")
+    # Memóriabeli adatbázis workerenként külön létezik, ahhoz nem lehet közös cache
+    if kind == "memory" or in_memory_db:
+        return MemoryCacheBackend()
+
+    path = config.get("CACHE_SQLITE_PATH")
+    if not path:
+        # Adatbázisonként külön fájl, hogy két példány (vagy teszt) ne lássa egymás riportjait
+        path = (f"{database.database}-cache.sqlite" if database.get_backend_name() == "sqlite"
+                else os.path.join(tempfile.gettempdir(), "worktrack_cache.sqlite"))
+    return SQLiteCacheBackend(path)
+
+
+shared_cache = SharedCache()
+
+
+# --- Érvénytelenítés commit után ---
+
+_PENDING_TAGS_KEY = "cache_invalidate_tags"
+_PENDING_COALESCED_TAGS_KEY = "cache_invalidate_coalesced_tags"
+
+
+def invalidate_after_commit(session: Session, tags: Iterable[str], coalesce: bool = False):
+    """
+    Címkék érvénytelenítése a session (legkülső) tranzakciójának végén.
+    Commit előtt egy párhuzamos olvasó még a régi adatot cache-elné vissza.
+    coalesce=True: összevont érvénytelenítés (SharedCache.invalidate_tags).
+    """
+    key = _PENDING_COALESCED_TAGS_KEY if coalesce else _PENDING_TAGS_KEY
+    session.info.setdefault(key, set()).update(tags)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _invalidate_pending_tags(session: Session, transaction):
+    if transaction.parent is not None:
+        return
+    # Rollback esetén is lefut: a felesleges érvénytelenítés csak egy újraszámolás
+    tags = session.info.pop(_PENDING_TAGS_KEY, None)
+    if tags:
+        shared_cache.invalidate_tags(tags)
+    tags = session.info.pop(_PENDING_COALESCED_TAGS_KEY, None)
+    if tags:
+        shared_cache.invalidate_tags(tags, coalesce=True)
@@ -0,0 +1,35 @@
+import gzip
+
+from flask import request
+
+
+def init_json_compression(app):
+    """
+    Nagy JSON API válaszok gzip tömörítése (JSON_GZIP_MIN_BYTES felett).
+    A kis válaszoknál a tömörítés költsége nagyobb, mint a megtakarítás.
+    """
+    min_bytes = app.config.get("JSON_GZIP_MIN_BYTES", 1024)
+    level = app.config.get("JSON_GZIP_LEVEL", 5)
+    if min_bytes <= 0:
+        return
+
+    @app.after_request
+    def gzip_json_response(response):
+        if (
+            response.mimetype != "application/json"
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or not 200 <= response.status_code < 300
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        if not request.accept_encodings["gzip"]:
+            return response
+        data = response.get_data()
+        if len(data) < min_bytes:
+            return response
+
+        response.set_data(gzip.compress(data, compresslevel=level))
+        response.headers["Content-Encoding"] = "gzip"
+        return response
@@ -0,0 +1,210 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: Optional[int]  # None: a kérés még fut
+    body: Optional[str]
+    mimetype: Optional[str]
+    expires_at: datetime
+
+
+class IdempotencyStore:
+    """
+    Idempotency-Key alapján tárolt válaszok.
+
+    Két szint: folyamaton belüli LRU (a gyakori azonnali újrapróbálkozásokhoz)
+    és az idempotency_keys tábla, amit minden worker lát. A kulcs a
+    felhasználóhoz kötött, így két kliens azonos kulcsa nem ütközik.
+    A kérés előtt egy "fut" állapotú sor foglalja le a kulcsot, így a
+    párhuzamos újrapróbálkozás sem futtatja kétszer a service réteget.
+    A foglalás csak lease_seconds ideig él: ha a worker a kérés közben
+    leáll, a lejárt foglalást a következő újrapróbálkozás átveszi.
+    """
+
+    def __init__(self, ttl_seconds: int = 86400, max_memory_entries: int = 10_000,
+                 clock: Callable[[], datetime] = datetime.now, lease_seconds: int = 60):
+        self._memory: "OrderedDict[Tuple[int, str], StoredResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_memory_entries = max_memory_entries
+        self.clock = clock
+
+    def _remember(self, user_id: int, key: str, stored: StoredResponse):
+        with self._lock:
+            self._memory[(user_id, key)] = stored
+            self._memory.move_to_end((user_id, key))
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, session: Session, user_id: int, key: str) -> Optional[StoredResponse]:
+        now = self.clock()
+        with self._lock:
+            stored = self._memory.get((user_id, key))
+            if stored is not None and stored.expires_at > now:
+                self._memory.move_to_end((user_id, key))
+                return stored
+
+        row = session.get(IdempotencyKey, (user_id, key))
+        if row is None or row.expires_at <= now:
+            return None
+        stored = StoredResponse(row.fingerprint, row.status_code, row.response_body, row.mimetype, row.expires_at)
+        if stored.status_code is not None:
+            self._remember(user_id, key, stored)
+        return stored
+
+    def reserve(self, session: Session, user_id: int, key: str, fingerprint: str) -> bool:
+        """
+        Kulcs lefoglalása a kérés idejére (rövid lease); False, ha más élő bejegyzés már létezik.
+        A lejárt bejegyzés, köztük a lejárt lease-ű félbemaradt foglalás, törlődik és átvehető.
+        """
+        now = self.clock()
+        try:
+            session.execute(delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id, IdempotencyKey.key == key, IdempotencyKey.expires_at <= now,
+            ))
+            session.add(IdempotencyKey(user_id=user_id, key=key, fingerprint=fingerprint, expires_at=now + self.lease))
+            session.commit()
+            return True
+        except IntegrityError:
+            session.rollback()
+            return False
+
+    def complete(self, session: Session, user_id: int, key: str, fingerprint: str, response):
+        body = response.get_data(as_text=True)
+        expires_at = self.clock() + self.ttl
+        # Csak a még futó foglalást zárja le: ha a lease lejárta után egy átvevő kérés már
+        # választ tárolt, az marad érvényben
+        result = session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key,
+                   IdempotencyKey.status_code.is_(None))
+            .values(status_code=response.status_code, response_body=body,
+                    mimetype=response.mimetype, expires_at=expires_at)
+        )
+        session.commit()
+        if not result.rowcount:
+            return
+        self._remember(user_id, key, StoredResponse(fingerprint, response.status_code, body,
+                                                    response.mimetype, expires_at))
+
+    def release(self, session: Session, user_id: int, key: str):
+        """Foglalás törlése (szerverhiba esetén a kérés megismételhető)."""
+        session.rollback()
+        session.execute(delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id, IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None),
+        ))
+        session.commit()
+
+    def purge_expired(self, session: Session) -> int:
+        result = session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= self.clock()))
+        session.commit()
+        return result.rowcount
+
+
+def init_idempotency(app) -> IdempotencyStore:
+    store = IdempotencyStore(
+        ttl_seconds=app.config.get("IDEMPOTENCY_TTL_SECONDS", 86400),
+        max_memory_entries=app.config.get("IDEMPOTENCY_MEMORY_ENTRIES", 10_000),
+        lease_seconds=app.config.get("IDEMPOTENCY_LEASE_SECONDS", 60),
+    )
+    app.extensions["idempotency_store"] = store
+    return store
+
+
+def _fingerprint() -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.path}\n".encode("utf-8"))
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _replay(stored: StoredResponse):
+    response = current_app.response_class(stored.body, status=stored.status_code, mimetype=stored.mimetype)
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+def _error(message: str, status_code: int):
+    return jsonify({"error": message, "status": status_code}), status_code
+
+
+def _in_progress():
+    response, status = _error("Azonos kulcsú kérés még folyamatban van", 409)
+    response.headers["Retry-After"] = "1"
+    return response, status
+
+
+def idempotent():
+    """
+    Decorator állapotváltoztató végpontokhoz (@jwt_required() után).
+    Idempotency-Key fejléc esetén az első válasz (2xx és 4xx) eltárolódik, az
+    azonos kulcsú újrapróbálkozás ezt kapja vissza a service réteg újrafuttatása
+    nélkül. Még futó azonos kulcsú kérés 409, eltérő body-val újrahasznált kulcs 422.
+    Fejléc nélkül a végpont változatlanul működik.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            store: Optional[IdempotencyStore] = current_app.extensions.get("idempotency_store")
+            if not key or store is None:
+                return fn(*args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return _error(f"Az {IDEMPOTENCY_HEADER} legfeljebb {MAX_KEY_LENGTH} karakter lehet", 400)
+
+            from app.db.engine import get_db
+
+            db = get_db()
+            user_id = int(get_jwt_identity())
+            fingerprint = _fingerprint()
+
+            stored = store.get(db, user_id, key)
+            if stored is None and not store.reserve(db, user_id, key, fingerprint):
+                stored = store.get(db, user_id, key)
+                if stored is None:
+                    # A foglaló sor közben lejárt vagy törlődött: foglalás nélkül nem futunk
+                    return _in_progress()
+            if stored is not None:
+                if stored.status_code is None:
+                    return _in_progress()
+                if stored.fingerprint != fingerprint:
+                    return _error("Az Idempotency-Key már egy eltérő kéréshez tartozik", 422)
+                return _replay(stored)
+
+            try:
+                try:
+                    rv = fn(*args, **kwargs)
+                except Exception as e:
+                    # A regisztrált hibakezelők (ServiceError -> JSON) válasza is tárolódik
+                    rv = current_app.handle_user_exception(e)
+                response = current_app.make_response(rv)
+            except Exception:
+                store.release(db, user_id, key)
+                raise
+
+            if response.status_code >= 500:
+                store.release(db, user_id, key)
+            else:
+                store.complete(db, user_id, key, fingerprint, response)
+            return response
+        return decorator
+    return wrapper
@@ -0,0 +1,197 @@
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import current_app, jsonify, request
+
+
+# --- Token bucket ---
+
+def _refill(tokens: float, updated_at: float, now: float, capacity: float, rate: float) -> float:
+    """Az eltelt idővel arányosan visszatölti a vödröt (legfeljebb capacity-ig)."""
+    return min(capacity, tokens + max(0.0, now - updated_at) * rate)
+
+
+def _take(tokens: float, capacity: float, rate: float) -> Tuple[bool, float, float]:
+    """
+    Egy token elvétele.
+    Visszatér: (engedélyezve, új tokenszám, hány másodperc múlva lesz újra token)
+    """
+    if tokens >= 1.0:
+        return True, tokens - 1.0, 0.0
+    retry_after = (1.0 - tokens) / rate if rate > 0 else float("inf")
+    return False, tokens, retry_after
+
+
+class MemoryRateLimitBackend:
+    """
+    Folyamaton belüli tároló – egy workerre érvényes limit.
+    A vödrök utolsó használat szerinti sorrendben állnak; a kulcsszám felső korlátos.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, max_keys: int = 100_000):
+        # kulcs -> (tokenek, utolsó frissítés, kapacitás, token/másodperc)
+        self._buckets: Dict[str, Tuple[float, float, float, float]] = {}
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._max_keys = max_keys
+
+    def consume(self, key: str, capacity: float, rate: float) -> Tuple[bool, float]:
+        now = self._clock()
+        with self._lock:
+            # Kivétel és visszarakás: a dict végére kerül, így az eleje a legrégebben használt
+            bucket = self._buckets.pop(key, None)
+            if bucket is None:
+                tokens = capacity
+                if len(self._buckets) >= self._max_keys:
+                    self._prune(now)
+            else:
+                tokens = _refill(bucket[0], bucket[1], now, capacity, rate)
+            allowed, tokens, retry_after = _take(tokens, capacity, rate)
+            self._buckets[key] = (tokens, now, capacity, rate)
+        return allowed, retry_after
+
+    def _prune(self, now: float):
+        # Teljesen visszatöltött vödrök eldobhatók, állapotuk megegyezik az újéval
+        # (a saját szabályuk kapacitásával számolva, nem a beérkező kulcséval)
+        full = [k for k, (t, ts, capacity, rate) in self._buckets.items()
+                if _refill(t, ts, now, capacity, rate) >= capacity]
+        for k in full:
+            del self._buckets[k]
+        # Kemény korlát: ha így sem szabadult fel hely, a legrégebben használt vödrök mennek.
+        # 10% tartalék marad, így a teljes bejárás nem fut le minden új kulcsnál.
+        target = int(self._max_keys * 0.9)
+        while len(self._buckets) > target:
+            del self._buckets[next(iter(self._buckets))]
+
+
+class SQLiteRateLimitBackend:
+    """
+    Fájl alapú SQLite tároló – az összes gunicorn worker ugyanazt a limitet látja.
+    Minden elvétel egy rövid BEGIN IMMEDIATE tranzakció, így nincs versenyhelyzet.
+    Soronként tárolódik, mikor töltődik vissza teljesen a vödör (full_at, a saját
+    szabálya szerint); az ennél régebbi sorok állapota megegyezik az újéval, ezeket
+    minden sweep_every-edik elvétel ugyanabban a tranzakcióban törli.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time, sweep_every: int = 500):
+        self.path = path
+        self._clock = clock
+        self._local = threading.local()
+        self._consumed = 0
+        self.sweep_every = sweep_every
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, "
+            "full_at REAL NOT NULL DEFAULT 0)"
+        )
+        # Korábbi fájl: az oszlop hiányzik (a 0 érték miatt a régi sorok az első takarításkor törlődnek)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(rate_limit_buckets)")}
+        if "full_at" not in columns:
+            conn.execute("ALTER TABLE rate_limit_buckets ADD COLUMN full_at REAL NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_rate_limit_buckets_full_at ON rate_limit_buckets (full_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        # Fork után (gunicorn preload_app) a szülő kapcsolatát nem használjuk tovább
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def consume(self, key: str, capacity: float, rate: float) -> Tuple[bool, float]:
+        conn = self._connect()
+        now = self._clock()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = _refill(row[0], row[1], now, capacity, rate) if row else capacity
+            allowed, tokens, retry_after = _take(tokens, capacity, rate)
+            full_at = now + (capacity - tokens) / rate if rate > 0 else float("inf")
+            conn.execute(
+                "INSERT INTO rate_limit_buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at, "
+                "full_at = excluded.full_at",
+                (key, tokens, now, full_at),
+            )
+            self._consumed += 1
+            if self._consumed % self.sweep_every == 0:
+                conn.execute("DELETE FROM rate_limit_buckets WHERE full_at <= ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, retry_after
+
+
+class RateLimiter:
+    """Névvel ellátott token bucket szabályok egy közös tárolón."""
+
+    def __init__(self, backend, rules: Dict[str, Tuple[float, float]], enabled: bool = True):
+        # rules: név -> (burst kapacitás, visszatöltés token/másodperc)
+        self.backend = backend
+        self.rules = rules
+        self.enabled = enabled
+
+    def consume(self, rule: str, key: str) -> Tuple[bool, float]:
+        if not self.enabled:
+            return True, 0.0
+        capacity, rate = self.rules[rule]
+        return self.backend.consume(f"{rule}:{key}", capacity, rate)
+
+
+def init_rate_limiter(app) -> RateLimiter:
+    """Limiter létrehozása a konfiguráció alapján, app.extensions alá mentve."""
+    if app.config.get("RATE_LIMIT_BACKEND", "memory") == "sqlite":
+        backend = SQLiteRateLimitBackend(app.config["RATE_LIMIT_SQLITE_PATH"])
+    else:
+        backend = MemoryRateLimitBackend()
+
+    rules = {
+        "login_ip": (app.config["LOGIN_RATE_LIMIT_IP_BURST"], app.config["LOGIN_RATE_LIMIT_IP_PER_MINUTE"] / 60.0),
+        "login_user": (app.config["LOGIN_RATE_LIMIT_USER_BURST"], app.config["LOGIN_RATE_LIMIT_USER_PER_MINUTE"] / 60.0),
+    }
+    limiter = RateLimiter(backend, rules, enabled=app.config.get("RATE_LIMIT_ENABLED", True))
+    app.extensions["rate_limiter"] = limiter
+    return limiter
+
+
+def _login_identity() -> Optional[str]:
+    data = request.get_json(silent=True) or {}
+    identity = data.get("username") or data.get("email")
+    return str(identity).strip().lower() if identity else None
+
+
+def login_rate_limited():
+    """
+    Decorator a bcrypt-et futtató auth végpontokhoz.
+    IP és felhasználónév szerint is korlátoz, és még a jelszó hash-elés előtt 429-et ad.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            limiter: Optional[RateLimiter] = current_app.extensions.get("rate_limiter")
+            if limiter is not None:
+                checks = [("login_ip", request.remote_addr or "unknown")]
+                identity = _login_identity()
+                if identity:
+                    checks.append(("login_user", identity))
+
+                for rule, key in checks:
+                    allowed, retry_after = limiter.consume(rule, key)
+                    if not allowed:
+                        response = jsonify({"error": "Túl sok próbálkozás, próbáld újra később.", "status": 429})
+                        response.headers["Retry-After"] = str(max(1, int(retry_after + 0.999)))
+                        return response, 429
+            return fn(*args, **kwargs)
+        return decorator
+    return wrapper
@@ -0,0 +1,134 @@
+"""
+Párhuzamos check-in/check-out áteresztőképesség: szinkron (gunicorn sync worker)
+és async (uvicorn + asgi.py, aiosqlite) stack összehasonlítása ugyanazon az adatbázison.
+
+Minden kliens szál a saját felhasználóival felváltva check-in / check-out kéréseket küld.
+
+    python -m benchmarks.bench_async_checkin --users 200 --concurrency 50 --seconds 10 --workers 2
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+from flask_jwt_extended import create_access_token
+
+from benchmarks.common import auth_header, make_app, make_config, print_report, summarize, temp_db_path
+from app.db.engine import db
+from app.db.synthetic import create_synthetic_users
+
+
+def sync_app():
+    """gunicorn factory: python -m gunicorn 'benchmarks.bench_async_checkin:sync_app()'"""
+    return make_app(os.environ["BENCH_DB"])
+
+
+def async_app():
+    """uvicorn factory: uvicorn --factory benchmarks.bench_async_checkin:async_app"""
+    from app.asgi import create_asgi_app
+    return create_asgi_app(make_config(os.environ["BENCH_DB"]))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(base_url: str, process, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("A szerver elindítása nem sikerült")
+        try:
+            requests.get(f"{base_url}/login", timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise RuntimeError("A szerver nem indult el időben")
+
+
+def start_server(kind: str, port: int, workers: int, env: dict):
+    if kind == "sync":
+        cmd = [sys.executable, "-m", "gunicorn", "-w", str(workers), "-k", "sync", "-b", f"127.0.0.1:{port}",
+               "--log-level", "warning", "benchmarks.bench_async_checkin:sync_app()"]
+    else:
+        cmd = [sys.executable, "-m", "uvicorn", "--factory", "benchmarks.bench_async_checkin:async_app",
+               "--workers", str(workers), "--port", str(port), "--log-level", "warning"]
+    return subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def prepare_database(db_path: str, users: int):
+    app = make_app(db_path)
+    with app.app_context():
+        user_ids = create_synthetic_users(db.session, users, prefix="bench")
+        return [create_access_token(identity=str(uid)) for uid in user_ids]
+
+
+def client(base_url: str, tokens, deadline: float, latencies, errors, lock):
+    session = requests.Session()
+    local, local_errors = [], 0
+    while time.perf_counter() < deadline:
+        for token in tokens:
+            for path in ("checkin", "checkout"):
+                start = time.perf_counter()
+                response = session.post(f"{base_url}/api/attendance/{path}", json={"location": "office"},
+                                        headers=auth_header(token))
+                local.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    local_errors += 1
+            if time.perf_counter() >= deadline:
+                break
+    with lock:
+        latencies.extend(local)
+        errors.append(local_errors)
+
+
+def run(kind: str, args) -> dict:
+    db_path = temp_db_path()
+    tokens = prepare_database(db_path, args.users)
+    port = free_port()
+    env = dict(os.environ, BENCH_DB=db_path, RATE_LIMIT_ENABLED="0")
+    process = start_server(kind, port, args.workers, env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_up(base_url, process)
+        latencies, errors, lock = [], [], threading.Lock()
+        chunks = [tokens[i::args.concurrency] for i in range(args.concurrency)]
+        deadline = time.perf_counter() + args.seconds
+        threads = [threading.Thread(target=client, args=(base_url, chunk, deadline, latencies, errors, lock))
+                   for chunk in chunks if chunk]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait()
+
+    return {
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "errors": sum(errors),
+        "latency": summarize(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    print_report({"sync_gunicorn": run("sync", args), "async_uvicorn": run("async", args)})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Reggeli csúcs szimuláció: több száz egyidejű check-in, felhasználónként több
+párhuzamos kéréssel (dupla kattintás, kliens újrapróbálás).
+
+Két mód ugyanazzal a terheléssel:
+  - legacy: SELECT-then-INSERT, részleges unique index nélkül (a régi útvonal)
+  - optimistic: AttendanceService.check_in (INSERT + részleges unique index)
+
+A riport mindkét módra megadja a duplikált nyitott munkamenetek számát és a
+késleltetés percentiliseit.
+
+    python -m benchmarks.bench_checkin_contention --users 100 --dup 3
+"""
+import argparse
+import threading
+import time
+from datetime import datetime, date
+
+from sqlalchemy import func, select, text
+
+from benchmarks.common import make_app, print_report, summarize
+from app.db.engine import db
+from app.db.models import AttendanceRecord, OPEN_SESSION_INDEX
+from app.db.synthetic import create_synthetic_users
+from app.services.attendance_service import AttendanceService
+from app.utils.error_handler import ServiceError, ValidationError
+
+
+class LegacyAttendanceService(AttendanceService):
+    """A korábbi SELECT-then-INSERT check-in, összehasonlításhoz."""
+
+    def check_in(self, work_location=None):
+        existing_open = self.db.query(AttendanceRecord).filter(
+            AttendanceRecord.user_id == self.current_user_id,
+            AttendanceRecord.check_out.is_(None),
+        ).first()
+        if existing_open:
+            raise ValidationError("Már van aktív munkamenet!")
+        record = AttendanceRecord(user_id=self.current_user_id, check_in=datetime.now(), date=date.today())
+        self.db.add(record)
+        self.db.commit()
+        self._log_action("check_in", entity_id=record.id)
+        return record
+
+
+def run(mode: str, users: int, dup: int) -> dict:
+    app = make_app()
+    with app.app_context():
+        if mode == "legacy":
+            db.session.execute(text(f"DROP INDEX IF EXISTS {OPEN_SESSION_INDEX}"))
+            db.session.commit()
+        user_ids = create_synthetic_users(db.session, users, prefix="rush")
+
+    service_class = LegacyAttendanceService if mode == "legacy" else AttendanceService
+    jobs = [uid for uid in user_ids for _ in range(dup)]
+    barrier = threading.Barrier(len(jobs))
+    latencies, outcomes, lock = [], {"ok": 0, "rejected": 0, "error": 0}, threading.Lock()
+
+    def worker(user_id: int):
+        with app.app_context():
+            barrier.wait()
+            start = time.perf_counter()
+            try:
+                service_class(db.session, user_id).check_in()
+                outcome = "ok"
+            except ValidationError:
+                outcome = "rejected"
+            except ServiceError:
+                outcome = "error"
+            elapsed = (time.perf_counter() - start) * 1000
+            db.session.remove()
+        with lock:
+            latencies.append(elapsed)
+            outcomes[outcome] += 1
+
+    threads = [threading.Thread(target=worker, args=(uid,)) for uid in jobs]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with app.app_context():
+        duplicates = db.session.scalar(
+            select(func.count()).select_from(
+                select(AttendanceRecord.user_id)
+                .where(AttendanceRecord.check_out.is_(None), AttendanceRecord.user_id.in_(user_ids))
+                .group_by(AttendanceRecord.user_id)
+                .having(func.count() > 1)
+                .subquery()
+            )
+        )
+
+    return {"requests": len(jobs), "outcomes": outcomes, "users_with_duplicates": duplicates,
+            "latency": summarize(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--dup", type=int, default=3, help="párhuzamos kérések száma felhasználónként")
+    args = parser.parse_args()
+
+    print_report({
+        "legacy": run("legacy", args.users, args.dup),
+        "optimistic": run("optimistic", args.users, args.dup),
+    })
+
+
+if __name__ == "__main__":
+    main()
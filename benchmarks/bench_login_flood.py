@@ -0,0 +1,85 @@
+"""
+Check-in késleltetés mérése login-áradat közben.
+
+Három futás:
+  - baseline: nincs terhelés
+  - flood_no_limit: hibás jelszavas login-áradat, rate limit kikapcsolva
+  - flood_limited: ugyanaz az áradat, bekapcsolt token bucket limiterrel
+
+A limiterrel a p95/p99 check-in késleltetésnek a baseline közelében kell maradnia,
+mert a túlzott login kérések a bcrypt előtt 429-et kapnak.
+
+    python -m benchmarks.bench_login_flood --seconds 5 --flood-threads 8
+"""
+import argparse
+import threading
+import time
+
+import requests
+
+from benchmarks.common import auth_header, login, make_app, print_report, serve, summarize
+
+
+def flood(base_url: str, stop: threading.Event, counters: dict, lock: threading.Lock, worker: int):
+    session = requests.Session()
+    i = 0
+    while not stop.is_set():
+        username = "jane" if i % 2 else f"attacker{worker}_{i}"
+        response = session.post(f"{base_url}/api/auth/login", json={"username": username, "password": "wrong"})
+        with lock:
+            counters[response.status_code] = counters.get(response.status_code, 0) + 1
+        i += 1
+
+
+def probe_check_in(base_url: str, seconds: float):
+    session = requests.Session()
+    headers = auth_header(login(base_url, "john", "john", session))
+    # A seed adat nyitott munkamenetet is létrehozhat
+    session.post(f"{base_url}/api/attendance/checkout", headers=headers)
+
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for path in ("checkin", "checkout"):
+            start = time.perf_counter()
+            response = session.post(f"{base_url}/api/attendance/{path}", json={"location": "office"}, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+    return latencies
+
+
+def run(seconds: float, flood_threads: int, rate_limit: bool):
+    app = make_app(RATE_LIMIT_ENABLED=rate_limit)
+    with serve(app) as base_url:
+        stop = threading.Event()
+        counters, lock = {}, threading.Lock()
+        threads = [
+            threading.Thread(target=flood, args=(base_url, stop, counters, lock, n), daemon=True)
+            for n in range(flood_threads)
+        ]
+        for t in threads:
+            t.start()
+        try:
+            latencies = probe_check_in(base_url, seconds)
+        finally:
+            stop.set()
+            for t in threads:
+                t.join()
+    return {"check_in_out": summarize(latencies), "login_status_counts": counters}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--flood-threads", type=int, default=8)
+    args = parser.parse_args()
+
+    print_report({
+        "baseline": run(args.seconds, 0, rate_limit=True),
+        "flood_no_limit": run(args.seconds, args.flood_threads, rate_limit=False),
+        "flood_limited": run(args.seconds, args.flood_threads, rate_limit=True),
+    })
+
+
+if __name__ == "__main__":
+    main()
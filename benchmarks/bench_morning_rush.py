@@ -0,0 +1,299 @@
+"""
+Makró terheléses teszt: egy teljes munkanap visszajátszása, hány dolgozót bír el egy node.
+
+A szkript saját adatbázissal elindítja az appot (vagy --base-url esetén egy már
+futó node-ot terhel, ugyanazon a --db fájlon), létrehoz N felhasználót a
+szintetikus adat útvonalon, majd időben összesűrítve lejátszik egy napot:
+
+  - login néhány perccel a belépés előtt
+  - check-in: a dolgozók --rush-share része egy 30 perces reggeli ablakban,
+    a többi 07:00 és 10:00 között
+  - a dashboard --poll-minutes percenként lekéri a /api/attendance/weekly-t
+  - check-out kb. 8,5 óra múlva
+  - a dolgozók --modification-rate része módosítási kérelmet ad be kilépés után
+  - egy admin --review-minutes percenként elbírálja a függő kérelmeket
+
+A terhelés nyitott modellű: minden lépésnek ütemezett időpontja van, a riport a
+végpontonkénti késleltetés (p50/p95/p99) mellett az ütemezési csúszást is mutatja
+– ha ez nő, a node már nem bírja a tempót. Kimenet JSON.
+
+    python -m benchmarks.bench_morning_rush --users 500 --duration 120 --concurrency 64
+    python -m benchmarks.bench_morning_rush --users 2000 --db /tmp/rush.sqlite \\
+        --base-url http://127.0.0.1:8000   # gunicorn -c gunicorn.conf.py, azonos adatbázissal
+"""
+import argparse
+import heapq
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from benchmarks.common import auth_header, make_app, print_report, serve, summarize, temp_db_path
+from app.db.engine import db
+from app.db.synthetic import create_synthetic_users
+
+DAY_START = 7 * 60  # 07:00, szimulált percekben éjféltől
+DAY_END = 19 * 60   # 19:00
+RUSH_START = 8 * 60
+RUSH_MINUTES = 30
+PASSWORD = "password"
+
+
+class Metrics:
+    """Végpontonkénti késleltetések, státuszkódok és másodpercenkénti kérésszám."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.lag_ms: List[float] = []
+        self.per_second: Dict[int, int] = defaultdict(int)
+
+    def record(self, endpoint: str, started: float, elapsed_ms: float, status: str, ok: bool, origin: float):
+        with self._lock:
+            self.latencies[endpoint].append(elapsed_ms)
+            self.statuses[endpoint][status] += 1
+            if not ok:
+                self.errors[endpoint] += 1
+            self.per_second[int(started - origin)] += 1
+
+    def record_lag(self, lag_ms: float):
+        with self._lock:
+            self.lag_ms.append(lag_ms)
+
+
+class Employee:
+    """Egy dolgozó napja: ütemezett lépések sorban (a következő csak az előző után indul)."""
+
+    def __init__(self, username: str, check_in_at: float, work_minutes: float, poll_minutes: float,
+                 modifies: bool, rng: random.Random):
+        self.username = username
+        self.token: Optional[str] = None
+        self.session_id: Optional[int] = None
+        check_out_at = min(check_in_at + work_minutes, DAY_END - 1)
+        steps = [(check_in_at - rng.uniform(0.5, 3.0), self.login), (check_in_at, self.check_in)]
+        poll_at = check_in_at + rng.uniform(0, poll_minutes)
+        while poll_at < check_out_at:
+            steps.append((poll_at, self.poll_weekly))
+            poll_at += poll_minutes
+        steps.append((check_out_at, self.check_out))
+        if modifies:
+            steps.append((min(check_out_at + rng.uniform(1, 30), DAY_END), self.request_modification))
+        self.steps = steps
+
+    def login(self, client: "Client"):
+        response = client.call("POST /api/auth/login", "post", "/api/auth/login",
+                               json={"username": self.username, "password": PASSWORD})
+        if response is not None and response.ok:
+            self.token = response.json()["access_token"]
+
+    def check_in(self, client: "Client"):
+        response = client.call("POST /api/attendance/checkin", "post", "/api/attendance/checkin",
+                               token=self.token, json={"location": "office"})
+        if response is not None and response.ok:
+            self.session_id = response.json()["id"]
+
+    def poll_weekly(self, client: "Client"):
+        client.call("GET /api/attendance/weekly", "get", "/api/attendance/weekly", token=self.token)
+
+    def check_out(self, client: "Client"):
+        client.call("POST /api/attendance/checkout", "post", "/api/attendance/checkout",
+                    token=self.token, json={"location": "office"})
+
+    def request_modification(self, client: "Client"):
+        if self.session_id is None:
+            return
+        client.call("POST /api/attendance/modifications", "post", "/api/attendance/modifications",
+                    token=self.token, json={"work_session_id": self.session_id,
+                                            "requested_location": "home_office",
+                                            "reason": "Délután otthonról dolgoztam"})
+
+
+class Admin:
+    """Az admin időközönként lekéri a függő kérelmeket és elbírálja őket."""
+
+    def __init__(self, review_minutes: float):
+        self.token: Optional[str] = None
+        self.reviewed = 0
+        self.steps = [(DAY_START, self.login)]
+        at = DAY_START + review_minutes
+        while at <= DAY_END:
+            self.steps.append((at, self.review_pending))
+            at += review_minutes
+
+    def login(self, client: "Client"):
+        response = client.call("POST /api/auth/login", "post", "/api/auth/login",
+                               json={"username": "admin", "password": "admin"})
+        if response is not None and response.ok:
+            self.token = response.json()["access_token"]
+
+    def review_pending(self, client: "Client"):
+        response = client.call("GET /api/admin/modification-requests", "get",
+                               "/api/admin/modification-requests?status=pending", token=self.token)
+        if response is None or not response.ok:
+            return
+        for i, pending in enumerate(response.json()):
+            client.call("POST /api/admin/modification-requests/<id>/review", "post",
+                        f"/api/admin/modification-requests/{pending['id']}/review",
+                        token=self.token, json={"approve": i % 4 != 0, "reason": "Terheléses teszt"})
+            self.reviewed += 1
+
+
+class Client:
+    """HTTP hívások mérése; szálanként saját keep-alive requests.Session."""
+
+    def __init__(self, base_url: str, metrics: Metrics, origin: float, timeout: float):
+        self.base_url = base_url
+        self.metrics = metrics
+        self.origin = origin
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def call(self, endpoint: str, method: str, path: str, token: Optional[str] = None, **kwargs):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        headers = auth_header(token) if token else {}
+        started = time.perf_counter()
+        try:
+            response = session.request(method, f"{self.base_url}{path}", headers=headers,
+                                       timeout=self.timeout, **kwargs)
+            status, ok = str(response.status_code), response.ok
+        except requests.RequestException as e:
+            response, status, ok = None, type(e).__name__, False
+        self.metrics.record(endpoint, started, (time.perf_counter() - started) * 1000, status, ok, self.origin)
+        return response
+
+
+def build_day(users: List[str], args, rng: random.Random):
+    employees = []
+    for username in users:
+        if rng.random() < args.rush_share:
+            check_in_at = RUSH_START + rng.uniform(0, RUSH_MINUTES)
+        else:
+            check_in_at = rng.uniform(DAY_START + 5, 10 * 60)
+        employees.append(Employee(
+            username, check_in_at, work_minutes=rng.gauss(510, 30), poll_minutes=args.poll_minutes,
+            modifies=rng.random() < args.modification_rate, rng=rng,
+        ))
+    return employees
+
+
+def replay(actors, client: Client, seconds_per_minute: float, concurrency: int, metrics: Metrics):
+    """
+    Ütemező: egy kupac (esedékesség, szereplő, lépés index); szereplőnként mindig csak a
+    következő lépés van a kupacban, így egy dolgozó lépései nem előzik meg egymást.
+    """
+    heap = [(actor.steps[0][0], i, 0) for i, actor in enumerate(actors) if actor.steps]
+    heapq.heapify(heap)
+    condition = threading.Condition()
+    in_flight = [0]
+
+    def run_step(actor_index: int, step_index: int, due: float):
+        actor = actors[actor_index]
+        metrics.record_lag(max(0.0, (time.perf_counter() - due) * 1000))
+        try:
+            actor.steps[step_index][1](client)
+        finally:
+            with condition:
+                in_flight[0] -= 1
+                if step_index + 1 < len(actor.steps):
+                    heapq.heappush(heap, (actor.steps[step_index + 1][0], actor_index, step_index + 1))
+                condition.notify()
+
+    def due_time(minute: float) -> float:
+        return client.origin + (minute - DAY_START) * seconds_per_minute
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        with condition:
+            while heap or in_flight[0]:
+                if not heap:
+                    condition.wait()
+                    continue
+                minute, actor_index, step_index = heap[0]
+                delay = due_time(minute) - time.perf_counter()
+                if delay > 0:
+                    condition.wait(timeout=delay)
+                    continue
+                heapq.heappop(heap)
+                in_flight[0] += 1
+                executor.submit(run_step, actor_index, step_index, due_time(minute))
+
+
+def report(metrics: Metrics, elapsed: float, args, admin: Admin) -> dict:
+    endpoints = {}
+    for endpoint in sorted(metrics.latencies):
+        latencies = metrics.latencies[endpoint]
+        endpoints[endpoint] = {
+            **summarize(latencies),
+            "errors": metrics.errors[endpoint],
+            "error_rate": round(metrics.errors[endpoint] / len(latencies), 4),
+            "statuses": dict(metrics.statuses[endpoint]),
+        }
+    total = sum(len(values) for values in metrics.latencies.values())
+    errors = sum(metrics.errors.values())
+    return {
+        "config": {
+            "users": args.users, "duration_s": args.duration, "concurrency": args.concurrency,
+            "rush_share": args.rush_share, "poll_minutes": args.poll_minutes,
+            "modification_rate": args.modification_rate, "seed": args.seed,
+        },
+        "elapsed_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1) if elapsed else None,
+        "peak_rps": max(metrics.per_second.values(), default=0),
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "schedule_lag": summarize(metrics.lag_ms),
+        "modifications_reviewed": admin.reviewed,
+        "endpoints": endpoints,
+    }
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=60.0, help="A 07:00-19:00 nap hossza valós másodpercben.")
+    parser.add_argument("--concurrency", type=int, default=64, help="Egyidejű HTTP kliensek száma.")
+    parser.add_argument("--rush-share", type=float, default=0.8, help="A reggeli 30 perces ablakban belépők aránya.")
+    parser.add_argument("--poll-minutes", type=float, default=10.0, help="Dashboard frissítés (szimulált perc).")
+    parser.add_argument("--modification-rate", type=float, default=0.05)
+    parser.add_argument("--review-minutes", type=float, default=60.0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="HTTP timeout másodpercben.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default=None, help="SQLite fájl (alapból ideiglenes).")
+    parser.add_argument("--base-url", default=None,
+                        help="Már futó node címe (ugyanazon a --db adatbázison); alapból helyi szerver indul.")
+    parser.add_argument("--rate-limit", action="store_true", help="Login rate limit bekapcsolva marad.")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    # Minden kliens 127.0.0.1-ről jön, a login IP limit nélküle az első 20 belépés után 429-et adna
+    app = make_app(args.db or temp_db_path("worktrack_rush_"), RATE_LIMIT_ENABLED=args.rate_limit)
+    prefix = f"rush{rng.randrange(10**6)}_"
+    with app.app_context():
+        create_synthetic_users(db.session, args.users, prefix=prefix, password=PASSWORD)
+
+    employees = build_day([f"{prefix}{i}" for i in range(args.users)], args, rng)
+    admin = Admin(args.review_minutes)
+    seconds_per_minute = args.duration / (DAY_END - DAY_START)
+    metrics = Metrics()
+
+    with (nullcontext(args.base_url) if args.base_url else serve(app)) as base_url:
+        origin = time.perf_counter()
+        client = Client(base_url, metrics, origin, args.timeout)
+        replay(employees + [admin], client, seconds_per_minute, args.concurrency, metrics)
+        elapsed = time.perf_counter() - origin
+
+    result = report(metrics, elapsed, args, admin)
+    print_report(result)
+    return result
+
+
+if __name__ == "__main__":
+    main()
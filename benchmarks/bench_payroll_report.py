@@ -0,0 +1,45 @@
+"""
+Havi bérszámfejtési riport: N felhasználó × egy hónap munkamenetei.
+
+    python -m benchmarks.bench_payroll_report --users 10000 --month 2025-11
+"""
+import argparse
+import time
+
+from benchmarks.common import make_app, print_report
+from app.db.engine import db
+from app.db.synthetic import create_month_of_sessions, create_synthetic_users
+from app.services.payroll_report import PayrollReportService, parse_month
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--month", default="2025-11")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    month = parse_month(args.month)
+    app = make_app()
+    with app.app_context():
+        user_ids = create_synthetic_users(db.session, args.users, prefix="payroll")
+        sessions = create_month_of_sessions(db.session, user_ids, month)
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            report = PayrollReportService(db.session).monthly_report(month)
+            timings.append(time.perf_counter() - start)
+            db.session.rollback()
+
+    print_report({
+        "users": args.users,
+        "sessions": sessions,
+        "report_rows": len(report),
+        "seconds": [round(t, 3) for t in timings],
+        "best_seconds": round(min(timings), 3),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Listázó endpointok: ORM entitások vs. Core select() read modell (app/db/read_models.py).
+
+Mindkét út ugyanazt a dict listát állítja elő (a JSON serializálás előtti lépés):
+  - orm: db.query(Model).all() + attribútumok másolása (a korábbi endpoint kód)
+  - core: read_models.*_dicts
+
+A riport útvonalanként a futási időt és a tracemalloc csúcs memóriát adja.
+
+    python -m benchmarks.bench_read_models --rows 100000 --modifications 10000
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from sqlalchemy import insert, select
+
+from benchmarks.common import make_app, print_report
+from app.db import read_models
+from app.db.engine import db
+from app.db.models import AttendanceRecord, ModificationRequest, RequestStatus
+from app.db.synthetic import create_month_of_sessions, create_synthetic_users
+from app.db.versioning import with_change_seqs
+from app.services.payroll_report import parse_month
+
+WORKDAYS_PER_MONTH = 21
+
+
+def orm_attendance_records(session):
+    return [
+        {
+            "id": record.id,
+            "user_id": record.user_id,
+            "check_in": record.check_in.isoformat() if record.check_in else None,
+            "check_out": record.check_out.isoformat() if record.check_out else None,
+            "work_location": record.work_location.value,
+            "work_duration": record.work_duration,
+            "date": record.date.isoformat() if record.date else None,
+            "is_overtime_generated": record.is_overtime_generated,
+            "created_at": record.created_at.isoformat() if record.created_at else None,
+            "updated_at": record.updated_at.isoformat() if record.updated_at else None,
+        }
+        for record in session.query(AttendanceRecord).all()
+    ]
+
+
+def orm_modification_requests(session):
+    return [
+        {
+            "id": req.id,
+            "user_id": req.user_id,
+            "username": req.requester.username if req.requester else None,
+            "work_session_id": req.work_session_id,
+            "date": req.work_session.date.isoformat() if req.work_session and req.work_session.date else None,
+            "requested_check_in": req.requested_check_in.isoformat() if req.requested_check_in else None,
+            "requested_check_out": req.requested_check_out.isoformat() if req.requested_check_out else None,
+            "requested_work_location": req.requested_work_location.value if req.requested_work_location else None,
+            "reason": req.reason,
+            "status": req.status.value,
+            "created_at": req.created_at.isoformat(),
+        }
+        for req in session.query(ModificationRequest).all()
+    ]
+
+
+def measure(fn, repeat: int):
+    """Legjobb idő és a tracemalloc csúcs (külön futásban, mert a nyomkövetés lassít)."""
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        gc.collect()
+        start = time.perf_counter()
+        result = fn(db.session)
+        timings.append(time.perf_counter() - start)
+        db.session.rollback()
+
+    db.session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    fn(db.session)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    db.session.rollback()
+    return result, {"best_seconds": round(min(timings), 3), "peak_mb": round(peak / 2**20, 1)}
+
+
+def seed(rows: int, modifications: int):
+    user_ids = create_synthetic_users(db.session, max(1, rows // WORKDAYS_PER_MONTH), prefix="readmodel")
+    sessions = create_month_of_sessions(db.session, user_ids, parse_month("2025-10"))
+    rng = random.Random(0)
+    session_rows = db.session.execute(select(AttendanceRecord.id, AttendanceRecord.user_id)).all()
+    picked = rng.sample(session_rows, min(modifications, len(session_rows)))
+    if picked:
+        db.session.execute(insert(ModificationRequest), with_change_seqs(db.session, [
+            {"user_id": user_id, "work_session_id": session_id, "reason": "Benchmark",
+             "status": RequestStatus.PENDING if rng.random() < 0.5 else RequestStatus.APPROVED}
+            for session_id, user_id in picked
+        ]))
+        db.session.commit()
+    return sessions, len(picked)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Munkamenetek hozzávetőleges száma.")
+    parser.add_argument("--modifications", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = make_app()
+    report = {}
+    with app.app_context():
+        report["sessions"], report["modification_request_rows"] = seed(args.rows, args.modifications)
+
+        cases = {
+            "attendance_records": (orm_attendance_records, read_models.attendance_record_dicts),
+            "modification_requests": (orm_modification_requests, read_models.modification_request_dicts),
+        }
+        for name, (orm_fn, core_fn) in cases.items():
+            orm_result, orm_stats = measure(orm_fn, args.repeat)
+            core_result, core_stats = measure(core_fn, args.repeat)
+            report[name] = {
+                "orm": orm_stats,
+                "core": core_stats,
+                "speedup": round(orm_stats["best_seconds"] / max(core_stats["best_seconds"], 1e-9), 2),
+                "identical_output": sorted(orm_result, key=lambda row: row["id"]) == core_result,
+            }
+
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Sweeper áteresztőképesség: N elfelejtett nyitott munkamenet lezárása egy futásban.
+
+    python -m benchmarks.bench_session_sweeper --sessions 200000 --batch-size 5000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import make_app, print_report
+from app.db.engine import db
+from app.db.synthetic import create_open_sessions, create_synthetic_users
+from app.services.session_sweeper import SessionSweeper
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--max-open-minutes", type=int, default=720)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        user_ids = create_synthetic_users(db.session, args.sessions, prefix="sweep")
+        create_open_sessions(db.session, user_ids, datetime.now() - timedelta(days=2))
+
+        start = time.perf_counter()
+        result = SessionSweeper(db.session, args.max_open_minutes, batch_size=args.batch_size).run()
+        elapsed = time.perf_counter() - start
+
+    print_report({
+        "sessions": args.sessions,
+        "result": result,
+        "seconds": round(elapsed, 2),
+        "sessions_per_second": round(result["closed"] / elapsed, 1) if elapsed else None,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Indulási idő mérése: folyamat indításától az első (adatbázist érintő) kérés válaszáig.
+
+Módok:
+  - development: create_all + seed minden create_app() hívásnál
+  - production: DDL/seed nélkül, csak Alembic revízió ellenőrzés
+  - gunicorn_preload / gunicorn_no_preload: production mód gunicorn alatt,
+    az első sikeres válaszig eltelt idő (a workerek forkolt, meleg appot kapnak-e)
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import requests
+
+from benchmarks.bench_async_checkin import free_port
+from app.config.settings import PROJECT_ROOT
+from benchmarks.common import make_app, print_report, summarize, temp_db_path
+
+CHILD = """
+import time, warnings
+warnings.filterwarnings("ignore")
+from app.main import create_app
+from flask_jwt_extended import create_access_token
+t0 = time.perf_counter()
+app = create_app()
+with app.app_context():
+    token = create_access_token(identity="1")
+response = app.test_client().get("/api/attendance/weekly", headers={"Authorization": "Bearer " + token})
+assert response.status_code == 200, response.status_code
+print(time.perf_counter() - t0)
+"""
+
+
+def migrate(db_path: str):
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=f"sqlite:///{db_path}")
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=PROJECT_ROOT, env=env,
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # Seed adatok egyszer, dev módban
+    make_app(db_path)
+
+
+def run_child(db_path: str, mode: str):
+    """Visszatér: (teljes idő a folyamat indításától, create_app + első kérés a folyamaton belül) ms-ban."""
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=f"sqlite:///{db_path}", DB_STARTUP_MODE=mode)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", CHILD], cwd=PROJECT_ROOT, env=env, check=True,
+                            capture_output=True, text=True)
+    total = (time.perf_counter() - start) * 1000
+    in_process = float(result.stdout.strip().splitlines()[-1]) * 1000
+    return total, in_process
+
+
+def child_report(db_path: str, mode: str, runs: int) -> dict:
+    samples = [run_child(db_path, mode) for _ in range(runs)]
+    return {
+        "process_to_first_response": summarize([total for total, _ in samples]),
+        "create_app_to_first_response": summarize([in_process for _, in_process in samples]),
+    }
+
+
+def run_gunicorn(db_path: str, preload: bool, workers: int) -> float:
+    port = free_port()
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=f"sqlite:///{db_path}", DB_STARTUP_MODE="production")
+    cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-w", str(workers),
+           "-b", f"127.0.0.1:{port}", "run:app"]
+    env["GUNICORN_PRELOAD"] = "1" if preload else "0"
+    start = time.perf_counter()
+    process = subprocess.Popen(cmd, cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                if requests.get(f"http://127.0.0.1:{port}/login", timeout=10).status_code == 200:
+                    return (time.perf_counter() - start) * 1000
+            except (requests.ConnectionError, requests.Timeout):
+                time.sleep(0.02)
+            if process.poll() is not None:
+                raise RuntimeError("gunicorn nem indult el")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    db_path = temp_db_path()
+    migrate(db_path)
+
+    print_report({
+        "development": child_report(db_path, "development", args.runs),
+        "production": child_report(db_path, "production", args.runs),
+        "gunicorn_preload": summarize([run_gunicorn(db_path, True, args.workers) for _ in range(args.runs)]),
+        "gunicorn_no_preload": summarize([run_gunicorn(db_path, False, args.workers) for _ in range(args.runs)]),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Typeahead keresés: prefix lekérdezések késleltetése N felhasználós indexen,
+összevetve a LIKE alapú adatbázis kereséssel.
+
+    python -m benchmarks.bench_user_search --users 100000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import make_app, percentile, print_report
+from app.db.engine import db
+from app.db.models import User
+from app.db.synthetic import create_synthetic_users
+from app.services.user_search_index import UserSearchIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    app = make_app()
+    with app.app_context():
+        create_synthetic_users(db.session, args.users, prefix="user")
+
+        index = UserSearchIndex()
+        start = time.perf_counter()
+        index.rebuild(db.session)
+        build_seconds = time.perf_counter() - start
+
+        prefixes = [f"user{rng.randrange(args.users)}"[:rng.randint(5, 9)] for _ in range(args.queries)]
+
+        index_ms = []
+        for prefix in prefixes:
+            start = time.perf_counter()
+            index.search(prefix, args.limit)
+            index_ms.append((time.perf_counter() - start) * 1000)
+
+        like_ms = []
+        for prefix in prefixes[:200]:
+            start = time.perf_counter()
+            db.session.query(User.id, User.username, User.email).filter(
+                User.username.ilike(f"%{prefix}%") | User.email.ilike(f"%{prefix}%")
+            ).limit(args.limit).all()
+            like_ms.append((time.perf_counter() - start) * 1000)
+
+    print_report({
+        "users": args.users,
+        "index_build_seconds": round(build_seconds, 3),
+        "index_p50_us": round(percentile(index_ms, 50) * 1000, 1),
+        "index_p99_us": round(percentile(index_ms, 99) * 1000, 1),
+        "like_p50_ms": round(percentile(like_ms, 50), 2),
+        "like_p99_ms": round(percentile(like_ms, 99), 2),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Közös segédfüggvények a benchmark szkriptekhez.
+
+Futtatás a repó gyökeréből, pl.:
+    python -m benchmarks.bench_login_flood
+"""
+import json
+import os
+import tempfile
+import threading
+import warnings
+from contextlib import contextmanager
+from typing import Dict, List
+
+import requests
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app.config.settings import Config
+from app.main import create_app
+
+# A rövid dev JWT kulcs miatti figyelmeztetések elnyomják a riportot
+warnings.filterwarnings("ignore", module="jwt")
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def make_config(db_path: str, **overrides):
+    """Config alosztály fájl alapú SQLite adatbázissal."""
+    attrs = {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}", **overrides}
+    return type("BenchConfig", (Config,), attrs)
+
+
+def temp_db_path(prefix: str = "worktrack_bench_") -> str:
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix=".sqlite")
+    os.close(fd)
+    os.unlink(path)
+    return path
+
+
+def make_app(db_path: str = None, **overrides):
+    return create_app(make_config(db_path or temp_db_path(), **overrides))
+
+
+@contextmanager
+def serve(app):
+    """Többszálú werkzeug szerver háttérszálon, a base URL-t adja vissza."""
+    server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def login(base_url: str, username: str, password: str, session=None) -> str:
+    http = session or requests
+    response = http.post(f"{base_url}/api/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(p / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(latencies_ms: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(latencies_ms),
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "max_ms": round(max(latencies_ms), 2) if latencies_ms else 0.0,
+    }
+
+
+def print_report(report) -> None:
+    print(json.dumps(report, indent=2, ensure_ascii=False))
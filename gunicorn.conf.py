@@ -0,0 +1,17 @@
+import os
+
+# Futtatás: DB_STARTUP_MODE=production gunicorn -c gunicorn.conf.py run:app
+#
+# preload_app: az app (config, DB revízió ellenőrzés, settings cache) egyszer
+# töltődik be a master folyamatban, a workerek ezt a meleg állapotot forkolják.
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+
+
+def post_fork(server, worker):
+    # A masterben nyitott adatbázis kapcsolatok nem oszthatók meg a workerek között
+    from app.db.engine import dispose_engines
+
+    dispose_engines(server.app.wsgi())